@@ -0,0 +1,81 @@
+"""
+Memory and time needed to hold host facts for a large fleet.
+
+Compares a list of validated MikrotikHost models, models constructed without
+validation and the columnar FleetTable used by bulk views, which keeps no model
+objects. Run from the repository root:
+
+    python benchmarks/fleet.py --hosts 50000
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+
+from mikrotools.hoststools.fleet import FleetTable
+from mikrotools.hoststools.models import MikrotikHost
+
+MODELS = ('RB5009UG+S+', 'C52iG-5HaxD2HaxD', 'CCR2004-1G-12S+2XS', 'hAP ac^2')
+VERSIONS = ('7.16.2', '7.15.3', '7.12.1', '6.49.17')
+
+def make_facts(count: int) -> list[dict]:
+    # Values are built per host, as when they are parsed from separate routers
+    return [
+        {
+            'address': f'10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}',
+            'identity': f'router-{i}',
+            'installed_routeros_version': ''.join(VERSIONS[i % len(VERSIONS)]),
+            'latest_routeros_version': ''.join(VERSIONS[0]),
+            'current_firmware_version': ''.join(VERSIONS[i % len(VERSIONS)]),
+            'upgrade_firmware_version': ''.join(VERSIONS[0]),
+            'cpu_load': i % 100,
+            'model': ''.join(MODELS[i % len(MODELS)]),
+            'uptime': f'{i % 30}d{i % 24:02}:00:00',
+            'public_address': f'203.0.{i >> 8 & 255}.{i & 255}',
+        }
+        for i in range(count)
+    ]
+
+def validated(facts: list[dict]):
+    return [MikrotikHost(**host) for host in facts]
+
+def constructed(facts: list[dict]):
+    return [MikrotikHost.model_construct(**host) for host in facts]
+
+def columnar(facts: list[dict]):
+    table = FleetTable()
+    for host in facts:
+        table.set(MikrotikHost(**host))
+    return table
+
+def measure(build, facts: list[dict]) -> tuple[float, int]:
+    gc.collect()
+    start = time.perf_counter()
+    result = build(facts)
+    elapsed = time.perf_counter() - start
+    del result
+
+    # Memory is measured in a separate run, as tracing slows down pure Python code
+    gc.collect()
+    tracemalloc.start()
+    result = build(facts)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+
+    return elapsed, size
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--hosts', type=int, default=10000, help='Number of hosts')
+    args = parser.parse_args()
+
+    print(f'{"Representation":<16}{"ms / 10k hosts":>16}{"MiB / 10k hosts":>17}')
+    for name, build in (('validated', validated), ('constructed', constructed), ('columnar', columnar)):
+        facts = make_facts(args.hosts)
+        elapsed, size = measure(build, facts)
+        scale = 10000 / args.hosts
+        print(f'{name:<16}{elapsed * 1000 * scale:>16.1f}{size / 2**20 * scale:>17.2f}')
+
+if __name__ == '__main__':
+    main()
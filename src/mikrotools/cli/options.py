@@ -12,6 +12,7 @@ def common_options(func):
     @optgroup.option('-p', '--password', is_flag=True, help='Prompt for password')
     @optgroup.option('-j', '--jump', is_flag=True, help='Use jump host')
     @optgroup.option('-i', '--inventory-file', type=click.Path(exists=True), help='Inventory file')
+    @optgroup.option('--recheck', is_flag=True, help='Connect to hosts cached as unreachable')
     @optgroup.group('Configuration options')
     @optgroup.option('-c', '--config-file', type=click.Path(exists=True), help='Config file')
     @optgroup.option('-d', '--debug', is_flag=True, help='Enable debug mode')
@@ -1,11 +1,13 @@
-from .main import get_config, load_config
+from .main import get_cache_dir, get_config, load_config
 from .configmanager import ConfigManager
-from .models import Config, InventorySourceConfig
+from .models import Config, InventorySourceConfig, TransportProfile
 
 __all__ = [
+    'get_cache_dir',
     'get_config',
     'load_config',
     'Config',
     'ConfigManager',
-    'InventorySourceConfig'
+    'InventorySourceConfig',
+    'TransportProfile'
 ]
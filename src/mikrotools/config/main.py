@@ -6,6 +6,13 @@ from .models import Config
 
 logger = logging.getLogger(__name__)
 
+def get_cache_dir() -> str:
+    """
+    Returns the directory for files persisted between runs, e.g. ~/.cache/mikrotools.
+    """
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache_home, 'mikrotools')
+
 def get_config():
     return ConfigManager.get_instance().config
 
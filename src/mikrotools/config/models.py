@@ -19,22 +19,110 @@ class InventoryConfig(Base):
     hostsFile: str | None = None
 
 class JumpHost(Base):
+    name: str | None = None
     address: str | None = None
     port: int = 22
     username: str | None = None
     password: str | None = None
     keyfile: str | None = None
+    max_channels: int = 10 # Router sessions tunnelled over one jump host connection
+    sites: list[str] = [] # Inventory sites routed through this jump host
+    subnets: list[str] = [] # Router subnets routed through this jump host
+
+class ConcurrencyConfig(Base):
+    initial: int = 32 # Initial number of concurrent connection attempts
+    min: int = 4
+    max: int = 256
+    latency_tolerance: float = 2.0 # A fleet-wide median handshake time above the baseline * tolerance backs off the limit
+
+class RateLimitConfig(Base):
+    rate: float = 0 # New connections per second, 0 disables rate limiting
+    burst: int = 10
+    scope: str = 'global' # global, subnet or site
+    prefix_length: int = 24 # Subnet size for the subnet scope
+
+class TransportProfile(Base):
+    kex_algs: list[str] = [] # Preferred key exchange algorithms, empty keeps library defaults
+    encryption_algs: list[str] = [] # Preferred ciphers
+    mac_algs: list[str] = [] # Preferred MACs
+    compression: bool = False # zlib compression, useful for large text output over slow links
+    window: int | None = None # Channel window size in bytes
+    max_pktsize: int | None = None # Maximum channel packet size in bytes
+    connect_timeout: int = 10 # Seconds
 
 class SSHConfig(Base):
     port: int = 22
     username: str | None = None
     password: str | None = None
     keyfile: str | None = None
+    persistent_channel: bool = False # Reuse one shell channel per connection for all commands
+    keepalive_interval: int = 30 # Seconds, 0 disables keepalives
+    keepalive_count_max: int = 3
+    concurrency: ConcurrencyConfig = ConcurrencyConfig()
+    rate_limit: RateLimitConfig = RateLimitConfig()
+    transport: TransportProfile = TransportProfile()
+    transport_profiles: dict[str, TransportProfile] = {} # Additional named profiles for benchmarking
     jump: bool = False
     jumphost: JumpHost = JumpHost()
+    jumphosts: list[JumpHost] = [] # Takes precedence over jumphost
+
+class APIConfig(Base):
+    enabled: bool = False # Use RouterOS API instead of SSH, exports and exec commands still use SSH
+    port: int | None = None # Defaults to 8728, or 8729 with TLS
+    tls: bool = False
+    verify_tls: bool = False
+
+class PoolConfig(Base):
+    max_connections: int = 100
+    max_sessions_per_host: int = 4 # RouterOS limits concurrent SSH sessions per user
+    idle_timeout: float = 300.0 # Seconds
+    probe_after: float = 60.0 # Seconds of inactivity after which a connection is probed before reuse
+
+class ProbeConfig(Base):
+    enabled: bool = False # Probe SSH/API ports before connecting and skip unreachable hosts
+    timeout: float = 1.0 # Seconds
+    concurrency: int = 1024 # Simultaneous probes
+
+class NegativeCacheConfig(Base):
+    enabled: bool = False # Skip hosts that failed to connect in previous runs
+    path: str | None = None # Defaults to ~/.cache/mikrotools/unreachable.json
+    ttl: float = 300.0 # Seconds a host is skipped after a failure, doubled on every consecutive failure
+    max_ttl: float = 86400.0
+    recheck: bool = False # Connect to cached hosts anyway
+
+class RetryConfig(Base):
+    max_attempts: int = 3 # Attempts per connection or operation, 1 disables retries
+    base_delay: float = 0.5 # Seconds before the first retry, doubled on every attempt
+    max_delay: float = 10.0
+    budget: int = 100 # Maximum number of retries per run
+    breaker_threshold: int = 5 # Consecutive failures after which a host is skipped
+    breaker_reset_timeout: float = 60.0 # Seconds a host is skipped before it's tried again
+
+class TimeoutsConfig(Base):
+    adaptive: bool = False # Derive timeouts from each host's latency history saved between runs
+    factor: float = 3.0 # Timeout is the p99 latency multiplied by this factor
+    connect_min: float = 3.0 # Seconds
+    connect_max: float = 30.0
+    command: float = 20.0 # Command timeout until enough latency history is recorded
+    command_min: float = 10.0
+    command_max: float = 120.0
+    history_path: str | None = None # Defaults to ~/.cache/mikrotools/latency.json
+
+class FactsConfig(Base):
+    enabled: bool = False # Keep the latest facts of every host in a local database
+    path: str | None = None # Defaults to ~/.cache/mikrotools/facts.sqlite3
+    ttl: float = 0.0 # Seconds stored facts are used without contacting the device, 0 always refreshes
+    stale_while_revalidate: bool = False # Show stale facts immediately while they are refreshed
 
 class Config(Base):
     ssh: SSHConfig = SSHConfig()
+    api: APIConfig = APIConfig()
+    pool: PoolConfig = PoolConfig()
+    probe: ProbeConfig = ProbeConfig()
+    negative_cache: NegativeCacheConfig = NegativeCacheConfig()
+    retry: RetryConfig = RetryConfig()
+    timeouts: TimeoutsConfig = TimeoutsConfig()
+    facts: FactsConfig = FactsConfig()
     inventory: InventoryConfig = InventoryConfig()
 
     @classmethod
@@ -1,6 +1,10 @@
 from .common import *
+from .facts import FactStore
+from .fleet import FleetTable
 
 __all__ = [
+    'FactStore',
+    'FleetTable',
     'cleanup_connections',
     'get_mikrotik_host',
     'reboot_addresses',
@@ -1,54 +1,111 @@
 import asyncio
+import logging
 
-from packaging import version
 from rich import print as rprint
 from rich.console import Console
 from rich.prompt import Confirm
 
 from mikrotools.cli.progress import Progress
 
+from .facts import get_fact_store
 from .models import MikrotikHost
 from .models.operations import OperationType
 
 from mikrotools.inventory import InventoryItem
-from mikrotools.netapi import MikrotikManager, AsyncMikrotikManager
+from mikrotools.netapi import MikrotikManager, AsyncMikrotikManager, AsyncMikrotikClient
+from mikrotools.netapi.mikrotik.capabilities import Capabilities
 
 __all__ = [
     'cleanup_connections',
+    'get_device_host',
     'get_mikrotik_host',
     'reboot_addresses',
     'reboot_hosts',
     'reboot_host'
 ]
 
+logger = logging.getLogger(__name__)
+
 def cleanup_connections():
+    # Both managers share the pool, closing it once is enough
     MikrotikManager.close_all()
-    asyncio.run(AsyncMikrotikManager.close_all())
-
-async def get_mikrotik_host(host: InventoryItem) -> MikrotikHost:
-    async with AsyncMikrotikManager.async_session(host) as device:
-        identity = await device.get_identity()
-        pkgupdate = await device.get_system_package_update()
-        routerboard = await device.get_system_routerboard()
-        cpu_load = int(await device.get('/system resource', 'cpu-load'))
-        if version.parse(pkgupdate.installed_version) >= version.parse('7.0'):
-            uptime = await device.get('/system resource', 'uptime as-string')
-        else:
-            uptime = await device.get('/system resource', 'uptime')
-        public_address = await device.get('/ip cloud', 'public-address')
+
+# Properties collected by get_mikrotik_host() in a single batched script,
+# the identity and version are taken from the connection capabilities
+HOST_FACTS_QUERIES: dict[str, tuple[str, str]] = {
+    'latest_routeros_version': ('/system package update', 'latest-version'),
+    'current_firmware_version': ('/system routerboard', 'current-firmware'),
+    'upgrade_firmware_version': ('/system routerboard', 'upgrade-firmware'),
+    'model': ('/system routerboard', 'model'),
+    'cpu_load': ('/system resource', 'cpu-load'),
+    'uptime': ('/system resource', 'uptime as-string'),
+    'public_address': ('/ip cloud', 'public-address'),
+}
+
+async def get_mikrotik_host(host: InventoryItem, use_stored: bool = True) -> MikrotikHost:
+    store = get_fact_store()
+    if store is not None and use_stored:
+        # SQLite queries block, running them off the event loop
+        cached = await asyncio.to_thread(store.get_fresh, host.address)
+        if cached is not None:
+            logger.debug(f'get_mikrotik_host: Using stored facts for {host.address}')
+            return cached
     
-    return MikrotikHost(
-        address=host.address,
-        identity=identity,
-        installed_routeros_version=pkgupdate.installed_version,
-        latest_routeros_version=pkgupdate.latest_version,
-        current_firmware_version=routerboard.current_firmware,
-        upgrade_firmware_version=routerboard.upgrade_firmware,
-        cpu_load=cpu_load,
-        model=routerboard.model,
-        uptime=uptime,
-        public_address=public_address
+    return await AsyncMikrotikManager.run(host, lambda device: get_device_host(device, host.address))
+
+async def get_device_host(device: AsyncMikrotikClient, address: str) -> MikrotikHost:
+    capabilities = await device.get_capabilities()
+    queries = HOST_FACTS_QUERIES
+    if not capabilities.v7:
+        # 'as-string' is RouterOS 7.0+ syntax
+        queries = queries | {'uptime': ('/system resource', 'uptime')}
+    
+    try:
+        facts = await device.get_batch(queries)
+    except RuntimeError as e:
+        # Falling back to per-property gets if the batched script fails
+        logger.debug(f'get_mikrotik_host: Batched facts collection failed '
+                     f'for {address}: {e}')
+        facts = await get_mikrotik_host_facts(device, capabilities)
+    
+    host = MikrotikHost(
+        address=address,
+        identity=capabilities.identity,
+        installed_routeros_version=capabilities.version,
+        latest_routeros_version=facts['latest_routeros_version'] or None,
+        current_firmware_version=facts['current_firmware_version'],
+        upgrade_firmware_version=facts['upgrade_firmware_version'],
+        cpu_load=int(facts['cpu_load']),
+        model=facts['model'],
+        uptime=facts['uptime'],
+        public_address=facts['public_address']
     )
+    
+    store = get_fact_store()
+    if store is not None and store.put(host):
+        await asyncio.to_thread(store.flush)
+    
+    return host
+
+async def get_mikrotik_host_facts(device: AsyncMikrotikClient, capabilities: Capabilities) -> dict[str, str]:
+    pkgupdate = await device.get_system_package_update()
+    routerboard = await device.get_system_routerboard()
+    cpu_load = await device.get('/system resource', 'cpu-load')
+    if capabilities.v7:
+        uptime = await device.get('/system resource', 'uptime as-string')
+    else:
+        uptime = await device.get('/system resource', 'uptime')
+    public_address = await device.get('/ip cloud', 'public-address')
+    
+    return {
+        'latest_routeros_version': pkgupdate.latest_version,
+        'current_firmware_version': routerboard.current_firmware,
+        'upgrade_firmware_version': routerboard.upgrade_firmware,
+        'model': routerboard.model,
+        'cpu_load': cpu_load,
+        'uptime': uptime,
+        'public_address': public_address,
+    }
 
 async def reboot_addresses(items: list[InventoryItem]) -> None:
     print('The following hosts will be rebooted:')
@@ -106,4 +163,9 @@ async def reboot_host(host: MikrotikHost) -> MikrotikHost:
     async with AsyncMikrotikManager.async_session(InventoryItem(address=host.address)) as device:
         await device.execute_command_raw('/system reboot')
     
+    store = get_fact_store()
+    if store is not None:
+        # The stored uptime is no longer valid
+        await asyncio.to_thread(store.invalidate, host.address)
+    
     return host
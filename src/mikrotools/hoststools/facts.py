@@ -0,0 +1,350 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from mikrotools.config import Config, get_cache_dir
+
+from .fleet import FleetTable, version_key
+from .models import MikrotikHost
+
+logger = logging.getLogger(__name__)
+
+# SQLite limits the number of parameters of a single statement
+QUERY_CHUNK_SIZE = 500
+# Fields the store keeps indexed columns for, and the MikrotikHost fields they hold
+INDEXED_COLUMNS = {
+    'version': 'installed_routeros_version',
+    'model': 'model',
+    'firmware': 'current_firmware_version',
+}
+# Columns kept next to the JSON data, so queries read them without validating the facts
+FACT_COLUMNS = ('identity', 'version', 'version_order', 'model', 'firmware')
+
+def version_order(version: str | None) -> int | None:
+    """
+    Pack version_key() of a RouterOS version into a single integer with the same order.
+    """
+    key = version_key(version)
+    if key is None:
+        return None
+    major, minor, patch, stage, number = (min(part, 9999) for part in key)
+
+    return (((major * 10000 + minor) * 10000 + patch) * 10 + stage) * 10000 + number
+
+def _fact_columns(host: MikrotikHost) -> tuple[str | None, str | None, int | None, str | None, str | None]:
+    return (
+        host.identity,
+        host.installed_routeros_version,
+        version_order(host.installed_routeros_version),
+        host.model,
+        host.current_firmware_version
+    )
+
+class FactStore:
+    """
+    An on-disk store of the latest MikrotikHost facts of every address, backed by SQLite.
+
+    Writes are buffered and committed in a single transaction by flush(), so collecting
+    facts from thousands of routers doesn't wait for a commit per host. Reads include
+    pending writes. Methods accessing the database block, async callers run them with
+    asyncio.to_thread() to keep the event loop responsive.
+    """
+    def __init__(self, path: str | None = None, ttl: float = 0.0, batch_size: int = 500):
+        """
+        Initialize the store. The database is opened on first use.
+
+        Args:
+            path: The database file, defaults to ~/.cache/mikrotools/facts.sqlite3.
+            ttl: Seconds stored facts are used without contacting the device, 0 disables reads.
+            batch_size: Number of pending writes after which put() asks for a flush.
+        """
+        self.path = path or os.path.join(get_cache_dir(), 'facts.sqlite3')
+        self.ttl = ttl
+        self.batch_size = batch_size
+        self._db: sqlite3.Connection | None = None
+        # address: (data, updated, *FACT_COLUMNS)
+        self._pending: dict[str, tuple] = {}
+        # The store is used from the event loop thread and closed from the main thread
+        self._lock = threading.Lock()
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        if self._db is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            # WAL lets concurrent runs read while another one writes
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.execute('PRAGMA synchronous=NORMAL')
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS facts ('
+                'address TEXT PRIMARY KEY, data TEXT NOT NULL, updated REAL NOT NULL, '
+                'identity TEXT, version TEXT, version_order INTEGER, model TEXT, firmware TEXT)'
+            )
+            self._migrate()
+            with self._db:
+                for column in ('version_order', 'model', 'firmware'):
+                    self._db.execute(f'CREATE INDEX IF NOT EXISTS facts_{column} ON facts ({column})')
+        return self._db
+
+    def _migrate(self) -> None:
+        # Stores created before the indexed columns are filled from the stored facts once
+        columns = {row[1] for row in self._db.execute('PRAGMA table_info(facts)')}
+        missing = [column for column in FACT_COLUMNS if column not in columns]
+        if not missing:
+            return
+
+        with self._db:
+            for column in missing:
+                kind = 'INTEGER' if column == 'version_order' else 'TEXT'
+                self._db.execute(f'ALTER TABLE facts ADD COLUMN {column} {kind}')
+            rows = self._db.execute('SELECT address, data FROM facts').fetchall()
+            self._db.executemany(
+                f'UPDATE facts SET {", ".join(f"{column} = ?" for column in FACT_COLUMNS)} WHERE address = ?',
+                [(*_fact_columns(MikrotikHost.model_validate_json(data)), address) for address, data in rows]
+            )
+        logger.info(f'Indexed stored facts of {len(rows)} hosts')
+
+    def get(self, address: str) -> tuple[MikrotikHost, float] | None:
+        """
+        Return the stored facts of an address and their age in seconds.
+        """
+        return self.get_many([address]).get(address)
+
+    def get_many(self, addresses: list[str]) -> dict[str, tuple[MikrotikHost, float]]:
+        """
+        Return the stored facts and their age in seconds for every known address.
+        """
+        rows: dict[str, tuple[str, float]] = {}
+        with self._lock:
+            try:
+                for start in range(0, len(addresses), QUERY_CHUNK_SIZE):
+                    chunk = addresses[start:start + QUERY_CHUNK_SIZE]
+                    cursor = self.db.execute(
+                        f'SELECT address, data, updated FROM facts WHERE address IN ({", ".join("?" * len(chunk))})',
+                        chunk
+                    )
+                    rows.update((address, (data, updated)) for address, data, updated in cursor)
+            except sqlite3.Error as e:
+                logger.warning(f'Failed to read fact store {self.path}: {e}')
+            rows.update((address, self._pending[address][:2]) for address in addresses if address in self._pending)
+
+        now = time.time()
+        return {
+            address: (MikrotikHost.model_validate_json(data), now - updated)
+            for address, (data, updated) in rows.items()
+        }
+
+    def count(self) -> int:
+        """
+        Return the number of stored hosts.
+        """
+        self.flush()
+        with self._lock:
+            try:
+                return self.db.execute('SELECT COUNT(*) FROM facts').fetchone()[0]
+            except sqlite3.Error as e:
+                logger.warning(f'Failed to read fact store {self.path}: {e}')
+                return 0
+
+    def select(
+        self,
+        at_least: str | None = None,
+        below: str | None = None,
+        models: list[str] | None = None,
+        firmware: list[str] | None = None
+    ) -> FleetTable:
+        """
+        Return the stored hosts matching all given conditions.
+
+        Only the indexed columns are read, hosts in the returned table have the
+        address, identity, installed version, model and firmware set.
+
+        Args:
+            at_least: Minimum installed RouterOS version. Optional.
+            below: Installed RouterOS version upper bound, exclusive. Optional.
+            models: Models to match any of. Optional.
+            firmware: Current firmware versions to match any of. Optional.
+
+        Raises:
+            ValueError: If a version can't be parsed.
+        """
+        where, params = self._where(at_least, below, models, firmware)
+        self.flush()
+        table = FleetTable()
+        with self._lock:
+            try:
+                cursor = self.db.execute(
+                    f'SELECT address, identity, version, model, firmware FROM facts{where}', params
+                )
+                for address, identity, version, model, current_firmware in cursor:
+                    table.set(MikrotikHost.model_construct(
+                        address=address,
+                        identity=identity,
+                        installed_routeros_version=version,
+                        model=model,
+                        current_firmware_version=current_firmware
+                    ))
+            except sqlite3.Error as e:
+                logger.warning(f'Failed to read fact store {self.path}: {e}')
+
+        return table
+
+    def count_by(
+        self,
+        field: str,
+        at_least: str | None = None,
+        below: str | None = None,
+        models: list[str] | None = None,
+        firmware: list[str] | None = None
+    ) -> list[tuple[str | None, int]]:
+        """
+        Count the stored hosts matching all given conditions by an indexed field, see select().
+
+        Returns:
+            (value, count) pairs, ordered by version for 'version' and by count otherwise.
+
+        Raises:
+            ValueError: If a version can't be parsed.
+        """
+        if field not in INDEXED_COLUMNS:
+            raise ValueError(f'Unknown field: {field}')
+        where, params = self._where(at_least, below, models, firmware)
+        self.flush()
+        with self._lock:
+            try:
+                counts = self.db.execute(
+                    f'SELECT {field}, COUNT(*) FROM facts{where} GROUP BY {field}', params
+                ).fetchall()
+            except sqlite3.Error as e:
+                logger.warning(f'Failed to read fact store {self.path}: {e}')
+                counts = []
+
+        if field == 'version':
+            # Unknown versions last
+            return sorted(counts, key=lambda item: (version_key(item[0]) is None, version_key(item[0]) or ()))
+        return sorted(counts, key=lambda item: (-item[1], item[0] or ''))
+
+    @staticmethod
+    def _where(
+        at_least: str | None,
+        below: str | None,
+        models: list[str] | None,
+        firmware: list[str] | None
+    ) -> tuple[str, list]:
+        conditions: list[str] = []
+        params: list = []
+        for version, op in ((at_least, '>='), (below, '<')):
+            if version is None:
+                continue
+            order = version_order(version)
+            if order is None:
+                raise ValueError(f'Invalid version: {version}')
+            # Hosts with an unknown version never match, as NULL isn't comparable
+            conditions.append(f'version_order {op} ?')
+            params.append(order)
+        for column, values in (('model', models), ('firmware', firmware)):
+            if values:
+                conditions.append(f'{column} IN ({", ".join("?" * len(values))})')
+                params.extend(values)
+
+        return (f' WHERE {" AND ".join(conditions)}' if conditions else ''), params
+
+    def get_fresh(self, address: str) -> MikrotikHost | None:
+        """
+        Return the stored facts of an address if they are younger than the TTL.
+        """
+        if self.ttl <= 0:
+            return None
+        cached = self.get(address)
+        if cached is None or cached[1] >= self.ttl:
+            return None
+        return cached[0]
+
+    def put(self, host: MikrotikHost) -> bool:
+        """
+        Store the facts of a host. The write is committed with the next flush().
+
+        Returns:
+            True if batch_size writes are pending and should be flushed.
+        """
+        data = host.model_dump_json(exclude={'port', 'username', 'password', 'keyfile'})
+        with self._lock:
+            self._pending[host.address] = (data, time.time(), *_fact_columns(host))
+            return len(self._pending) >= self.batch_size
+
+    def invalidate(self, address: str) -> None:
+        """
+        Forget the facts of an address, e.g. after an upgrade changed its versions.
+        """
+        with self._lock:
+            self._pending.pop(address, None)
+            try:
+                with self.db:
+                    self.db.execute('DELETE FROM facts WHERE address = ?', (address,))
+            except sqlite3.Error as e:
+                logger.warning(f'Failed to update fact store {self.path}: {e}')
+
+    def flush(self) -> None:
+        """
+        Commit pending writes.
+        """
+        with self._lock:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._pending:
+            return
+        try:
+            with self.db:
+                self.db.executemany(
+                    f'INSERT OR REPLACE INTO facts (address, data, updated, {", ".join(FACT_COLUMNS)}) '
+                    f'VALUES ({", ".join("?" * (3 + len(FACT_COLUMNS)))})',
+                    [(address, *row) for address, row in self._pending.items()]
+                )
+        except sqlite3.Error as e:
+            # Keeping the facts, they're written with the next flush
+            logger.error(f'Failed to save facts of {len(self._pending)} hosts to {self.path}: {e}')
+            return
+        logger.debug(f'Saved facts of {len(self._pending)} hosts')
+        self._pending.clear()
+
+    def close(self) -> None:
+        """
+        Commit pending writes and close the database.
+        """
+        self.flush()
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+_store: FactStore | None = None
+_stale_while_revalidate = False
+
+def configure_fact_store(config: Config) -> None:
+    global _store, _stale_while_revalidate
+
+    if _store is not None:
+        _store.close()
+    _store = None
+    _stale_while_revalidate = config.facts.stale_while_revalidate
+    if config.facts.enabled:
+        _store = FactStore(path=config.facts.path, ttl=config.facts.ttl)
+
+def get_fact_store() -> FactStore | None:
+    """
+    Return the configured fact store, or None if storing facts is disabled.
+    """
+    return _store
+
+def stale_while_revalidate() -> bool:
+    """
+    Whether stored facts older than the TTL are shown while they are refreshed.
+    """
+    return _store is not None and _stale_while_revalidate
+
+def close_fact_store() -> None:
+    if _store is not None:
+        _store.close()
@@ -0,0 +1,154 @@
+import re
+import sys
+
+from collections.abc import Iterator
+from ipaddress import ip_address
+
+from mikrotools.netapi.mikrotik.filters import Filter
+
+from .models import MikrotikHost
+
+# MikrotikHost fields kept for every host
+FLEET_COLUMNS = (
+    'address',
+    'identity',
+    'installed_routeros_version',
+    'latest_routeros_version',
+    'current_firmware_version',
+    'upgrade_firmware_version',
+    'cpu_load',
+    'model',
+    'uptime',
+    'public_address',
+)
+# Columns with few distinct values across a fleet, their strings are shared between rows
+INTERNED_COLUMNS = frozenset({
+    'installed_routeros_version',
+    'latest_routeros_version',
+    'current_firmware_version',
+    'upgrade_firmware_version',
+    'model',
+})
+
+VERSION_KEY_PATTERN = re.compile(r'(\d+)(?:\.(\d+))?(?:\.(\d+))?(?:(alpha|beta|rc)(\d+))?')
+# Pre-releases sort before the release, e.g. 7.16beta2 < 7.16rc1 < 7.16
+PRERELEASE_STAGES = {'alpha': 0, 'beta': 1, 'rc': 2}
+RELEASE_STAGE = 3
+
+def version_key(version: str | None) -> tuple[int, int, int, int, int] | None:
+    """
+    Convert a RouterOS version to a sortable tuple of integers, e.g. (7, 16, 0, 2, 1) for '7.16rc1'.
+    Returns None if the version can't be parsed.
+    """
+    if not version:
+        return None
+    match = VERSION_KEY_PATTERN.match(version.strip())
+    if match is None:
+        return None
+    major, minor, patch, stage, number = match.groups()
+
+    return (
+        int(major),
+        int(minor or 0),
+        int(patch or 0),
+        PRERELEASE_STAGES[stage] if stage else RELEASE_STAGE,
+        int(number or 0)
+    )
+
+def address_key(address: str) -> tuple[int, int, int] | tuple[int, str]:
+    """
+    Convert a host address to a sortable tuple. IPv4 addresses sort first, then IPv6
+    addresses, then hostnames in alphabetical order.
+    """
+    try:
+        parsed = ip_address(address)
+    except ValueError:
+        return (1, address.lower())
+    return (0, parsed.version, int(parsed))
+
+class FleetTable:
+    """
+    Columnar container of host facts for bulk views of large fleets.
+
+    Every property is kept in its own list instead of a MikrotikHost object per
+    host, avoiding per-object overhead for tens of thousands of hosts. Rows are
+    indexed by address, setting a row for a known address replaces it.
+    """
+    __slots__ = ('columns', 'failed', 'errors', '_index', '_address_keys')
+
+    def __init__(self):
+        self.columns: dict[str, list] = {name: [] for name in FLEET_COLUMNS}
+        self.failed: list[bool] = []
+        self.errors: list[str | None] = []
+        self._index: dict[str, int] = {}
+        # Addresses as integers, parsed once for sorting
+        self._address_keys: list[tuple[int, int, int] | tuple[int, str]] = []
+
+    def __len__(self) -> int:
+        return len(self.failed)
+
+    def __contains__(self, address: str) -> bool:
+        return address in self._index
+
+    def set(self, host: MikrotikHost, failed: bool = False, error: str | None = None) -> int:
+        """
+        Add or replace the row of a host.
+
+        Args:
+            host: The host facts. Only FLEET_COLUMNS are kept, the object isn't referenced.
+            failed: Whether collecting the facts failed.
+            error: The error message if failed.
+
+        Returns:
+            The index of the row.
+        """
+        index = self._index.get(host.address)
+        if index is None:
+            index = self._index[host.address] = len(self.failed)
+            self._address_keys.append(address_key(host.address))
+            for name, column in self.columns.items():
+                value = getattr(host, name)
+                column.append(sys.intern(value) if name in INTERNED_COLUMNS and value is not None else value)
+            self.failed.append(failed)
+            self.errors.append(error)
+        else:
+            for name, column in self.columns.items():
+                value = getattr(host, name)
+                column[index] = sys.intern(value) if name in INTERNED_COLUMNS and value is not None else value
+            self.failed[index] = failed
+            self.errors[index] = error
+
+        return index
+
+    def host(self, index: int) -> MikrotikHost:
+        """
+        Return the host of a row.
+        """
+        return MikrotikHost(**{name: column[index] for name, column in self.columns.items()})
+
+    def rows(self, indices: list[int] | None = None) -> Iterator[tuple[MikrotikHost, bool, str | None]]:
+        """
+        Iterate over (host, failed, error) tuples of the given rows, all rows by default.
+        """
+        for index in range(len(self)) if indices is None else indices:
+            yield self.host(index), self.failed[index], self.errors[index]
+
+    def sorted_by_address(self) -> list[int]:
+        """
+        Return row indices ordered by address, see address_key().
+        """
+        return sorted(range(len(self)), key=self._address_keys.__getitem__)
+
+    def select(self, filters: Filter) -> list[int]:
+        """
+        Return indices of the rows matching a filter, evaluated over whole columns.
+        Filter fields are column names with dashes, e.g. 'installed-routeros-version'.
+        """
+        columns = {}
+        for field in filters.fields():
+            column = self.columns.get(field.replace('-', '_'))
+            if column is not None:
+                columns[field] = [None if value is None else str(value) for value in column]
+        mask = filters.mask(columns, len(self))
+
+        return [index for index, matches in enumerate(mask) if matches]
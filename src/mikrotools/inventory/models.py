@@ -5,3 +5,4 @@ class InventoryItem(BaseModel):
     address: str
     name: str | None = None
     description: str | None = None
+    site: str | None = None
@@ -19,13 +19,20 @@ class NetboxInventorySource(InventorySource):
 
         if self.filters is not None:
             hosts.extend(
-                InventoryItem(address=device.primary_ip4.address.split("/")[0])
+                self._to_item(device)
                 for device in nb.dcim.devices.filter(**self.filters)
             )
         else:
             hosts.extend(
-                InventoryItem(address=device.primary_ip4.address.split("/")[0])
+                self._to_item(device)
                 for device in nb.dcim.devices.all()
             )
         
         return hosts
+    
+    def _to_item(self, device) -> InventoryItem:
+        return InventoryItem(
+            address=device.primary_ip4.address.split("/")[0],
+            name=device.name,
+            site=device.site.slug if device.site else None
+        )
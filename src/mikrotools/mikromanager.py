@@ -8,11 +8,12 @@ from functools import wraps
 from mikrotools.cli.utils import cli, load_plugins
 from mikrotools.config import InventorySourceConfig
 from .config import load_config
-from .netapi import MikrotikManager, AsyncMikrotikManager
+from .hoststools.facts import configure_fact_store
+from .netapi import MikrotikManager
 
 def mikromanager_init(f):
     @wraps(f)
-    def wrapper(port, user, password, config_file, inventory_file, jump, *args, **kwargs):
+    def wrapper(port, user, password, config_file, inventory_file, jump, recheck, *args, **kwargs):
         logger = logging.getLogger(__name__)
         try:
             config = load_config(config_file)
@@ -34,12 +35,14 @@ def mikromanager_init(f):
             ]
         if jump:
             config.ssh.jump = True
+        if recheck:
+            config.negative_cache.recheck = True
         
         logger.debug(f'Config after applying command line options: {config}')
         
-        # Configuring MikrotikManager
+        # Configuring MikrotikManager, which also configures the AsyncMikrotikManager it wraps
         MikrotikManager.configure(config)
-        AsyncMikrotikManager.configure(config)
+        configure_fact_store(config)
         
         return f(*args, **kwargs)
     
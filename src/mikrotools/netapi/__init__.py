@@ -1,9 +1,11 @@
-from .mikrotik import MikrotikSSHClient, AsyncMikrotikSSHClient
+from .mikrotik import MikrotikSSHClient, AsyncMikrotikSSHClient, AsyncMikrotikAPIClient, AsyncMikrotikClient
 from .mikrotik import MikrotikManager, AsyncMikrotikManager
 
 __all__ = [
     'MikrotikSSHClient',
     'MikrotikManager',
+    'AsyncMikrotikAPIClient',
+    'AsyncMikrotikClient',
     'AsyncMikrotikSSHClient',
     'AsyncMikrotikManager'
 ]
@@ -1,9 +1,12 @@
+from .api import AsyncMikrotikAPIClient
 from .client import MikrotikSSHClient, AsyncMikrotikSSHClient
-from .manager import MikrotikManager, AsyncMikrotikManager
+from .manager import MikrotikManager, AsyncMikrotikManager, AsyncMikrotikClient
 
 __all__ = [
     'MikrotikSSHClient',
     'MikrotikManager',
+    'AsyncMikrotikAPIClient',
+    'AsyncMikrotikClient',
     'AsyncMikrotikSSHClient',
     'AsyncMikrotikManager'
 ]
@@ -0,0 +1,712 @@
+import asyncio
+import logging
+import shlex
+import socket
+import ssl
+import time
+
+from collections.abc import AsyncIterator, Callable
+from dataclasses import dataclass, field
+from itertools import count
+from typing import TypeVar
+
+from .capabilities import Capabilities, detect_capabilities
+from .filters import Filter
+from .jumphost import JumpHostPool, JumpRoute
+from .models import *
+from .models.base import MikrotikBase
+from .script import RowResult
+
+logger = logging.getLogger(__name__)
+
+M = TypeVar('M', bound=MikrotikBase)
+
+API_PORT = 8728
+API_TLS_PORT = 8729
+
+class APIError(RuntimeError):
+    """An error reported by the router in a !trap or !fatal reply."""
+
+# Sentence encoding
+
+def encode_length(length: int) -> bytes:
+    """
+    Encode a word length using the RouterOS API variable-length encoding.
+
+    Args:
+        length: The length of the word.
+
+    Returns:
+        The encoded length as bytes.
+    """
+    if length < 0x80:
+        return length.to_bytes(1, 'big')
+    elif length < 0x4000:
+        return (length | 0x8000).to_bytes(2, 'big')
+    elif length < 0x200000:
+        return (length | 0xC00000).to_bytes(3, 'big')
+    elif length < 0x10000000:
+        return (length | 0xE0000000).to_bytes(4, 'big')
+    else:
+        return b'\xf0' + length.to_bytes(4, 'big')
+
+def encode_sentence(words: list[str]) -> bytes:
+    """
+    Encode a sentence (a list of words terminated by an empty word).
+
+    Args:
+        words: The words of the sentence.
+
+    Returns:
+        The encoded sentence as bytes.
+    """
+    data = bytearray()
+    for word in words:
+        encoded = word.encode()
+        data += encode_length(len(encoded))
+        data += encoded
+    data += b'\x00'
+
+    return bytes(data)
+
+async def read_length(reader: asyncio.StreamReader) -> int:
+    """
+    Read and decode a word length from the stream.
+
+    Args:
+        reader: The stream to read from.
+
+    Returns:
+        The decoded length.
+    """
+    first = (await reader.readexactly(1))[0]
+    if first & 0x80 == 0x00:
+        return first
+    elif first & 0xC0 == 0x80:
+        extra = await reader.readexactly(1)
+        return int.from_bytes(bytes([first & ~0xC0]) + extra, 'big')
+    elif first & 0xE0 == 0xC0:
+        extra = await reader.readexactly(2)
+        return int.from_bytes(bytes([first & ~0xE0]) + extra, 'big')
+    elif first & 0xF0 == 0xE0:
+        extra = await reader.readexactly(3)
+        return int.from_bytes(bytes([first & ~0xF0]) + extra, 'big')
+    elif first == 0xF0:
+        return int.from_bytes(await reader.readexactly(4), 'big')
+    else:
+        raise APIError(f'Invalid word length prefix: {first:#x}')
+
+async def read_sentence(reader: asyncio.StreamReader) -> list[str]:
+    """
+    Read a single sentence from the stream.
+
+    Args:
+        reader: The stream to read from.
+
+    Returns:
+        The words of the sentence without the terminating empty word.
+    """
+    words = []
+    while True:
+        length = await read_length(reader)
+        if length == 0:
+            return words
+        words.append((await reader.readexactly(length)).decode(errors='replace'))
+
+def parse_attributes(words: list[str]) -> dict[str, str]:
+    """
+    Parse attribute words (=key=value) of a reply sentence into a dictionary.
+
+    Args:
+        words: The words of the sentence excluding the reply word.
+
+    Returns:
+        A dictionary of attributes. API attributes (.tag etc.) are not included.
+    """
+    attributes = {}
+    for word in words:
+        if word.startswith('='):
+            key, _, value = word[1:].partition('=')
+            attributes[key] = value
+
+    return attributes
+
+def command_to_words(command: str) -> list[str]:
+    """
+    Convert a RouterOS CLI command into API sentence words.
+
+    For example '/system package update check-for-updates' becomes
+    ['/system/package/update/check-for-updates'] and
+    '/ip address add address=10.0.0.1/24 interface=ether1' becomes
+    ['/ip/address/add', '=address=10.0.0.1/24', '=interface=ether1'].
+
+    Args:
+        command: The CLI command to convert.
+
+    Returns:
+        The list of API words.
+
+    Raises:
+        ValueError: If the command can't be expressed as an API sentence.
+    """
+    tokens = shlex.split(command.strip())
+    if not tokens or not tokens[0].startswith('/'):
+        raise ValueError(f'Only menu commands are supported over the API: {command}')
+
+    path = []
+    arguments = []
+    for token in tokens:
+        if '=' in token:
+            arguments.append(f'={token}')
+        elif arguments:
+            raise ValueError(f'Positional arguments are not supported over the API: {command}')
+        else:
+            path.extend(part for part in token.split('/') if part)
+
+    return ['/' + '/'.join(path)] + arguments
+
+def path_to_api(path: str) -> str:
+    """
+    Convert a RouterOS CLI menu path ('/system package update') into API form
+    ('/system/package/update').
+    """
+    return '/' + '/'.join(part for part in path.replace(' ', '/').split('/') if part)
+
+@dataclass
+class APIResponse:
+    replies: list[dict[str, str]] = field(default_factory=list)
+    done: dict[str, str] = field(default_factory=dict)
+    trap: dict[str, str] | None = None
+
+class AsyncMikrotikAPIClient():
+    """
+    Asynchronous client for the native RouterOS API (8728/tcp, 8729/tcp with TLS).
+
+    Every request is tagged, so several requests can be pipelined over a single
+    connection by awaiting them concurrently.
+
+    Only menu commands with named arguments can be executed, see command_to_words().
+    Exports, scripts and other CLI-only commands need an SSH session, which
+    AsyncMikrotikManager opens for them when asked with cli=True.
+    """
+    def __init__(
+        self,
+        host: str,
+        username: str,
+        password: str = None,
+        keyfile: str = None,
+        port: int | None = None,
+        tls: bool = False,
+        verify_tls: bool = False,
+        jump: JumpHostPool | JumpRoute | None = None
+    ):
+        if tls and jump is not None:
+            raise ValueError('TLS connections to the RouterOS API through a jump host are not supported')
+        self._host = host
+        self._port = port or (API_TLS_PORT if tls else API_PORT)
+        self._username = username
+        self._password = password
+        self._keyfile = keyfile
+        self._tls = tls
+        self._verify_tls = verify_tls
+        self._jump = jump
+        self._tunnel = None
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._reader_task: asyncio.Task | None = None
+        self._tags = count()
+        self._pending: dict[str, tuple[APIResponse, asyncio.Future]] = {}
+        self._connect_timeout = 10
+        # Seconds to wait for a response, adjusted by the manager from the host's latency history
+        self.command_timeout: float = 20
+        # Called with the duration of every successful request
+        self.latency_observer: Callable[[float], None] | None = None
+        # Seconds the last connect() spent in the handshake, without waiting for a jump host
+        self.handshake_time: float | None = None
+        # Detected once per connection, see get_capabilities()
+        self._capabilities: Capabilities | None = None
+        self._connected = False
+
+    async def connect(self, timeout: int = 10) -> None:
+        self._connect_timeout = timeout
+        if self._password is None:
+            raise Exception('RouterOS API requires password authentication')
+
+        ssl_context = None
+        if self._tls:
+            ssl_context = ssl.create_default_context()
+            if not self._verify_tls:
+                ssl_context.check_hostname = False
+                ssl_context.verify_mode = ssl.CERT_NONE
+
+        if self._jump is not None:
+            # Tunnelling the API connection as a channel over a shared jump host connection
+            self._tunnel = await self._jump.acquire(timeout)
+            start = time.monotonic()
+            try:
+                self._reader, self._writer = await asyncio.wait_for(
+                    self._tunnel.open_connection(self._host, self._port),
+                    timeout=timeout
+                )
+            except BaseException:
+                await self._release_tunnel()
+                raise
+        else:
+            start = time.monotonic()
+            self._reader, self._writer = await asyncio.wait_for(
+                asyncio.open_connection(self._host, self._port, ssl=ssl_context),
+                timeout=timeout
+            )
+        # Letting the OS detect silently dropped connections
+        sock = self._writer.get_extra_info('socket')
+        if sock is not None:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        self._reader_task = asyncio.create_task(self._read_loop())
+        self._connected = True
+
+        try:
+            await self.talk(
+                ['/login', f'=name={self._username}', f'=password={self._password}'],
+                timeout=timeout
+            )
+        except Exception:
+            await self.disconnect()
+            raise
+        self.handshake_time = time.monotonic() - start
+
+    async def disconnect(self) -> None:
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+            self._reader_task = None
+        if self._writer is not None:
+            try:
+                self._writer.close()
+                await self._writer.wait_closed()
+            except Exception:
+                pass
+        self._fail_pending(ConnectionError('Connection closed'))
+        self._capabilities = None
+        self._connected = False
+        self._reader = None
+        self._writer = None
+        await self._release_tunnel()
+
+    async def _release_tunnel(self) -> None:
+        if self._tunnel is not None:
+            tunnel, self._tunnel = self._tunnel, None
+            await self._jump.release(tunnel)
+
+    async def reconnect(self) -> None:
+        """
+        Closes the current connection and connects to the host again.
+        """
+        logger.debug(f'Reconnecting to {self._host}')
+        await self.disconnect()
+        await self.connect(self._connect_timeout)
+
+    async def ping(self, timeout: float = 5) -> bool:
+        """
+        Checks that the connection is alive with a minimal request.
+
+        Returns:
+            True if the router responded in time, False otherwise.
+        """
+        if not self.is_connected:
+            return False
+
+        try:
+            await self.talk(['/system/identity/print', '=.proplist=name'], timeout=timeout)
+        except Exception as e:
+            logger.debug(f'Liveness probe for {self._host} failed: {e!r}')
+            return False
+
+        return True
+
+    @property
+    def is_connected(self) -> bool:
+        return self._connected
+
+    def _fail_pending(self, exc: Exception) -> None:
+        for _, future in self._pending.values():
+            if not future.done():
+                future.set_exception(exc)
+        self._pending.clear()
+
+    async def _read_loop(self) -> None:
+        """
+        Reads reply sentences and dispatches them to pending requests by their tag.
+        """
+        try:
+            while True:
+                sentence = await read_sentence(self._reader)
+                if not sentence:
+                    continue
+
+                reply, words = sentence[0], sentence[1:]
+                tag = next((word[5:] for word in words if word.startswith('.tag=')), None)
+
+                if reply == '!fatal':
+                    raise APIError(f'Fatal error: {" ".join(words)}')
+                if tag not in self._pending:
+                    logger.debug(f'Unexpected API reply for tag {tag}: {sentence}')
+                    continue
+
+                response, future = self._pending[tag]
+                if reply == '!re':
+                    response.replies.append(parse_attributes(words))
+                elif reply == '!trap':
+                    response.trap = parse_attributes(words)
+                elif reply == '!done':
+                    response.done = parse_attributes(words)
+                    del self._pending[tag]
+                    if not future.done():
+                        future.set_result(response)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.debug(f'API connection to {self._host} closed: {e}')
+            self._connected = False
+            self._fail_pending(e if isinstance(e, APIError) else ConnectionError(str(e)))
+
+    async def talk(self, words: list[str], timeout: float | None = None) -> APIResponse:
+        """
+        Send a sentence to the router and wait for the complete response.
+
+        Args:
+            words: The words of the sentence, starting with the command.
+            timeout: Seconds to wait for the response, defaults to command_timeout.
+
+        Returns:
+            The response containing all !re replies and the !done attributes.
+
+        Raises:
+            ConnectionError: If not connected to the host
+            APIError: If the router replies with !trap
+        """
+        if not self._connected:
+            raise ConnectionError('Not connected to host')
+
+        tag = str(next(self._tags))
+        future = asyncio.get_running_loop().create_future()
+        self._pending[tag] = (APIResponse(), future)
+
+        logger.debug(f'Sending API sentence: {words[0]} (tag {tag})')
+        start = time.monotonic()
+        self._writer.write(encode_sentence(words + [f'.tag={tag}']))
+        await self._writer.drain()
+
+        try:
+            response = await asyncio.wait_for(future, timeout=timeout or self.command_timeout)
+        except TimeoutError:
+            self._pending.pop(tag, None)
+            raise
+
+        if response.trap is not None:
+            raise APIError(f'Error executing command: {response.trap.get("message", response.trap)}')
+        if self.latency_observer is not None:
+            self.latency_observer(time.monotonic() - start)
+
+        return response
+
+    async def execute_command_raw(self, command: str) -> str:
+        """
+        Asynchronously execute a CLI command on the Mikrotik device over the API
+        and return its output as a raw string.
+
+        :param command: The command to execute
+        :return: The output of the command
+        :raises: ConnectionError if not connected to the host
+                APIError if the command execution fails
+                ValueError if the command can't be executed over the API
+        """
+        response = await self.talk(command_to_words(command))
+
+        lines = [format_attributes(reply) for reply in response.replies]
+        if 'ret' in response.done:
+            lines.append(response.done['ret'])
+
+        return '\n'.join(lines)
+
+    async def execute_command(self, command: str) -> list[str]:
+        """
+        Execute a command on the Mikrotik device and return its output as a list of strings.
+
+        :param command: The command to execute
+        :return: The output of the command
+        :raises: ConnectionError if not connected to the host
+             APIError if the command execution fails
+        """
+        response = await self.execute_command_raw(command)
+
+        output = response.strip().split('\n')
+
+        return [line.strip() for line in output if line.strip()]
+
+    async def stream_command(self, command: str, raw: bool = False, lines: bool = False, chunk_size: int = 65536) -> AsyncIterator[str | bytes]:
+        """
+        Execute a command on the Mikrotik device and yield its output.
+
+        Provided for compatibility with AsyncMikrotikSSHClient. API replies are
+        delivered as complete sentences, so the output is yielded once the command
+        is done.
+
+        :param command: The command to execute
+        :param raw: Yield raw bytes instead of decoded strings
+        :param lines: Yield complete lines instead of a single chunk
+        :param chunk_size: Ignored
+        :return: An async iterator over output chunks or lines
+        """
+        output = await self.execute_command_raw(command)
+        chunks = output.splitlines(keepends=True) if lines else [output]
+        for chunk in chunks:
+            yield chunk.encode() if raw else chunk
+
+    async def print(self, path: str, props: list[str] | None = None, filters: Filter | None = None) -> list[dict[str, str]]:
+        """
+        Retrieves items of a menu.
+
+        Args:
+            path: The menu path in CLI or API form
+            props: Properties to retrieve. Optional, all properties are retrieved by default.
+            filters: Filter to apply on the router. Optional.
+
+        Returns:
+            A list of dictionaries with properties of each item.
+        """
+        words = [f'{path_to_api(path)}/print']
+        if props:
+            words.append(f'=.proplist={",".join(props)}')
+        if filters is not None:
+            words.extend(filters.to_api())
+
+        try:
+            response = await self.talk(words)
+        except ConnectionError as e:
+            # Print is idempotent, so it's safe to retry on a new connection
+            logger.debug(f'Connection to {self._host} lost while reading: {e!r}')
+            await self.reconnect()
+            response = await self.talk(words)
+
+        return response.replies
+
+    async def stream_table(
+        self,
+        path: str,
+        filters: Filter | None = None,
+        props: list[str] | None = None,
+        model: type[M] | None = None
+    ) -> AsyncIterator[dict[str, str] | M]:
+        """
+        Retrieves the rows of a menu with a single print command, see get_table().
+        """
+        for row in await self.print(path, props=props, filters=filters):
+            yield model.model_validate(row) if model is not None else row
+
+    async def get_table(
+        self,
+        path: str,
+        filters: Filter | None = None,
+        props: list[str] | None = None,
+        model: type[M] | None = None
+    ) -> list[dict[str, str] | M]:
+        """
+        Retrieves the rows of a menu with a single print command.
+
+        Args:
+            path: The menu path in CLI or API form.
+            filters: Filter to apply on the router. Optional.
+            props: Properties to retrieve. Optional, all properties are retrieved by default.
+            model: A model class to validate rows into. Optional, rows are returned as
+                dictionaries of strings by default.
+        """
+        rows = await self.print(path, props=props, filters=filters)
+        if model is None:
+            return rows
+
+        return [model.model_validate(row) for row in rows]
+
+    async def get(self, path: str, obj: str = None) -> str:
+        """
+        Retrieves an object from a path on the router.
+
+        Args:
+            path: The path to the object
+            obj: The object to retrieve
+
+        Returns:
+            The value of the object as a string
+        """
+        if obj:
+            # Time values are already returned as strings by the API
+            prop = obj.removesuffix(' as-string').strip()
+            replies = await self.print(path, props=[prop])
+            return replies[0].get(prop, '') if replies else ''
+
+        return format_attributes(await self.get_dict(path))
+
+    async def get_dict(self, path: str, obj: str = None) -> dict[str, str]:
+        """
+        Retrieves a dictionary representation of an object's properties from a path on the router.
+
+        Args:
+            path: The path to the object.
+            obj: The object (ID) to retrieve. Optional, if not specified, retrieves default object.
+
+        Returns:
+            A dictionary where keys are the object's property names and values are the corresponding
+            property values.
+        """
+        filters = Filter('.id', '=', obj) if obj else None
+        replies = await self.print(path, filters=filters)
+
+        return replies[0] if replies else {}
+
+    async def get_model(self, model: type[M], path: str, obj: str = None) -> M:
+        """
+        Retrieves an object from a path on the router as a model.
+
+        Args:
+            model: The model class.
+            path: The path to the object.
+            obj: The object (ID) to retrieve. Optional, if not specified, retrieves default object.
+        """
+        return model.model_validate(await self.get_dict(path, obj))
+
+    async def get_batch(self, queries: dict[str, tuple[str, str | None]]) -> dict[str, str]:
+        """
+        Retrieves several properties from the router.
+
+        All requests are pipelined over the connection and awaited together.
+
+        Args:
+            queries: A mapping of result keys to (path, property) tuples. If property is None,
+                the whole object at path is retrieved.
+
+        Returns:
+            A dictionary mapping the keys of queries to the values of the requested properties.
+        """
+        values = await asyncio.gather(*(self.get(path, prop) for path, prop in queries.values()))
+
+        return dict(zip(queries, values))
+
+    async def get_many(self, path: str, ids: list[str], props: list[str] | None = None) -> list[RowResult[dict[str, str]]]:
+        """
+        Retrieves the objects with the given IDs, e.g. returned by find().
+
+        All requests are pipelined over the connection and awaited together.
+
+        Returns:
+            A result for every ID in order, holding the object's properties or an error.
+        """
+        async def get(id: str) -> RowResult[dict[str, str]]:
+            try:
+                replies = await self.print(path, props=props, filters=Filter('.id', '=', id))
+            except APIError as e:
+                return RowResult(error=str(e))
+            return RowResult(value=replies[0]) if replies else RowResult(error='No such item')
+
+        return list(await asyncio.gather(*(get(id) for id in ids)))
+
+    async def add_many(self, path: str, rows: list[dict[str, str]]) -> list[RowResult[str]]:
+        """
+        Adds entries to a menu, e.g. an address list.
+
+        All requests are pipelined over the connection and awaited together. A failed
+        row doesn't stop the others, so the results must be checked.
+
+        Returns:
+            A result for every row in order, holding the ID of the new entry or an error.
+        """
+        command = f'{path_to_api(path)}/add'
+
+        async def add(row: dict[str, str]) -> RowResult[str]:
+            try:
+                response = await self.talk([command] + [f'={key}={value}' for key, value in row.items()])
+            except APIError as e:
+                return RowResult(error=str(e))
+            return RowResult(value=response.done.get('ret'))
+
+        return list(await asyncio.gather(*(add(row) for row in rows)))
+
+    async def find(self, path: str, filters: Filter | None = None) -> list[str]:
+        replies = await self.print(path, props=['.id'], filters=filters)
+
+        return [reply['.id'] for reply in replies if '.id' in reply]
+
+    async def get_capabilities(self) -> Capabilities:
+        """
+        Retrieves the identity, version and supported features of the router.
+
+        The capabilities are detected on first use and cached until the connection
+        is closed.
+        """
+        if self._capabilities is None:
+            self._capabilities = await detect_capabilities(self)
+            logger.debug(f'Capabilities of {self._host}: {self._capabilities}')
+
+        return self._capabilities
+
+    async def get_identity(self) -> str:
+        """
+        Retrieves the identity of the router.
+
+        Returns:
+            The identity of the router as a string.
+        """
+        return await self.get('/system identity', 'name')
+
+    async def get_current_firmware_version(self) -> str:
+        """
+        Retrieves the current firmware version of the router.
+
+        Returns:
+            The current firmware version as a string.
+        """
+        return await self.get('/system routerboard', 'current-firmware')
+
+    async def get_upgrade_firmware_version(self) -> str:
+        """
+        Retrieves the upgrade firmware version of the router.
+
+        Returns:
+            The upgrade firmware version as a string.
+        """
+        return await self.get('/system routerboard', 'upgrade-firmware')
+
+    async def get_routeros_installed_version(self) -> str:
+        """
+        Retrieves the currently installed version of RouterOS.
+
+        Returns:
+            The installed version of RouterOS as a string.
+        """
+        return await self.get('/system package update', 'installed-version')
+
+    async def get_routeros_latest_version(self) -> str:
+        """
+        Retrieves the latest version of RouterOS available for upgrade.
+
+        Returns:
+            The latest version of RouterOS as a string.
+        """
+        return await self.get('/system package update', 'latest-version')
+
+    # Model getters
+    async def get_system_package_update(self) -> SystemPackageUpdate:
+        return await self.get_model(SystemPackageUpdate, '/system package update')
+
+    async def get_system_routerboard(self) -> SystemRouterboard:
+        return await self.get_model(SystemRouterboard, '/system routerboard')
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.disconnect()
+
+def format_attributes(attributes: dict[str, str]) -> str:
+    """
+    Format attributes the same way as ':put [... get]' does on the CLI.
+    """
+    return ';'.join(f'{key}={value}' for key, value in attributes.items())
@@ -0,0 +1,81 @@
+import logging
+import re
+
+from dataclasses import dataclass
+
+from .script import supports_serialize
+
+logger = logging.getLogger(__name__)
+
+# Properties read by detect_capabilities() in a single batch
+CAPABILITY_QUERIES: dict[str, tuple[str, str]] = {
+    'identity': ('/system identity', 'name'),
+    'version': ('/system resource', 'version'),
+    'architecture': ('/system resource', 'architecture-name'),
+    'board_name': ('/system resource', 'board-name'),
+}
+VERSION_PATTERN = re.compile(r'(\d+)(?:\.(\d+))?(?:\.(\d+))?')
+
+@dataclass(frozen=True)
+class Capabilities:
+    """
+    Identity, version and supported features of a router, detected once per connection.
+    """
+    identity: str
+    version: str # e.g. '7.16.2'
+    channel: str | None = None # e.g. 'stable'
+    architecture: str | None = None # e.g. 'arm64'
+    board_name: str | None = None
+
+    @classmethod
+    def from_facts(cls, facts: dict[str, str]) -> 'Capabilities':
+        # The version is reported with its channel, e.g. '7.16.2 (stable)'
+        version, _, channel = facts['version'].strip().partition(' ')
+        return cls(
+            identity=facts['identity'],
+            version=version,
+            channel=channel.strip('()') or None,
+            architecture=facts.get('architecture') or None,
+            board_name=facts.get('board_name') or None
+        )
+
+    @property
+    def version_tuple(self) -> tuple[int, int, int]:
+        """
+        The numeric part of the version, e.g. (7, 17, 0) for '7.17rc3'.
+        """
+        match = VERSION_PATTERN.match(self.version)
+        if match is None:
+            return (0, 0, 0)
+        return tuple(int(part or 0) for part in match.groups())
+
+    @property
+    def v7(self) -> bool:
+        """
+        RouterOS 7.0+, which changed the syntax of several commands
+        (e.g. 'uptime as-string', '/export show-sensitive').
+        """
+        return self.version_tuple >= (7, 0, 0)
+
+    @property
+    def serialize(self) -> bool:
+        """
+        Whether `:serialize to=json` is supported.
+        """
+        return supports_serialize(self.version)
+
+async def detect_capabilities(device) -> Capabilities:
+    """
+    Read the capabilities of a router with a single batched request.
+
+    Args:
+        device: A connected AsyncMikrotikSSHClient or AsyncMikrotikAPIClient.
+    """
+    try:
+        facts = await device.get_batch(CAPABILITY_QUERIES)
+    except RuntimeError as e:
+        # Falling back to separate gets if the batched script fails
+        logger.debug(f'Batched capabilities detection failed: {e}')
+        facts = {key: await device.get(path, prop) for key, (path, prop) in CAPABILITY_QUERIES.items()}
+
+    return Capabilities.from_facts(facts)
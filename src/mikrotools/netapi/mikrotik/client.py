@@ -1,71 +1,87 @@
 import asyncio
+import time
+
+from collections.abc import AsyncIterator, Callable
+from typing import Any, TypeVar
 
 import asyncssh
 import logging
-import paramiko
 
+from .api import AsyncMikrotikAPIClient
+from .capabilities import Capabilities, detect_capabilities
 from .filters import Filter
+from .jumphost import JumpHostPool, JumpRoute
+from .loop import run_sync
 from .models import *
+from .models.base import MikrotikBase
+from .script import (
+    RowResult,
+    build_add_many_script,
+    build_batch_script,
+    build_get_many_script,
+    build_serialize_command,
+    build_table_command,
+    format_value,
+    parse_attributes,
+    parse_batch_output,
+    parse_rows_output,
+    parse_serialized_object,
+    parse_terse_line
+)
+from .shell import AsyncMikrotikShell
 
 logger = logging.getLogger(__name__)
 
+M = TypeVar('M', bound=MikrotikBase)
+
+BATCH_CHUNK_SIZE = 200 # Rows per script generated by get_many() and add_many()
+
+# Errors meaning that the connection is no longer usable
+CONNECTION_ERRORS = (ConnectionError, asyncssh.DisconnectError, asyncssh.ChannelOpenError)
+
 class MikrotikSSHClient():
-    def __init__(self, host: str, username: str, password: str | None = None, keyfile: str | None = None, port: int = 22):
-        self._host = host
-        self._port = port
-        self._username = username
-        self._password = password
-        self._keyfile = keyfile
-        self._ssh = paramiko.SSHClient()
-        self._ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-        self._connected = False
+    """
+    Synchronous facade over the async clients.
+    
+    Every call runs the corresponding coroutine on the shared background event loop
+    (see loop.py) and waits for the result, so the sync API uses the same asyncssh
+    engine and connection pool as the async commands.
+    """
+    def __init__(
+        self,
+        host: str,
+        username: str,
+        password: str | None = None,
+        keyfile: str | None = None,
+        port: int = 22,
+        keepalive_interval: int = 0,
+        transport_options: dict | None = None,
+        client: 'AsyncMikrotikSSHClient | AsyncMikrotikAPIClient | None' = None
+    ):
+        """
+        :param transport_options: Keyword arguments for asyncssh.connect(), see transport.asyncssh_options()
+        :param client: An already connected async client to wrap, host and credentials are ignored then.
+                       Used by MikrotikManager to hand out pooled sessions.
+        """
+        self._client = client or AsyncMikrotikSSHClient(
+            host=host,
+            port=port,
+            username=username,
+            password=password,
+            keyfile=keyfile,
+            keepalive_interval=keepalive_interval,
+            transport_options=transport_options
+        )
     
     @property
     def is_connected(self) -> bool:
-        return self._connected
+        return self._client.is_connected
     
-    def connect(self) -> None:
-        disabled_algorithms = {'pubkeys': ['rsa-sha2-256', 'rsa-sha2-512']}
-        timeout = 5
-        
-        # Check if password or keyfile is provided
-        if self._password is not None and self._keyfile == None:
-            # Connect with password
-            try:
-                self._ssh.connect(
-                    self._host,
-                    port=self._port,
-                    username=self._username,
-                    password=self._password,
-                    disabled_algorithms=disabled_algorithms,
-                    timeout=timeout,
-                    look_for_keys=False
-                )
-                self._connected = True
-            except Exception as e:
-                raise e
-        elif self._keyfile is not None and self._password == None:
-            # Connect with key
-            try:
-                self._ssh.connect(
-                    self._host,
-                    port=self._port,
-                    username=self._username,
-                    key_filename=self._keyfile,
-                    disabled_algorithms=disabled_algorithms,
-                    timeout=timeout,
-                    look_for_keys=False
-                )
-                self._connected = True
-            except Exception as e:
-                raise e
-        else:
-            raise Exception('Must provide either password or keyfile')
+    def connect(self, timeout: int = 5) -> None:
+        run_sync(self._client.connect(timeout=timeout))
     
     def disconnect(self) -> None:
-        if self._connected:
-            self._ssh.close()
-            self._connected = False
+        run_sync(self._client.disconnect())
     
     def add(self, path: str, data: dict[str, str]) -> None:
         expression = ''
@@ -90,9 +106,7 @@ class MikrotikSSHClient():
         :raises: ConnectionError if not connected to the host
                  RuntimeError if the command execution fails
         """
-        output = self.execute_command_raw(command).strip().split('\n')
-        
-        return [line.strip() for line in output if line.strip()]
+        return run_sync(self._client.execute_command(command))
     
     def execute_command_raw(self, command: str) -> str:
         """
@@ -103,43 +117,10 @@ class MikrotikSSHClient():
         :raises: ConnectionError if not connected to the host
                  RuntimeError if the command execution fails
         """
-        if not self._connected:
-            raise ConnectionError('Not connected to host')
-        
-        logger.debug(f'Executing command: {command}')
-        
-        try:
-            _, stdout, stderr = self._ssh.exec_command(command)
-            output = stdout.read().decode()
-            error = stderr.read().decode().strip()
-            
-            if error:
-                raise RuntimeError(f'Error executing command: {error}')
-            logger.debug(f'Command execution result: {output}')
-            
-            return output
-        except paramiko.SSHException as e:
-            raise e
+        return run_sync(self._client.execute_command_raw(command))
     
-    def find(self, path: str, filters: list[Filter] | None = None) -> list[str]:
-        ids = []
-        
-        # Remove trailing slash
-        path = path.rstrip('/')
-        
-        if filters is not None:
-            path = f'{path} find where {filters.to_cli()}'
-        else:
-            path = f'{path} find'
-        
-        response = self.execute_command_raw(f':put [{path}]').strip()
-        for id in response.split(';'):
-            ids.append(id.strip())
-        
-        if ids == [""]:
-            ids = []
-        
-        return ids
+    def find(self, path: str, filters: Filter | None = None) -> list[str]:
+        return run_sync(self._client.find(path, filters))
     
     def get(self, path: str, obj: str = None) -> str:
         """
@@ -152,14 +133,7 @@ class MikrotikSSHClient():
         Returns:
             The value of the object as a string
         """
-        # Remove trailing slash
-        path = path.rstrip('/')
-        
-        if obj:
-            path = f'{path} get {obj}'
-        else:
-            path = f'{path} get'
-        return self.execute_command_raw(f':put [{path}]').strip()
+        return run_sync(self._client.get(path, obj))
     
     def get_dict(self, path: str, obj: str = None) -> dict[str, str]:
         """
@@ -173,24 +147,7 @@ class MikrotikSSHClient():
             A dictionary where keys are the object's property names and values are the corresponding
             property values, extracted from the response string.
         """
-        output = {}
-        current_key = None
-        
-        response = self.get(path, obj)
-        
-        for part in response.split(';'):
-            part = part.strip()
-            if not part:
-                continue
-            
-            if '=' in part:
-                key, value = part.split('=', 1)
-                current_key = key.strip()
-                output[current_key] = value.strip()
-            elif current_key and current_key in output:
-                output[current_key] += ';' + part.strip()
-        
-        return output
+        return run_sync(self._client.get_dict(path, obj))
         
     def get_identity(self) -> str:
         """
@@ -199,7 +156,7 @@ class MikrotikSSHClient():
         Returns:
             The identity of the router as a string.
         """
-        return self.get('/system identity', 'name')
+        return run_sync(self._client.get_identity())
     
     def get_routeros_installed_version(self) -> str:
         """
@@ -208,7 +165,7 @@ class MikrotikSSHClient():
         Returns:
             The installed version of RouterOS as a string.
         """
-        return self.get('/system package update', 'installed-version')
+        return run_sync(self._client.get_routeros_installed_version())
 
     def get_current_firmware_version(self) -> str:
         """
@@ -217,7 +174,7 @@ class MikrotikSSHClient():
         Returns:
             The current firmware version as a string.
         """
-        return self.get('/system routerboard', 'current-firmware')
+        return run_sync(self._client.get_current_firmware_version())
     
     def get_upgrade_firmware_version(self) -> str:
         """
@@ -226,7 +183,7 @@ class MikrotikSSHClient():
         Returns:
             The upgrade firmware version as a string.
         """
-        return self.get('/system routerboard', 'upgrade-firmware')
+        return run_sync(self._client.get_upgrade_firmware_version())
     
     def __enter__(self):
         self.connect()
@@ -236,22 +193,67 @@ class MikrotikSSHClient():
         self.disconnect()
 
 class AsyncMikrotikSSHClient():
-    def __init__(self, host: str, username: str, password: str = None, keyfile: str = None, port: int = 22):
+    def __init__(
+        self,
+        host: str,
+        username: str,
+        password: str = None,
+        keyfile: str = None,
+        port: int = 22,
+        persistent_channel: bool = False,
+        keepalive_interval: int = 0,
+        keepalive_count_max: int = 3,
+        jump: JumpHostPool | JumpRoute | None = None,
+        transport_options: dict | None = None
+    ):
         self._host = host
         self._port = port
         self._username = username
         self._password = password
         self._keyfile = keyfile
+        self._persistent_channel = persistent_channel
+        self._keepalive_interval = keepalive_interval
+        self._keepalive_count_max = keepalive_count_max
+        self._jump = jump
+        # Keyword arguments for asyncssh.connect(), see transport.asyncssh_options()
+        self._transport_options = transport_options or {}
+        self._tunnel: asyncssh.SSHClientConnection | None = None
+        self._connect_timeout = 10
+        # Seconds to wait for a command, adjusted by the manager from the host's latency history
+        self.command_timeout: float = 20
+        # Called with the duration of every successfully executed command
+        self.latency_observer: Callable[[float], None] | None = None
+        # Seconds the last connect() spent in the handshake, without waiting for a jump host
+        self.handshake_time: float | None = None
         self._conn = None
+        self._shell: AsyncMikrotikShell | None = None
+        # Detected once per connection, see get_capabilities()
+        self._capabilities: Capabilities | None = None
         self._connected = False
     
     async def connect(self, timeout: int = 10) -> None:
-        if self._password is not None and self._keyfile == None:
-            await self._connect_with_password(timeout)
-        elif self._keyfile is not None and self._password == None:
-            await self._connect_with_key(timeout)
-        else:
-            raise Exception('Must provide either password or keyfile')
+        self._connect_timeout = timeout
+        if self._jump is not None:
+            # The session is tunnelled as a channel over a shared jump host connection
+            self._tunnel = await self._jump.acquire(timeout)
+        
+        start = time.monotonic()
+        try:
+            if self._password is not None and self._keyfile == None:
+                await self._connect_with_password(timeout)
+            elif self._keyfile is not None and self._password == None:
+                await self._connect_with_key(timeout)
+            else:
+                raise Exception('Must provide either password or keyfile')
+        except BaseException:
+            await self._release_tunnel()
+            raise
+        self.handshake_time = time.monotonic() - start
+    
+    async def _release_tunnel(self) -> None:
+        if self._tunnel is not None:
+            tunnel, self._tunnel = self._tunnel, None
+            await self._jump.release(tunnel)
     
     async def _connect_with_password(self, timeout: int) -> None:
         try:
@@ -260,7 +262,11 @@ class AsyncMikrotikSSHClient():
                 port=self._port,
                 username=self._username,
                 password=self._password,
-                known_hosts=None
+                known_hosts=None,
+                tunnel=self._tunnel or (),
+                keepalive_interval=self._keepalive_interval,
+                keepalive_count_max=self._keepalive_count_max,
+                **self._transport_options
             ), timeout=timeout)
         except Exception as e:
             raise e
@@ -274,7 +280,11 @@ class AsyncMikrotikSSHClient():
                 port=self._port,
                 username=self._username,
                 client_keys=[self._keyfile],
-                known_hosts=None
+                known_hosts=None,
+                tunnel=self._tunnel or (),
+                keepalive_interval=self._keepalive_interval,
+                keepalive_count_max=self._keepalive_count_max,
+                **self._transport_options
             ), timeout=timeout)
         except Exception as e:
             raise e
@@ -282,22 +292,57 @@ class AsyncMikrotikSSHClient():
             self._connected = True
     
     async def disconnect(self) -> None:
+        if self._shell is not None:
+            await self._shell.close()
+            self._shell = None
+        self._capabilities = None
         if self._connected and self._conn is not None:
             try:
-                await self._conn.close()
+                self._conn.close()
+                await self._conn.wait_closed()
             except Exception:
                 pass
             finally:
                 self._connected = False
                 self._conn = None
+        await self._release_tunnel()
+
+    async def reconnect(self) -> None:
+        """
+        Closes the current connection and connects to the host again.
+        """
+        logger.debug(f'Reconnecting to {self._host}')
+        await self.disconnect()
+        await self.connect(self._connect_timeout)
+    
+    async def ping(self, timeout: float = 5) -> bool:
+        """
+        Checks that the connection is alive by executing an empty command.
+
+        Returns:
+            True if the router responded in time, False otherwise.
+        """
+        if not self.is_connected:
+            return False
+        
+        try:
+            await asyncio.wait_for(self.execute_command_raw(':put ""'), timeout=timeout)
+        except Exception as e:
+            logger.debug(f'Liveness probe for {self._host} failed: {e!r}')
+            return False
+        
+        return True
 
     @property
     def is_connected(self) -> bool:
-        return self._connected
+        return self._connected and self._conn is not None and not self._conn.is_closed()
     
     async def execute_command_raw(self, command: str) -> str:
         """
         Asynchronously execute a command on the Mikrotik device and return its output as a raw string.
+        
+        If the persistent channel is enabled, the command is written to a long-lived shell
+        channel instead of opening a new exec channel.
 
         :param command: The command to execute
         :return: The output of the command
@@ -308,20 +353,80 @@ class AsyncMikrotikSSHClient():
             raise ConnectionError('Not connected to host')
         
         logger.debug(f'Executing command: {command}')
+        start = time.monotonic()
+        
+        if self._persistent_channel:
+            if self._shell is None:
+                self._shell = AsyncMikrotikShell(self._conn)
+            result = await self._shell.run(command, timeout=self.command_timeout)
+            logger.debug(f'Command execution result: {result}')
+            self._observe_latency(start)
+            
+            return result
         
         try:
-            response = await self._conn.run(command, timeout=20)
+            response = await self._conn.run(command, timeout=self.command_timeout)
             result = response.stdout
             error = response.stderr.strip()
             
             if error:
                 raise RuntimeError(f'Error executing command: {error}')
             logger.debug(f'Command execution result: {result}')
+            self._observe_latency(start)
             
             return result
         except Exception as e:
             raise e
+    
+    def _observe_latency(self, start: float) -> None:
+        if self.latency_observer is not None:
+            self.latency_observer(time.monotonic() - start)
+        
+    async def stream_command(self, command: str, raw: bool = False, lines: bool = False, chunk_size: int = 65536) -> AsyncIterator[str | bytes]:
+        """
+        Asynchronously execute a command on the Mikrotik device and yield its output as it arrives.
         
+        Output is never accumulated, so memory usage is bounded by chunk_size regardless of
+        the output size. If the persistent channel is enabled, the output is streamed line
+        by line from the long-lived shell, otherwise the command runs in its own exec channel.
+
+        :param command: The command to execute
+        :param raw: Yield raw bytes instead of decoded strings
+        :param lines: Yield complete lines instead of fixed-size chunks
+        :param chunk_size: Maximum size of a chunk when lines is False
+        :return: An async iterator over output chunks or lines
+        :raises: ConnectionError if not connected to the host
+                RuntimeError if the command execution fails
+                TimeoutError if no output is received for command_timeout seconds
+        """
+        if not self._connected:
+            raise ConnectionError('Not connected to host')
+        
+        logger.debug(f'Streaming command: {command}')
+        
+        if self._persistent_channel:
+            if self._shell is None:
+                self._shell = AsyncMikrotikShell(self._conn)
+            async for line in self._shell.stream(command, timeout=self.command_timeout):
+                line += '\n'
+                yield line.encode() if raw else line
+            return
+        
+        encoding = {'encoding': None} if raw else {'encoding': 'utf-8', 'errors': 'replace'}
+        async with await self._conn.create_process(command, **encoding) as process:
+            while True:
+                if lines:
+                    chunk = await asyncio.wait_for(process.stdout.readline(), timeout=self.command_timeout)
+                else:
+                    chunk = await asyncio.wait_for(process.stdout.read(chunk_size), timeout=self.command_timeout)
+                if not chunk:
+                    break
+                yield chunk
+            
+            error = (await process.stderr.read()).strip()
+            if error:
+                raise RuntimeError(f'Error executing command: {error.decode() if raw else error}')
+    
     async def execute_command(self, command: str) -> list[str]:
         """
         Execute a command on the Mikrotik device and return its output as a list of strings.
@@ -337,6 +442,26 @@ class AsyncMikrotikSSHClient():
         
         return [line.strip() for line in output if line.strip()]
 
+    async def execute_read_command(self, command: str) -> str:
+        """
+        Execute an idempotent read command and return its output as a raw string.
+        
+        If the connection turns out to be dropped, reconnects once and retries the command.
+
+        :param command: The command to execute
+        :return: The output of the command
+        :raises: ConnectionError if the host can't be reached again
+                RuntimeError if the command execution fails
+        """
+        try:
+            return await self.execute_command_raw(command)
+        except CONNECTION_ERRORS as e:
+            logger.debug(f'Connection to {self._host} lost while reading: {e!r}')
+        
+        await self.reconnect()
+        
+        return await self.execute_command_raw(command)
+
     async def get(self, path: str, obj: str = None) -> str:
         """
         Retrieves an object from a path on the router.
@@ -356,7 +481,7 @@ class AsyncMikrotikSSHClient():
         else:
             path = f'{path} get'
         
-        result = await self.execute_command_raw(f':put [{path}]')
+        result = await self.execute_read_command(f':put [{path}]')
         
         return result.strip()
 
@@ -372,24 +497,187 @@ class AsyncMikrotikSSHClient():
             A dictionary where keys are the object's property names and values are the corresponding
             property values, extracted from the response string.
         """
-        result = {}
-        current_key = None
+        return {key: format_value(value) for key, value in (await self._get_object(path, obj)).items()}
+
+    async def _get_object(self, path: str, obj: str = None) -> dict[str, Any]:
+        if await self._supports_serialize():
+            response = await self.execute_read_command(build_serialize_command(path, obj))
+            return parse_serialized_object(response)
         
-        response = await self.get(path, obj)
+        return parse_attributes(await self.get(path, obj))
+
+    async def get_capabilities(self) -> Capabilities:
+        """
+        Retrieves the identity, version and supported features of the router.
+
+        The capabilities are detected on first use and cached until the connection
+        is closed, so callers choosing between RouterOS 6 and 7 syntax don't need
+        a round trip of their own.
+        """
+        if self._capabilities is None:
+            self._capabilities = await detect_capabilities(self)
+            logger.debug(f'Capabilities of {self._host}: {self._capabilities}')
         
-        for part in response.split(';'):
-            part = part.strip()
-            if not part:
+        return self._capabilities
+
+    async def _supports_serialize(self) -> bool:
+        return (await self.get_capabilities()).serialize
+
+    async def get_model(self, model: type[M], path: str, obj: str = None) -> M:
+        """
+        Retrieves an object from a path on the router as a model.
+
+        Values serialized as JSON keep their types, so they are validated as is.
+
+        Args:
+            model: The model class.
+            path: The path to the object.
+            obj: The object to retrieve. Optional, if not specified, retrieves default object.
+        """
+        return model.model_validate(await self._get_object(path, obj))
+
+    async def stream_table(
+        self,
+        path: str,
+        filters: Filter | None = None,
+        props: list[str] | None = None,
+        model: type[M] | None = None
+    ) -> AsyncIterator[dict[str, str] | M]:
+        """
+        Retrieves the rows of a menu with a single command, yielding them as they arrive.
+
+        Rows are printed one per line, as JSON with :serialize on RouterOS 7.13+ and with
+        'print terse' otherwise, so every line is parsed on its own and the output is
+        never accumulated.
+
+        Args:
+            path: The menu path.
+            filters: Filter to apply on the router. Optional.
+            props: Properties to retrieve. Optional, all properties are retrieved by default.
+            model: A model class to validate rows into. Optional, rows are yielded as
+                dictionaries of strings by default.
+        """
+        serialize = await self._supports_serialize()
+        where = filters.to_cli() if filters is not None else None
+        parse = parse_serialized_object if serialize else lambda line: parse_terse_line(line, props)
+        
+        async for line in self.stream_command(build_table_command(path, where, props, serialize), lines=True):
+            if not line.strip():
                 continue
-            
-            if '=' in part:
-                key, value = part.split('=', 1)
-                current_key = key.strip()
-                result[current_key] = value.strip()
-            elif current_key and current_key in result:
-                result[current_key] += ';' + part.strip()
+            row = parse(line)
+            if row is None:
+                continue
+            if model is not None:
+                yield model.model_validate(row)
+            elif serialize:
+                yield {key: format_value(value) for key, value in row.items()}
+            else:
+                yield row
+
+    async def get_table(
+        self,
+        path: str,
+        filters: Filter | None = None,
+        props: list[str] | None = None,
+        model: type[M] | None = None
+    ) -> list[dict[str, str] | M]:
+        """
+        Retrieves the rows of a menu with a single command, see stream_table().
+        """
+        return [row async for row in self.stream_table(path, filters, props, model)]
+
+    async def get_many(
+        self,
+        path: str,
+        ids: list[str],
+        props: list[str] | None = None,
+        chunk_size: int = BATCH_CHUNK_SIZE
+    ) -> list[RowResult[dict[str, str]]]:
+        """
+        Retrieves the objects with the given IDs, e.g. returned by find().
+
+        Objects are read by generated scripts of up to chunk_size rows each, instead
+        of a separate command per object.
+
+        Args:
+            path: The menu path.
+            ids: IDs of the objects to retrieve.
+            props: Properties to retrieve. Optional, all properties are retrieved by default.
+                An object without one of the properties is reported as an error.
+            chunk_size: Maximum number of objects read by a single script.
 
-        return result
+        Returns:
+            A result for every ID in order, holding the object's properties or an error.
+        """
+        serialize = await self._supports_serialize()
+        results: list[RowResult[dict[str, str]]] = []
+        
+        for start in range(0, len(ids), chunk_size):
+            chunk = ids[start:start + chunk_size]
+            output = await self.execute_read_command(build_get_many_script(path, chunk, props, serialize))
+            for result in parse_rows_output(output, len(chunk)):
+                if not result.ok:
+                    results.append(RowResult(error=result.error))
+                    continue
+                if serialize:
+                    row = {key: format_value(value) for key, value in parse_serialized_object(result.value).items()}
+                else:
+                    row = parse_attributes(result.value)
+                results.append(RowResult(value=row))
+        
+        return results
+
+    async def add_many(
+        self,
+        path: str,
+        rows: list[dict[str, str]],
+        chunk_size: int = BATCH_CHUNK_SIZE
+    ) -> list[RowResult[str]]:
+        """
+        Adds entries to a menu, e.g. an address list.
+
+        Entries are added by generated scripts of up to chunk_size rows each. A failed
+        row doesn't stop the others, so the results must be checked.
+
+        Args:
+            path: The menu path.
+            rows: Properties of the entries to add.
+            chunk_size: Maximum number of entries added by a single script.
+
+        Returns:
+            A result for every row in order, holding the ID of the new entry or an error.
+        """
+        results: list[RowResult[str]] = []
+        
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+            # Not retried on a new connection, as a part of the chunk may have been added
+            output = await self.execute_command_raw(build_add_many_script(path, chunk))
+            results.extend(parse_rows_output(output, len(chunk)))
+        
+        return results
+
+    async def get_batch(self, queries: dict[str, tuple[str, str | None]]) -> dict[str, str]:
+        """
+        Retrieves several properties from the router in a single command execution.
+
+        A RouterOS script printing every requested property is generated and executed
+        at once, avoiding a separate round trip per property.
+
+        Args:
+            queries: A mapping of result keys to (path, property) tuples. If property is None,
+                the whole object at path is retrieved.
+
+        Returns:
+            A dictionary mapping the keys of queries to the values of the requested properties.
+
+        Raises:
+            RuntimeError: If the script fails or its output doesn't contain all requested values.
+        """
+        script = build_batch_script(queries)
+        response = await self.execute_read_command(script)
+        
+        return parse_batch_output(response, list(queries))
 
     async def find(self, path: str, filters: list[Filter] | None = None) -> list[str]:
         ids = []
@@ -402,7 +690,7 @@ class AsyncMikrotikSSHClient():
         else:
             path = f'{path} find'
         
-        response = await self.execute_command_raw(f':put [{path}]').strip()
+        response = (await self.execute_read_command(f':put [{path}]')).strip()
         for id in response.split(';'):
             ids.append(id.strip())
         
@@ -458,10 +746,10 @@ class AsyncMikrotikSSHClient():
 
     # Model getters
     async def get_system_package_update(self) -> SystemPackageUpdate:
-        return SystemPackageUpdate(**await self.get_dict('/system package update'))
+        return await self.get_model(SystemPackageUpdate, '/system package update')
     
     async def get_system_routerboard(self) -> SystemRouterboard:
-        return SystemRouterboard(**await self.get_dict('/system routerboard'))
+        return await self.get_model(SystemRouterboard, '/system routerboard')
     
     async def __aenter__(self):
         await self.connect()
@@ -1,4 +1,77 @@
+import ipaddress
+import re
+
+from collections.abc import Callable, Mapping, Sequence
+
 VALID_OPS = ['=', '!=', '>', '>=', '<', '<=', '~', '!~'] # Mikrotik filter operators
+API_QUERY_OPS = { # RouterOS API query words for filter operators
+    '=': ('?{field}={value}',),
+    '!=': ('?{field}={value}', '?#!'),
+    '>': ('?>{field}={value}',),
+    # Not expressed as negated '<' and '>', so values of different kinds don't match
+    '>=': ('?>{field}={value}', '?{field}={value}', '?#|'),
+    '<': ('?<{field}={value}',),
+    '<=': ('?<{field}={value}', '?{field}={value}', '?#|'),
+}
+API_LOGICAL_OPS = {'and': '?#&', 'or': '?#|'} # RouterOS API query stack operations
+BOOLEAN_VALUES = {'true': 'true', 'yes': 'true', 'false': 'false', 'no': 'false'} # CLI and API spellings
+
+def _ordering_key(value: str) -> tuple:
+    """
+    Return a key ordering values the way RouterOS does: numbers and IP addresses by
+    value, anything else as strings. All but the last item identify the kind of the
+    value, only values of the same kind are ordered.
+    """
+    try:
+        return (0, int(value))
+    except ValueError:
+        pass
+    try:
+        address = ipaddress.ip_interface(value)
+        return (1, address.version, address)
+    except ValueError:
+        return (2, value)
+
+def _compile_test(op: str, value: str) -> Callable[[str | None], bool]:
+    """
+    Compile a single condition into a test of a property value, None if the property is missing.
+
+    Missing properties compare as empty strings, like unset properties on the router.
+    """
+    if op in ('~', '!~'):
+        search = re.compile(value).search
+        if op == '~':
+            return lambda actual: search(actual or '') is not None
+        return lambda actual: search(actual or '') is None
+    
+    if op in ('=', '!='):
+        if value in BOOLEAN_VALUES:
+            # 'yes' and 'true' are the same value
+            expected = BOOLEAN_VALUES[value]
+            equals = lambda actual: BOOLEAN_VALUES.get(actual or '', actual) == expected
+        else:
+            equals = lambda actual: (actual or '') == value
+        return equals if op == '=' else lambda actual: not equals(actual)
+    
+    key = _ordering_key(value)
+    kind = key[:-1]
+    compare = {
+        '>': lambda actual: actual > key,
+        '>=': lambda actual: actual >= key,
+        '<': lambda actual: actual < key,
+        '<=': lambda actual: actual <= key,
+    }[op]
+    
+    def test(actual: str | None) -> bool:
+        if actual is None:
+            return False
+        actual = _ordering_key(actual)
+        if actual[:-1] != kind:
+            # Values of different kinds, e.g. 'auto' and a number, are never ordered
+            return False
+        return compare(actual)
+    
+    return test
 
 class Filter:
     def __init__(self, *args):
@@ -332,3 +405,169 @@ class Filter:
                 parts.append(clause)
         
         return ' '.join(parts)
+    
+    def to_api(self) -> list[str]:
+        """
+        Convert the filter conditions into RouterOS API query words.
+
+        The API evaluates queries on a stack, so conditions are emitted in postfix
+        notation. Conditions are grouped like compile() and mask() evaluate them,
+        'and' taking precedence over 'or', so a filter matches the same rows over
+        the API, the CLI and locally.
+
+        Returns:
+            list[str]: A list of query words ('?name=value', '?#|' etc.) to be appended
+            to a print command sentence.
+
+        Raises:
+            ValueError: If the filter is empty or uses an operator that has no API
+            query equivalent ('~' and '!~').
+        """
+        words = []
+        for index, group in enumerate(self._groups()):
+            for position, node in enumerate(group):
+                words.extend(self._node_api(node))
+                if position:
+                    words.append(API_LOGICAL_OPS['and'])
+            if index:
+                words.append(API_LOGICAL_OPS['or'])
+        
+        return words
+    
+    @staticmethod
+    def _node_api(node: tuple) -> list[str]:
+        if isinstance(node[1], Filter):
+            operator, filter1, filter2 = node
+            return filter1.to_api() + filter2.to_api() + [API_LOGICAL_OPS[operator]]
+        
+        field, op, value = node
+        if op not in API_QUERY_OPS:
+            raise ValueError(f'Operator {op} is not supported by RouterOS API queries')
+        return [word.format(field=field, value=value) for word in API_QUERY_OPS[op]]
+    
+    def compile(self) -> Callable[[Mapping[str, str]], bool]:
+        """
+        Compile the filter into a predicate evaluating rows locally.
+
+        The condition tree is walked once, the returned predicate only calls the
+        compiled tests. Conditions follow RouterOS semantics: numbers and IP addresses
+        are ordered by value, '~' is an unanchored regular expression search, 'yes'
+        equals 'true' and missing properties equal empty strings.
+
+        Returns:
+            A function returning True for rows (property dictionaries) matching the filter.
+        """
+        groups = [[self._compile_node(node) for node in group] for group in self._groups()]
+        if len(groups) == 1 and len(groups[0]) == 1:
+            return groups[0][0]
+        
+        return lambda row: any(all(predicate(row) for predicate in group) for group in groups)
+    
+    @staticmethod
+    def _compile_node(node: tuple) -> Callable[[Mapping[str, str]], bool]:
+        if isinstance(node[1], Filter):
+            operator, filter1, filter2 = node
+            left, right = filter1.compile(), filter2.compile()
+            if operator == 'and':
+                return lambda row: left(row) and right(row)
+            return lambda row: left(row) or right(row)
+        
+        field, op, value = node
+        test = _compile_test(op, value)
+        return lambda row: test(row.get(field))
+    
+    def mask(self, columns: Mapping[str, Sequence[str | None]], length: int) -> list[bool]:
+        """
+        Evaluate the filter over columnar rows, one condition over a whole column at a time.
+
+        Args:
+            columns: Property values by property name, all columns of the given length.
+                A missing column is treated as a missing property in every row.
+            length: The number of rows.
+
+        Returns:
+            A list of booleans, True for rows matching the filter.
+        """
+        result = None
+        for group in self._groups():
+            group_mask = None
+            for node in group:
+                node_mask = self._node_mask(node, columns, length)
+                group_mask = node_mask if group_mask is None else [a and b for a, b in zip(group_mask, node_mask)]
+            result = group_mask if result is None else [a or b for a, b in zip(result, group_mask)]
+        
+        return result
+    
+    @staticmethod
+    def _node_mask(node: tuple, columns: Mapping[str, Sequence[str | None]], length: int) -> list[bool]:
+        if isinstance(node[1], Filter):
+            operator, filter1, filter2 = node
+            left, right = filter1.mask(columns, length), filter2.mask(columns, length)
+            if operator == 'and':
+                return [a and b for a, b in zip(left, right)]
+            return [a or b for a, b in zip(left, right)]
+        
+        field, op, value = node
+        test = _compile_test(op, value)
+        column = columns.get(field)
+        if column is None:
+            return [test(None)] * length
+        
+        return list(map(test, column))
+    
+    def fields(self) -> set[str]:
+        """
+        Return the names of all properties used by the filter.
+        """
+        names = set()
+        for group in self._groups():
+            for node in group:
+                if isinstance(node[1], Filter):
+                    names |= node[1].fields() | node[2].fields()
+                else:
+                    names.add(node[0])
+        
+        return names
+    
+    def _tokens(self) -> list[tuple[str, tuple]]:
+        """
+        Flatten the conditions into (operator, node) pairs in the order to_cli() renders them.
+
+        Nested single filters are inlined without parentheses, like to_cli() does. Every
+        node is either a (field, op, value) condition or an (operator, filter, filter)
+        combination rendered in parentheses.
+        """
+        tokens = []
+        for cond in self.conditions:
+            if len(cond) == 2 and isinstance(cond[1], Filter):
+                # Single filter
+                operator, filter = cond
+                nested = filter._tokens()
+                if nested and operator:
+                    nested[0] = (operator, nested[0][1])
+                tokens.extend(nested)
+            elif len(cond) == 3 and isinstance(cond[1], Filter) and isinstance(cond[2], Filter):
+                # Combined filters
+                tokens.append(('', cond))
+            elif len(cond) == 4:
+                # Single condition
+                operator, field, op, value = cond
+                tokens.append((operator, (field, op, value)))
+        
+        return tokens
+    
+    def _groups(self) -> list[list[tuple]]:
+        """
+        Split the flattened conditions into groups joined by 'or', the conditions of
+        each group being joined by 'and', as 'and' takes precedence on the router.
+        """
+        if not self.conditions:
+            raise ValueError('Filter is empty')
+        
+        groups = [[]]
+        for operator, node in self._tokens():
+            if operator == 'or' and groups[-1]:
+                groups.append([])
+            groups[-1].append(node)
+        
+        return groups
@@ -0,0 +1,410 @@
+import asyncio
+import ipaddress
+import logging
+import time
+
+from contextlib import suppress
+from dataclasses import dataclass
+
+import asyncssh
+
+from mikrotools.inventory import InventoryItem
+
+logger = logging.getLogger(__name__)
+
+# Seconds a failed jump host is skipped before it's tried again
+FAILOVER_HOLDDOWN = 30.0
+# Seconds between RTT measurements of the jump hosts
+MEASURE_INTERVAL = 60.0
+
+@dataclass
+class JumpHostStats:
+    sessions: int = 0 # Router sessions tunnelled through the jump host
+    connections: int = 0 # Connections opened to the jump host
+    failures: int = 0 # Failed attempts to connect to the jump host
+    busy_time: float = 0.0 # Seconds during which at least one session was tunnelled
+
+    @property
+    def sessions_per_second(self) -> float:
+        return self.sessions / self.busy_time if self.busy_time else 0.0
+
+@dataclass
+class _JumpConnection:
+    conn: asyncssh.SSHClientConnection
+    channels: int = 0
+
+class JumpHostPool:
+    """
+    Multiplexes router connections over a few SSH connections to a jump host.
+
+    Each router session is tunnelled as a direct-tcpip channel over an existing
+    connection to the jump host, so the jump host handshake is paid once per
+    max_channels routers instead of once per router. Additional connections to the
+    jump host are opened when every existing one carries max_channels channels.
+    """
+    def __init__(
+        self,
+        host: str,
+        username: str,
+        password: str | None = None,
+        keyfile: str | None = None,
+        port: int = 22,
+        max_channels: int = 10,
+        keepalive_interval: int = 0,
+        keepalive_count_max: int = 3,
+        name: str | None = None
+    ):
+        """
+        Initialize the pool.
+
+        Args:
+            host: The jump host address.
+            username: The jump host username.
+            password: The jump host password.
+            keyfile: The private key used instead of the password.
+            port: The jump host SSH port.
+            max_channels: Maximum number of tunnelled sessions per jump host connection.
+            keepalive_interval: Seconds between keepalives, 0 disables keepalives.
+            keepalive_count_max: Unanswered keepalives after which the connection is closed.
+            name: The name shown in logs and statistics, defaults to the address.
+        """
+        self.name = name or host
+        self.stats = JumpHostStats()
+        self.rtt: float | None = None
+        self.down_until = 0.0
+        self._busy_since: float | None = None
+        self._host = host
+        self._port = port
+        self._username = username
+        self._password = password
+        self._keyfile = keyfile
+        self.max_channels = max(1, max_channels)
+        self._keepalive_interval = keepalive_interval
+        self._keepalive_count_max = keepalive_count_max
+        self._connections: list[_JumpConnection] = []
+        # The connection being opened, sessions needing a channel wait for it
+        self._pending: asyncio.Future[asyncssh.SSHClientConnection] | None = None
+        self._lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return len(self._connections)
+
+    @property
+    def channels(self) -> int:
+        return sum(jump.channels for jump in self._connections)
+
+    @property
+    def load(self) -> float:
+        """
+        Channels in use relative to the capacity of a single jump host connection.
+        """
+        return self.channels / self.max_channels
+
+    async def measure_rtt(self, timeout: float = 5) -> float | None:
+        """
+        Measure the round-trip time to the jump host as the TCP connect time.
+
+        The result is smoothed with the previous measurements. Returns None and
+        resets the estimate if the jump host is unreachable.
+        """
+        start = time.monotonic()
+        try:
+            _, writer = await asyncio.wait_for(asyncio.open_connection(self._host, self._port), timeout=timeout)
+        except (OSError, TimeoutError) as e:
+            logger.debug(f'Jump host {self.name} is unreachable: {e!r}')
+            self.rtt = None
+            return None
+
+        rtt = time.monotonic() - start
+        writer.close()
+        with suppress(OSError):
+            await writer.wait_closed()
+        self.rtt = rtt if self.rtt is None else self.rtt * 0.7 + rtt * 0.3
+        logger.debug(f'Jump host {self.name} RTT: {self.rtt * 1000:.1f}ms')
+
+        return self.rtt
+
+    async def acquire(self, timeout: float = 10) -> asyncssh.SSHClientConnection:
+        """
+        Reserve a channel on a connection to the jump host, connecting if needed.
+
+        Every reserved channel must be returned with release().
+
+        Args:
+            timeout: Seconds to wait for a new jump host connection.
+
+        Returns:
+            The jump host connection to tunnel through.
+        """
+        while True:
+            async with self._lock:
+                self._connections = [jump for jump in self._connections if not jump.conn.is_closed()]
+
+                for jump in self._connections:
+                    if jump.channels < self.max_channels:
+                        jump.channels += 1
+                        self._session_started()
+                        return jump.conn
+
+                pending = self._pending
+                if pending is None:
+                    # The handshake runs outside the lock, so releases of healthy
+                    # sessions don't wait for it
+                    future = self._pending = asyncio.get_running_loop().create_future()
+                    # Marking the exception as retrieved when there are no waiting sessions
+                    future.add_done_callback(lambda f: f.cancelled() or f.exception())
+
+            if pending is None:
+                return await self._open(future, timeout)
+
+            # Another session is already connecting to the jump host, waiting for it
+            # instead of opening one more connection
+            try:
+                await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled() or asyncio.current_task().cancelling():
+                    raise
+                # The connecting session was cancelled, retrying on our own
+
+    async def _open(self, future: asyncio.Future, timeout: float) -> asyncssh.SSHClientConnection:
+        try:
+            conn = await self._connect(timeout)
+        except BaseException as e:
+            async with self._lock:
+                self._pending = None
+            if isinstance(e, Exception):
+                self.stats.failures += 1
+                future.set_exception(e)
+            else:
+                future.cancel()
+            raise
+
+        async with self._lock:
+            self._pending = None
+            self._connections.append(_JumpConnection(conn, channels=1))
+            self.stats.connections += 1
+            logger.debug(f'Opened connection #{len(self._connections)} to jump host {self.name}')
+            self._session_started()
+        future.set_result(conn)
+
+        return conn
+
+    def _session_started(self) -> None:
+        self.stats.sessions += 1
+        if self._busy_since is None:
+            self._busy_since = time.monotonic()
+
+    async def release(self, conn: asyncssh.SSHClientConnection) -> None:
+        """
+        Return a channel reserved with acquire().
+
+        Spare jump host connections are closed once they carry no channels.
+        """
+        to_close = None
+        async with self._lock:
+            for jump in self._connections:
+                if jump.conn is conn:
+                    jump.channels -= 1
+                    if jump.channels == 0 and len(self._connections) > 1:
+                        self._connections.remove(jump)
+                        to_close = conn
+                    break
+            if self.channels == 0 and self._busy_since is not None:
+                self.stats.busy_time += time.monotonic() - self._busy_since
+                self._busy_since = None
+
+        if to_close is not None:
+            to_close.close()
+            await to_close.wait_closed()
+
+    async def close_all(self) -> None:
+        """
+        Close all connections to the jump host.
+        """
+        async with self._lock:
+            connections, self._connections = self._connections, []
+            if self._busy_since is not None:
+                self.stats.busy_time += time.monotonic() - self._busy_since
+                self._busy_since = None
+
+        for jump in connections:
+            jump.conn.close()
+            await jump.conn.wait_closed()
+
+    async def _connect(self, timeout: float) -> asyncssh.SSHClientConnection:
+        if self._keyfile is not None and self._password is None:
+            credentials = {'client_keys': [self._keyfile]}
+        elif self._password is not None and self._keyfile is None:
+            credentials = {'password': self._password}
+        else:
+            raise Exception('Must provide either password or keyfile for the jump host')
+
+        return await asyncio.wait_for(asyncssh.connect(
+            host=self._host,
+            port=self._port,
+            username=self._username,
+            known_hosts=None,
+            keepalive_interval=self._keepalive_interval,
+            keepalive_count_max=self._keepalive_count_max,
+            **credentials
+        ), timeout=timeout)
+
+class JumpRoute:
+    """
+    The jump hosts a single router is reachable through.
+
+    Implements the same acquire()/release() interface as JumpHostPool, picking the
+    best of the candidate jump hosts on every acquisition.
+    """
+    def __init__(self, balancer: 'JumpHostBalancer', candidates: list[JumpHostPool]):
+        self._balancer = balancer
+        self._candidates = candidates
+        self._owners: dict[asyncssh.SSHClientConnection, JumpHostPool] = {}
+
+    async def acquire(self, timeout: float = 10) -> asyncssh.SSHClientConnection:
+        conn, pool = await self._balancer.acquire(self._candidates, timeout)
+        self._owners[conn] = pool
+        return conn
+
+    async def release(self, conn: asyncssh.SSHClientConnection) -> None:
+        pool = self._owners.pop(conn, None)
+        if pool is not None:
+            await pool.release(conn)
+
+class JumpHostBalancer:
+    """
+    Distributes router sessions across several jump hosts.
+
+    Jump hosts can be mapped to inventory sites and subnets. A router is routed through
+    the jump hosts mapped to it, or through the unmapped ones if there are none. Among
+    the candidates the jump host with the lowest RTT weighted by its current channel
+    load is chosen, and jump hosts that fail to connect are skipped for a while.
+    RTTs are measured again every MEASURE_INTERVAL seconds, and for failed jump hosts
+    once they're tried again, without delaying sessions.
+    """
+    def __init__(self):
+        self.pools: list[JumpHostPool] = []
+        self._sites: dict[str, list[JumpHostPool]] = {}
+        self._subnets: list[tuple[ipaddress.IPv4Network | ipaddress.IPv6Network, JumpHostPool]] = []
+        self._unmapped: list[JumpHostPool] = []
+        self._measure_lock = asyncio.Lock()
+        self._measured_at: float | None = None
+        self._measuring: asyncio.Task | None = None
+
+    def add(self, pool: JumpHostPool, sites: list[str] | None = None, subnets: list[str] | None = None) -> None:
+        """
+        Add a jump host.
+
+        Args:
+            pool: The jump host connection pool.
+            sites: Inventory sites routed through the jump host.
+            subnets: Router subnets routed through the jump host.
+        """
+        self.pools.append(pool)
+        for site in sites or []:
+            self._sites.setdefault(site, []).append(pool)
+        for subnet in subnets or []:
+            self._subnets.append((ipaddress.ip_network(subnet, strict=False), pool))
+        if not sites and not subnets:
+            self._unmapped.append(pool)
+
+    def route(self, host: InventoryItem) -> JumpRoute:
+        """
+        Return the route through the jump hosts serving the host.
+        """
+        candidates = list(self._sites.get(host.site or '', []))
+        try:
+            address = ipaddress.ip_address(host.address)
+        except ValueError:
+            address = None
+        if address is not None:
+            for network, pool in self._subnets:
+                if address in network and pool not in candidates:
+                    candidates.append(pool)
+
+        return JumpRoute(self, candidates or self._unmapped or self.pools)
+
+    async def acquire(self, candidates: list[JumpHostPool], timeout: float) -> tuple[asyncssh.SSHClientConnection, JumpHostPool]:
+        await self._measure()
+
+        last_error: Exception | None = None
+        for pool in self._rank(candidates):
+            try:
+                return await pool.acquire(timeout), pool
+            except Exception as e:
+                logger.warning(f'Jump host {pool.name} failed, failing over: {e!r}')
+                pool.down_until = time.monotonic() + FAILOVER_HOLDDOWN
+                pool.rtt = None
+                last_error = e
+
+        if last_error is not None:
+            raise last_error
+        raise ConnectionError('No jump host available')
+
+    def _rank(self, candidates: list[JumpHostPool]) -> list[JumpHostPool]:
+        now = time.monotonic()
+        available = [pool for pool in candidates if pool.down_until <= now]
+        if not available:
+            # Every candidate failed recently, retrying them anyway is better than giving up
+            available = list(candidates)
+
+        def score(pool: JumpHostPool) -> float:
+            rtt = pool.rtt if pool.rtt is not None else FAILOVER_HOLDDOWN
+            return rtt * (1 + pool.load)
+
+        return sorted(available, key=score)
+
+    async def _measure(self) -> None:
+        if len(self.pools) < 2:
+            return
+
+        if self._measured_at is None:
+            # Sessions wait for the first measurement, there's nothing to rank by yet
+            async with self._measure_lock:
+                if self._measured_at is None:
+                    await self._measure_pools(self.pools)
+            return
+
+        if self._measuring is not None and not self._measuring.done():
+            return
+        now = time.monotonic()
+        if now - self._measured_at >= MEASURE_INTERVAL:
+            pools = self.pools
+        else:
+            # Failed jump hosts are measured again once their hold-down expires
+            pools = [pool for pool in self.pools if pool.rtt is None and pool.down_until <= now]
+        if pools:
+            self._measuring = asyncio.create_task(self._measure_pools(pools))
+
+    async def _measure_pools(self, pools: list[JumpHostPool]) -> None:
+        await asyncio.gather(*(pool.measure_rtt() for pool in pools))
+        now = time.monotonic()
+        for pool in pools:
+            if pool.rtt is None:
+                # Unreachable, skipped until the next attempt
+                pool.down_until = max(pool.down_until, now + FAILOVER_HOLDDOWN)
+        if len(pools) == len(self.pools):
+            self._measured_at = now
+
+    async def close_all(self) -> None:
+        if self._measuring is not None:
+            self._measuring.cancel()
+        for pool in self.pools:
+            await pool.close_all()
+
+    def summary(self) -> list[str]:
+        """
+        Return per jump host statistics lines for the run summary.
+        """
+        lines = []
+        for pool in self.pools:
+            stats = pool.stats
+            if not stats.sessions and not stats.failures:
+                continue
+            rtt = f'{pool.rtt * 1000:.1f}ms' if pool.rtt is not None else 'n/a'
+            lines.append(
+                f'Jump host {pool.name}: {stats.sessions} sessions over {stats.connections} connections, '
+                f'{stats.sessions_per_second:.1f} sessions/s, RTT {rtt}, {stats.failures} failures'
+            )
+
+        return lines
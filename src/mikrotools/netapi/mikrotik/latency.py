@@ -0,0 +1,111 @@
+import json
+import logging
+import math
+import os
+
+from mikrotools.config import get_cache_dir
+
+logger = logging.getLogger(__name__)
+
+class LatencyTracker:
+    """
+    Per-host history of handshake and command latencies, persisted between runs.
+
+    Timeouts are derived from the history as a high percentile of the observed
+    latencies multiplied by a safety factor, so fast hosts fail fast when they go
+    down and slow links get enough time instead of being reported as offline.
+    """
+    def __init__(
+        self,
+        path: str | None = None,
+        factor: float = 3.0,
+        percentile: float = 0.99,
+        min_samples: int = 5,
+        max_samples: int = 50
+    ):
+        """
+        Initialize the tracker.
+
+        Args:
+            path: The history file, defaults to ~/.cache/mikrotools/latency.json.
+            factor: The percentile latency is multiplied by this factor.
+            percentile: The percentile of the latency history used, from 0 to 1.
+            min_samples: Samples required before the history is used instead of the default.
+            max_samples: Samples kept per host and kind.
+        """
+        self.path = path or os.path.join(get_cache_dir(), 'latency.json')
+        self.factor = factor
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.max_samples = max_samples
+        self._history: dict[str, dict[str, list[float]]] | None = None
+        self._dirty = False
+
+    @property
+    def history(self) -> dict[str, dict[str, list[float]]]:
+        if self._history is None:
+            self._history = self._load()
+        return self._history
+
+    def _load(self) -> dict[str, dict[str, list[float]]]:
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f'Ignoring corrupted latency history {self.path}: {e}')
+            return {}
+
+    def record(self, address: str, kind: str, latency: float) -> None:
+        """
+        Record a latency sample.
+
+        Args:
+            address: The host address.
+            kind: 'connect' or 'command'.
+            latency: Seconds the operation took.
+        """
+        samples = self.history.setdefault(address, {}).setdefault(kind, [])
+        samples.append(round(latency, 4))
+        del samples[:-self.max_samples]
+        self._dirty = True
+
+    def timeout(self, address: str, kind: str, default: float, floor: float, ceiling: float) -> float:
+        """
+        Return the timeout for an operation on a host.
+
+        Args:
+            address: The host address.
+            kind: 'connect' or 'command'.
+            default: The timeout used until enough samples are recorded.
+            floor: The minimum timeout.
+            ceiling: The maximum timeout.
+        """
+        samples = self.history.get(address, {}).get(kind, [])
+        if len(samples) < self.min_samples:
+            return default
+
+        ordered = sorted(samples)
+        index = min(len(ordered) - 1, math.ceil(self.percentile * len(ordered)) - 1)
+
+        return min(ceiling, max(floor, ordered[index] * self.factor))
+
+    def save(self) -> None:
+        """
+        Write the history to disk if it changed.
+        """
+        if not self._dirty:
+            return
+
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f'{self.path}.{os.getpid()}.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(self.history, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f'Failed to save latency history {self.path}: {e}')
+            return
+
+        self._dirty = False
@@ -0,0 +1,139 @@
+import asyncio
+import logging
+import statistics
+import time
+
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+logger = logging.getLogger(__name__)
+
+class LimiterSlot:
+    """
+    A slot held inside AdaptiveLimiter.acquire().
+
+    The time spent inside the context is recorded unless the caller sets `latency`
+    to the duration of the part that reflects device capacity, e.g. a handshake
+    without waiting for a jump host channel.
+    """
+    __slots__ = ('latency',)
+
+    def __init__(self):
+        self.latency: float | None = None
+
+class AdaptiveLimiter:
+    """
+    An AIMD concurrency limiter driven by observed latency and timeouts.
+
+    The limit grows by one after every window of `limit` healthy operations and is
+    multiplied by `backoff` when an operation times out or the fleet-wide median latency
+    of the last `window_size` operations exceeds the baseline by more than
+    `latency_tolerance` times. The baseline is the lowest median seen so far, drifting
+    up slowly to follow lasting changes of the network. Comparing medians of the whole
+    fleet keeps single slow hosts (WAN, satellite) from counting as degradation, while
+    every host contributes to detecting overload even if it's connected only once.
+    Decreases happen at most once per recovery window, so a single burst of failures
+    doesn't collapse the limit to the minimum.
+    """
+    def __init__(
+        self,
+        initial: int = 32,
+        min_limit: int = 4,
+        max_limit: int = 256,
+        latency_tolerance: float = 2.0,
+        backoff: float = 0.5,
+        window_size: int = 50
+    ):
+        """
+        Initialize the limiter.
+
+        Args:
+            initial: Initial concurrency limit.
+            min_limit: The limit never goes below this value.
+            max_limit: The limit never goes above this value.
+            latency_tolerance: A median latency above baseline * latency_tolerance counts as degraded.
+            backoff: Factor the limit is multiplied by on degradation.
+            window_size: Number of latencies the median is taken over.
+        """
+        self.min_limit = min_limit
+        self.max_limit = max(min_limit, max_limit)
+        self.limit = float(max(min_limit, min(initial, self.max_limit)))
+        self.latency_tolerance = latency_tolerance
+        self.backoff = backoff
+        self.window_size = window_size
+        self.timeouts = 0
+        self.baseline: float | None = None
+        self._latencies: list[float] = []
+        # The recovery window after a decrease follows the latency that caused it
+        self._recovery = 1.0
+        self._successes = 0
+        self._last_decrease = 0.0
+        self._in_flight = 0
+        self._condition = asyncio.Condition()
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[LimiterSlot]:
+        """
+        Wait for a free slot and hold it for the duration of the context.
+
+        The latency of the slot, or the time spent inside the context if it's not set,
+        is added to the fleet-wide latency window. TimeoutError raised inside the context
+        is recorded as a timeout, other errors don't affect the limit.
+        """
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._in_flight < int(self.limit))
+            self._in_flight += 1
+
+        slot = LimiterSlot()
+        start = time.monotonic()
+        try:
+            yield slot
+        except TimeoutError:
+            self.timeouts += 1
+            self._decrease('timeout')
+            raise
+        else:
+            self._record_latency(slot.latency if slot.latency is not None else time.monotonic() - start)
+        finally:
+            async with self._condition:
+                self._in_flight -= 1
+                # Waking only as many waiters as there are free slots, as there may be
+                # thousands of them
+                self._condition.notify(max(0, int(self.limit) - self._in_flight))
+
+    def _record_latency(self, latency: float) -> None:
+        self._latencies.append(latency)
+        if len(self._latencies) >= self.window_size:
+            median = statistics.median(self._latencies)
+            self._latencies.clear()
+            baseline = self.baseline
+            if baseline is None:
+                self.baseline = median
+            else:
+                # Tracking the lowest median, drifting up to follow changes of the network
+                self.baseline = min(median, baseline + (median - baseline) * 0.1)
+                if median > baseline * self.latency_tolerance:
+                    self._recovery = max(1.0, median)
+                    self._decrease(f'median latency {median:.2f}s, baseline {baseline:.2f}s')
+                    return
+
+        self._successes += 1
+        if self._successes >= int(self.limit):
+            self._successes = 0
+            if self.limit < self.max_limit:
+                self.limit = min(self.max_limit, self.limit + 1)
+                logger.debug(f'Concurrency limit increased to {int(self.limit)}')
+
+    def _decrease(self, reason: str) -> None:
+        now = time.monotonic()
+        if now - self._last_decrease < self._recovery:
+            return
+
+        self._last_decrease = now
+        self._successes = 0
+        self.limit = max(self.min_limit, self.limit * self.backoff)
+        logger.debug(f'Concurrency limit decreased to {int(self.limit)} ({reason})')
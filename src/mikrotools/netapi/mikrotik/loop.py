@@ -0,0 +1,90 @@
+import asyncio
+import concurrent.futures
+import logging
+import threading
+
+from collections.abc import Coroutine
+from typing import Any, TypeVar
+
+logger = logging.getLogger(__name__)
+
+R = TypeVar('R')
+
+_loop: asyncio.AbstractEventLoop | None = None
+_thread: threading.Thread | None = None
+_lock = threading.Lock()
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """
+    Return the background event loop, starting it on first use.
+
+    All connections are made on this loop, so the synchronous API and the async
+    commands share a single connection pool.
+    """
+    global _loop, _thread
+
+    with _lock:
+        if _loop is None or _loop.is_closed():
+            _loop = asyncio.new_event_loop()
+            # A daemon thread doesn't keep the process alive if the loop is never stopped
+            _thread = threading.Thread(target=_loop.run_forever, name='mikrotools-loop', daemon=True)
+            _thread.start()
+            logger.debug('Started background event loop')
+
+        return _loop
+
+def in_loop_thread() -> bool:
+    return _thread is not None and threading.current_thread() is _thread
+
+class _Escaped(Exception):
+    """
+    Carries SystemExit or KeyboardInterrupt raised by a coroutine to the waiting thread.
+    """
+    def __init__(self, exception: BaseException):
+        super().__init__(exception)
+        self.exception = exception
+
+async def _contain(coro: Coroutine[Any, Any, R]) -> R:
+    try:
+        return await coro
+    except (SystemExit, KeyboardInterrupt) as e:
+        # Raised on the loop these would stop it, leaving the thread waiting for the result
+        # blocked forever, so they're re-raised by wait() instead
+        raise _Escaped(e) from None
+
+def submit(coro: Coroutine[Any, Any, R]) -> concurrent.futures.Future[R]:
+    """
+    Schedule a coroutine on the background loop and return a thread-safe future.
+
+    The result should be retrieved with wait(), which re-raises SystemExit and
+    KeyboardInterrupt raised by the coroutine.
+    """
+    return asyncio.run_coroutine_threadsafe(_contain(coro), get_loop())
+
+def wait(future: concurrent.futures.Future[R]) -> R:
+    """
+    Wait for a future returned by submit() and return its result.
+    """
+    try:
+        return future.result()
+    except _Escaped as e:
+        raise e.exception from None
+
+def run_sync(coro: Coroutine[Any, Any, R]) -> R:
+    """
+    Run a coroutine on the background loop and wait for its result.
+
+    Raises:
+        RuntimeError: If called from the loop thread, where waiting would deadlock.
+    """
+    if in_loop_thread():
+        coro.close()
+        raise RuntimeError('run_sync() called from the background event loop')
+
+    future = submit(coro)
+    try:
+        return wait(future)
+    except BaseException:
+        # Cancelling the task on KeyboardInterrupt, so its sessions are released
+        future.cancel()
+        raise
@@ -1,18 +1,31 @@
-import asyncio
+import concurrent.futures
 import logging
-import threading
 
 from abc import ABC, abstractmethod
-from contextlib import contextmanager, asynccontextmanager, suppress
-from paramiko.ssh_exception import SSHException
-from typing import Generator, AsyncGenerator, Protocol, TypeVar, Generic, overload, runtime_checkable
+from contextlib import contextmanager, asynccontextmanager
+from asyncssh import PermissionDenied
+from typing import Awaitable, Callable, Generator, AsyncGenerator, Iterator, Protocol, TypeVar, Generic, overload, runtime_checkable
 
 from mikrotools.config import Config
 from mikrotools.inventory import InventoryItem
 
-from .client import MikrotikSSHClient, AsyncMikrotikSSHClient
+from .api import API_PORT, API_TLS_PORT, AsyncMikrotikAPIClient
+from .client import CONNECTION_ERRORS, MikrotikSSHClient, AsyncMikrotikSSHClient
+from .jumphost import JumpHostBalancer, JumpHostPool
+from .latency import LatencyTracker
+from .limiter import AdaptiveLimiter
+from .loop import run_sync, submit, wait
+from .negcache import CachedFailureError, NegativeCache
+from .pool import ConnectionPool
+from .probe import probe_hosts
+from .ratelimit import ConnectionRateLimiter
+from .retry import CircuitBreaker, RetryPolicy
+from .transport import asyncssh_options
 
 T = TypeVar('T', bound='BaseClient')
+R = TypeVar('R')
+
+AsyncMikrotikClient = AsyncMikrotikSSHClient | AsyncMikrotikAPIClient
 
 logger = logging.getLogger(__name__)
 
@@ -40,14 +53,10 @@ class BaseClient(Protocol):
 
 class BaseManager(ABC, Generic[T]):
     _config: Config = None
-    _connections: dict[str, T]
-    _lock: threading.Lock | asyncio.Lock
-    _semaphore: threading.Semaphore | asyncio.Semaphore
     
     @classmethod
     def configure(cls, config: Config) -> None:
         cls._config = config
-        cls._connections.clear()
     
     @overload
     @classmethod
@@ -78,135 +87,401 @@ class BaseManager(ABC, Generic[T]):
         raise NotImplementedError
 
 class MikrotikManager(BaseManager[MikrotikSSHClient]):
-    _lock = threading.Lock()
-    _semaphore = threading.Semaphore(100)
-    _connections = {}
+    """
+    Synchronous facade over AsyncMikrotikManager.
+    
+    Sessions are taken from the async manager's pool on the shared background event
+    loop, so sync callers get the same limiter, retries and caches as async commands.
+    """
+    @classmethod
+    def configure(cls, config: Config) -> None:
+        cls._config = config
+        AsyncMikrotikManager.configure(config)
     
     @classmethod
     def get_connection(cls, host: InventoryItem) -> MikrotikSSHClient:
-        if host.address in cls._connections:
-            client = cls._connections[host.address]
-            if client and client.is_connected:
-                return client
-            # Remove the client from the connection pool if it's not connected
-            with cls._lock:
-                del cls._connections[host]
-        
-        if not cls._config:
-            raise RuntimeError('MikrotikManager is not configured')
+        """
+        Acquires a session on the pooled connection to the host, connecting if needed.
+        The session must be returned with release_connection().
+        """
+        client = run_sync(AsyncMikrotikManager.get_connection(host))
+        return MikrotikSSHClient(host.address, username=None, client=client)
+    
+    @classmethod
+    def probe(cls, hosts: list[InventoryItem]) -> tuple[list[InventoryItem], list[InventoryItem]]:
+        """
+        Splits hosts into reachable and unreachable ones, see AsyncMikrotikManager.probe().
+        """
+        return run_sync(AsyncMikrotikManager.probe(hosts))
+    
+    @classmethod
+    def release_connection(cls, host: InventoryItem, client: MikrotikSSHClient, discard: bool = False) -> None:
+        run_sync(AsyncMikrotikManager.release_connection(host, client._client, discard=discard))
+    
+    @classmethod
+    def run(
+        cls,
+        host: InventoryItem,
+        operation: Callable[[AsyncMikrotikClient], Awaitable[R]],
+        retry: bool = True
+    ) -> R:
+        """
+        Runs an operation in a session on the host, see AsyncMikrotikManager.run().
+        The operation receives the async client, e.g. `lambda device: device.get_identity()`.
+        """
+        return run_sync(AsyncMikrotikManager.run(host, operation, retry=retry))
+    
+    @classmethod
+    def run_many(
+        cls,
+        hosts: list[InventoryItem],
+        operation: Callable[[AsyncMikrotikClient], Awaitable[R]],
+        retry: bool = True
+    ) -> Iterator[tuple[InventoryItem, R | Exception]]:
+        """
+        Runs an operation on all hosts concurrently, see run().
         
-        username = cls._config.ssh.username
-        port = cls._config.ssh.port
-        password = cls._config.ssh.password
-        keyfile = cls._config.ssh.keyfile or None
-        with cls._semaphore:
-            try:
-                client = MikrotikSSHClient(
-                    host=host.address,
-                    port=port,
-                    username=username,
-                    password=password,
-                    keyfile=keyfile
-                )
-                client.connect()
-                with cls._lock: # protect _connections with a lock
-                    cls._connections[host.address] = client
-                
-                return client
-            except Exception as e:
-                raise e
+        Yields (host, result) pairs in the order of completion. If the operation failed,
+        the result is the exception raised. Concurrency is limited by the async manager.
+        Operations not completed yet are cancelled if the iteration is interrupted.
+        """
+        futures = {submit(AsyncMikrotikManager.run(host, operation, retry=retry)): host for host in hosts}
+        try:
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    yield futures[future], wait(future)
+                except Exception as e:
+                    yield futures[future], e
+        finally:
+            for future in futures:
+                future.cancel()
     
     @classmethod
     def close_all(cls) -> None:
-        logger.debug('Closing all connections for MikrotikManager')
-        for address, client in list(cls._connections.items()):
-            with suppress(Exception):
-                client.disconnect()
-            with cls._lock:
-                del cls._connections[address]
+        run_sync(AsyncMikrotikManager.close_all())
     
     @classmethod
     @contextmanager
     def session(cls, host: InventoryItem) -> Generator[MikrotikSSHClient, None, None]:
-        client = cls.get_connection(host)
-        if not client or not client.is_connected:
-            raise ConnectionError(f'No active connection to {host.address}')
-        
+        # The async session decides whether the connection is returned to the pool or discarded
+        async_session = AsyncMikrotikManager.async_session(host)
+        client = run_sync(async_session.__aenter__())
         try:
-            yield client
-        except SSHException as e:
-            with cls._lock:
-                if host.address in cls._connections:
-                    del cls._connections[host.address]
-            client.disconnect()
-            raise e
-        finally:
-            # The client is returned to the connection pool and doesn't need to be explicitly closed here.
-            pass
+            yield MikrotikSSHClient(host.address, username=None, client=client)
+        except BaseException as e:
+            if not run_sync(async_session.__aexit__(type(e), e, e.__traceback__)):
+                raise
+        else:
+            run_sync(async_session.__aexit__(None, None, None))
 
-class AsyncMikrotikManager(BaseManager[AsyncMikrotikSSHClient]):
-    _lock = asyncio.Lock()
-    _semaphore = asyncio.Semaphore(100)
-    _connections = {}
+class AsyncMikrotikManager(BaseManager[AsyncMikrotikClient]):
+    _pool: ConnectionPool[AsyncMikrotikClient] = ConnectionPool()
+    _limiter: AdaptiveLimiter = AdaptiveLimiter()
+    _rate_limiter: ConnectionRateLimiter = ConnectionRateLimiter()
+    _jumps: JumpHostBalancer | None = None
+    _negative_cache: NegativeCache | None = None
+    _latency: LatencyTracker | None = None
+    _retry: RetryPolicy = RetryPolicy()
+    _breaker: CircuitBreaker = CircuitBreaker(stats=_retry.stats)
+    
+    @classmethod
+    def configure(cls, config: Config) -> None:
+        cls._config = config
+        cls._limiter = AdaptiveLimiter(
+            initial=config.ssh.concurrency.initial,
+            min_limit=config.ssh.concurrency.min,
+            # Handshakes beyond the pool size would only evict idle connections
+            max_limit=min(config.ssh.concurrency.max, config.pool.max_connections),
+            latency_tolerance=config.ssh.concurrency.latency_tolerance
+        )
+        cls._rate_limiter = ConnectionRateLimiter(
+            rate=config.ssh.rate_limit.rate,
+            burst=config.ssh.rate_limit.burst,
+            scope=config.ssh.rate_limit.scope,
+            prefix_length=config.ssh.rate_limit.prefix_length
+        )
+        cls._jumps = None
+        if config.ssh.jump:
+            cls._jumps = JumpHostBalancer()
+            for jumphost in config.ssh.jumphosts or [config.ssh.jumphost]:
+                if not jumphost.address:
+                    raise ValueError('Jump host address is not specified')
+                pool = JumpHostPool(
+                    host=jumphost.address,
+                    port=jumphost.port,
+                    username=jumphost.username or config.ssh.username,
+                    password=jumphost.password,
+                    keyfile=jumphost.keyfile,
+                    max_channels=jumphost.max_channels,
+                    keepalive_interval=config.ssh.keepalive_interval,
+                    keepalive_count_max=config.ssh.keepalive_count_max,
+                    name=jumphost.name
+                )
+                cls._jumps.add(pool, sites=jumphost.sites, subnets=jumphost.subnets)
+        cls._retry = RetryPolicy(
+            max_attempts=config.retry.max_attempts,
+            base_delay=config.retry.base_delay,
+            max_delay=config.retry.max_delay,
+            budget=config.retry.budget
+        )
+        cls._breaker = CircuitBreaker(
+            threshold=config.retry.breaker_threshold,
+            reset_timeout=config.retry.breaker_reset_timeout,
+            stats=cls._retry.stats
+        )
+        cls._latency = None
+        if config.timeouts.adaptive:
+            cls._latency = LatencyTracker(path=config.timeouts.history_path, factor=config.timeouts.factor)
+        cls._negative_cache = None
+        if config.negative_cache.enabled:
+            cls._negative_cache = NegativeCache(
+                path=config.negative_cache.path,
+                ttl=config.negative_cache.ttl,
+                max_ttl=config.negative_cache.max_ttl
+            )
+        cls._pool = ConnectionPool(
+            max_connections=config.pool.max_connections,
+            max_sessions_per_host=config.pool.max_sessions_per_host,
+            idle_timeout=config.pool.idle_timeout,
+            probe_after=config.pool.probe_after
+        )
 
     @classmethod
-    async def get_connection(cls, host: InventoryItem) -> AsyncMikrotikSSHClient:
-        if host.address in cls._connections:
-            client = cls._connections[host.address]
-            if client and client.is_connected:
-                return client
-            
-            async with cls._lock:
-                del cls._connections[host.address]
-            
-        if not cls._config:
-            raise RuntimeError('AsyncMikrotikManager is not configured')
-            
+    def _uses_api(cls, cli: bool) -> bool:
+        # Commands needing the CLI (exports, scripts, arbitrary commands) can't be
+        # expressed as API sentences, so they always use SSH
+        return cls._config.api.enabled and not cli
+    
+    @classmethod
+    def _pool_key(cls, host: InventoryItem, cli: bool) -> str:
+        # SSH connections opened for CLI commands are pooled apart from API connections
+        if cls._config.api.enabled and cli:
+            return f'{host.address}/ssh'
+        return host.address
+    
+    @classmethod
+    def _create_client(cls, host: InventoryItem, cli: bool = False) -> AsyncMikrotikClient:
         username = cls._config.ssh.username
-        port = cls._config.ssh.port
         password = cls._config.ssh.password
         keyfile = cls._config.ssh.keyfile or None
+        jump = cls._jumps.route(host) if cls._jumps is not None else None
+        
+        if cls._uses_api(cli):
+            return AsyncMikrotikAPIClient(
+                host=host.address,
+                port=cls._config.api.port,
+                username=username,
+                password=password,
+                keyfile=keyfile,
+                tls=cls._config.api.tls,
+                verify_tls=cls._config.api.verify_tls,
+                jump=jump
+            )
+        
+        return AsyncMikrotikSSHClient(
+            host=host.address,
+            port=cls._config.ssh.port,
+            username=username,
+            password=password,
+            keyfile=keyfile,
+            persistent_channel=cls._config.ssh.persistent_channel,
+            keepalive_interval=cls._config.ssh.keepalive_interval,
+            keepalive_count_max=cls._config.ssh.keepalive_count_max,
+            jump=jump,
+            transport_options=asyncssh_options(cls._config.ssh.transport)
+        )
+
+    @classmethod
+    def _timeout(cls, host: InventoryItem, kind: str) -> float:
+        timeouts = cls._config.timeouts
+        if kind == 'connect':
+            default, floor, ceiling = cls._config.ssh.transport.connect_timeout, timeouts.connect_min, timeouts.connect_max
+        else:
+            default, floor, ceiling = timeouts.command, timeouts.command_min, timeouts.command_max
+        
+        if cls._latency is None:
+            return default
         
-        async with cls._semaphore:
+        return cls._latency.timeout(host.address, kind, default, floor, ceiling)
+    
+    @classmethod
+    async def _connect(cls, host: InventoryItem, cli: bool = False) -> AsyncMikrotikClient:
+        client = cls._create_client(host, cli)
+        if cls._latency is not None:
+            latency = cls._latency
+            client.latency_observer = lambda seconds: latency.record(host.address, 'command', seconds)
+        # New connections are paced to avoid SYN and authentication bursts,
+        # independently of how many handshakes may run at once
+        await cls._rate_limiter.acquire(host)
+        # Handshakes are limited adaptively to follow available capacity
+        async with cls._limiter.acquire() as slot:
+            await client.connect(timeout=cls._timeout(host, 'connect'))
+            # Waiting for a jump host channel doesn't reflect the load of the devices
+            slot.latency = client.handshake_time
+        
+        if cls._latency is not None:
+            cls._latency.record(host.address, 'connect', client.handshake_time)
+        
+        return client
+    
+    @classmethod
+    async def probe(cls, hosts: list[InventoryItem]) -> tuple[list[InventoryItem], list[InventoryItem]]:
+        """
+        Splits hosts into reachable and unreachable ones by probing the SSH or API port,
+        so that offline hosts don't wait for a full connection timeout each.
+        Returns all hosts as reachable if probing is disabled or a jump host is used.
+        """
+        if not cls._config or not cls._config.probe.enabled or cls._jumps is not None:
+            return hosts, []
+        
+        if cls._config.api.enabled:
+            port = cls._config.api.port or (API_TLS_PORT if cls._config.api.tls else API_PORT)
+        else:
+            port = cls._config.ssh.port
+        
+        return await probe_hosts(
+            hosts,
+            port,
+            timeout=cls._config.probe.timeout,
+            concurrency=cls._config.probe.concurrency
+        )
+    
+    @classmethod
+    async def get_connection(cls, host: InventoryItem, cli: bool = False) -> AsyncMikrotikClient:
+        """
+        Acquires a session on the pooled connection to the host, connecting if needed.
+        The session must be returned with release_connection().
+        
+        With cli set, the session is opened over SSH even if the API is enabled,
+        for commands the API can't run (exports, scripts, arbitrary CLI commands).
+        """
+        if not cls._config:
+            raise RuntimeError('AsyncMikrotikManager is not configured')
+        
+        if cls._negative_cache is not None and not cls._config.negative_cache.recheck:
+            entry = cls._negative_cache.check(host.address)
+            if entry is not None:
+                # The host failed in a previous run and its backoff hasn't expired yet
+                if entry.error == 'auth':
+                    raise PermissionDenied(f'{entry.message} (cached)')
+                raise CachedFailureError(f'{entry.message} (cached)')
+        
+        attempt = 0
+        while True:
+            cls._breaker.check(host.address)
             try:
-                client = AsyncMikrotikSSHClient(
-                    host=host.address,
-                    port=port,
-                    username=username,
-                    password=password,
-                    keyfile=keyfile
-                )
-                await client.connect()
-                async with cls._lock: # protect _connections with a lock
-                    cls._connections[host.address] = client
-                return client
+                client = await cls._pool.acquire(cls._pool_key(host, cli), lambda: cls._connect(host, cli))
             except Exception as e:
-                raise e
+                cls._breaker.record_failure(host.address, e)
+                if await cls._retry.backoff(host.address, e, attempt):
+                    attempt += 1
+                    continue
+                if cls._negative_cache is not None:
+                    cls._negative_cache.record_failure(host.address, e)
+                raise
+            
+            cls._breaker.record_success(host.address)
+            if cls._negative_cache is not None:
+                cls._negative_cache.record_success(host.address)
+            client.command_timeout = cls._timeout(host, 'command')
+            
+            return client
+    
+    @classmethod
+    async def run(
+        cls,
+        host: InventoryItem,
+        operation: Callable[[AsyncMikrotikClient], Awaitable[R]],
+        retry: bool = True,
+        cli: bool = False
+    ) -> R:
+        """
+        Runs an operation in a session on the host.
+        
+        Connection errors are always retried by get_connection(). With retry enabled,
+        the whole operation is also retried if it fails with a transient or busy error
+        after the session was established, so it must be safe to repeat.
+        With cli set, the session is opened over SSH, see get_connection().
+        """
+        attempt = 0
+        while True:
+            connected = False
+            try:
+                async with cls.async_session(host, cli=cli) as device:
+                    connected = True
+                    return await operation(device)
+            except Exception as e:
+                if not connected:
+                    raise
+                cls._breaker.record_failure(host.address, e)
+                if not retry or not await cls._retry.backoff(host.address, e, attempt):
+                    raise
+                attempt += 1
+    
+    @classmethod
+    async def release_connection(cls, host: InventoryItem, client: AsyncMikrotikClient, discard: bool = False) -> None:
+        cli = not isinstance(client, AsyncMikrotikAPIClient)
+        await cls._pool.release(cls._pool_key(host, cli), client, discard=discard)
     
     @classmethod
     @asynccontextmanager
-    async def async_session(cls, host: InventoryItem) -> AsyncGenerator[AsyncMikrotikSSHClient, None]:
-        client = await cls.get_connection(host)
+    async def async_session(cls, host: InventoryItem, cli: bool = False) -> AsyncGenerator[AsyncMikrotikClient, None]:
+        client = await cls.get_connection(host, cli=cli)
         if not client or not client.is_connected:
+            await cls.release_connection(host, client, discard=True)
             raise ConnectionError(f'No active connection to {host.address}')
         
         try:
             yield client
-        except Exception as e:
-            async with cls._lock:
-                if host.address in cls._connections:
-                    del cls._connections[host.address]
-            await client.disconnect()
+        except BaseException as e:
+            # Command errors leave the connection usable, so it's only discarded
+            # if it was lost or the session was interrupted
+            discard = (
+                not client.is_connected
+                or isinstance(e, CONNECTION_ERRORS)
+                or not isinstance(e, Exception)
+            )
+            await cls.release_connection(host, client, discard=discard)
             raise e
-        finally:
+        else:
             # The client is returned to the connection pool and doesn't need to be explicitly closed here.
-            pass
+            await cls.release_connection(host, client)
     
     @classmethod
     async def close_all(cls) -> None:
         logger.debug('Closing all connections for AsyncMikrotikManager')
-        for address, client in list(cls._connections.items()):
-            with suppress(Exception):
-                await client.disconnect()
-            async with cls._lock: # protect _connections with a lock
-                del cls._connections[address]
+        logger.debug(f'Concurrency limit: {int(cls._limiter.limit)}, handshake timeouts: {cls._limiter.timeouts}')
+        stats = cls._rate_limiter.stats
+        if stats.delayed:
+            logger.debug(
+                f'Rate limiter delayed {stats.delayed} of {stats.acquired} connections, '
+                f'average wait {stats.average_wait:.2f}s, max wait {stats.max_wait:.2f}s'
+            )
+        await cls._pool.close_all()
+        if cls._negative_cache is not None:
+            cls._negative_cache.save()
+        if cls._latency is not None:
+            cls._latency.save()
+        if cls._jumps is not None:
+            await cls._jumps.close_all()
+    
+    @classmethod
+    def summary(cls) -> list[str]:
+        """
+        Returns statistics lines of the run to be shown after the command completes.
+        """
+        lines = []
+        stats = cls._retry.stats
+        if stats.total or stats.budget_exhausted or stats.circuits_opened:
+            by_kind = ', '.join(f'{kind.value} {count}' for kind, count in stats.retries.items())
+            lines.append(
+                f'Retries: {stats.total}{f" ({by_kind})" if by_kind else ""}, '
+                f'denied by budget: {stats.budget_exhausted}, circuits opened: {stats.circuits_opened}'
+            )
+            if stats.hosts:
+                hosts = ', '.join(f'{address} ({count})' for address, count in stats.hosts.most_common(10))
+                lines.append(f'Most retried hosts: {hosts}')
+        if cls._jumps is not None:
+            lines.extend(cls._jumps.summary())
+        
+        return lines
@@ -1,6 +1,10 @@
+from .interface import *
+from .ip import *
 from .system import *
 
 __all__ = [
+    'Interface',
+    'IpAddress',
     'SystemPackageUpdate',
     'SystemRouterboard'
 ]
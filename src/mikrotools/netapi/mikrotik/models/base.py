@@ -6,3 +6,5 @@ def to_dash(string: str) -> str:
 class MikrotikBase(BaseModel):
     class Config:
         alias_generator = to_dash
+        # Serialized numbers are accepted for string fields such as mtu ('auto' or a number)
+        coerce_numbers_to_str = True
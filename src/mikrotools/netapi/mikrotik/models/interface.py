@@ -0,0 +1,18 @@
+from pydantic import Field
+
+from .base import MikrotikBase
+
+class Interface(MikrotikBase):
+    id: str | None = Field(None, alias='.id')
+    name: str
+    type: str | None = None
+    mtu: str | None = None # 'auto' on some interface types
+    actual_mtu: int | None = None
+    mac_address: str | None = None
+    running: bool | None = None
+    disabled: bool | None = None
+    comment: str | None = None
+
+__all__ = [
+    'Interface'
+]
@@ -0,0 +1,16 @@
+from pydantic import Field
+
+from .base import MikrotikBase
+
+class IpAddress(MikrotikBase):
+    id: str | None = Field(None, alias='.id')
+    address: str
+    network: str | None = None
+    interface: str | None = None
+    dynamic: bool | None = None
+    disabled: bool | None = None
+    comment: str | None = None
+
+__all__ = [
+    'IpAddress'
+]
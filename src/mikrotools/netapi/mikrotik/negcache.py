@@ -0,0 +1,137 @@
+import json
+import logging
+import os
+import time
+
+from dataclasses import asdict, dataclass
+
+from asyncssh import PermissionDenied
+
+from mikrotools.config import get_cache_dir
+
+logger = logging.getLogger(__name__)
+
+class CachedFailureError(TimeoutError):
+    """Raised instead of connecting to a host that recently failed to connect."""
+
+def classify_error(error: BaseException) -> str | None:
+    """
+    Classify a connection error for the negative cache.
+
+    Returns:
+        'timeout', 'auth' or 'unreachable', or None if the error isn't a connectivity
+        failure and shouldn't be cached.
+    """
+    if isinstance(error, TimeoutError):
+        return 'timeout'
+    if isinstance(error, PermissionDenied):
+        return 'auth'
+    if isinstance(error, OSError):
+        # Connection refused, no route to host, name resolution failures etc.
+        return 'unreachable'
+    return None
+
+@dataclass
+class FailureEntry:
+    error: str # Error class, see classify_error()
+    message: str
+    failures: int # Consecutive failures
+    last_failure: float # Unix timestamp
+    retry_after: float # Unix timestamp before which the host is skipped
+
+class NegativeCache:
+    """
+    An on-disk cache of hosts that recently failed to connect.
+
+    A host is skipped until its backoff expires. The backoff starts at ttl and is
+    doubled with every consecutive failure up to max_ttl. A successful connection
+    removes the host from the cache. Changes are written to disk by save().
+    """
+    def __init__(self, path: str | None = None, ttl: float = 300.0, max_ttl: float = 86400.0):
+        """
+        Initialize the cache.
+
+        Args:
+            path: The cache file, defaults to ~/.cache/mikrotools/unreachable.json.
+            ttl: Seconds a host is skipped after its first failure.
+            max_ttl: Maximum seconds a host is skipped after consecutive failures.
+        """
+        self.path = path or os.path.join(get_cache_dir(), 'unreachable.json')
+        self.ttl = ttl
+        self.max_ttl = max_ttl
+        self._entries: dict[str, FailureEntry] | None = None
+        self._dirty = False
+
+    @property
+    def entries(self) -> dict[str, FailureEntry]:
+        if self._entries is None:
+            self._entries = self._load()
+        return self._entries
+
+    def _load(self) -> dict[str, FailureEntry]:
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            return {address: FailureEntry(**entry) for address, entry in data.items()}
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning(f'Ignoring corrupted negative cache {self.path}: {e}')
+            return {}
+
+    def check(self, address: str) -> FailureEntry | None:
+        """
+        Return the cached failure of a host if it should still be skipped.
+        """
+        entry = self.entries.get(address)
+        if entry is not None and entry.retry_after > time.time():
+            return entry
+        return None
+
+    def record_failure(self, address: str, error: BaseException) -> None:
+        error_class = classify_error(error)
+        if error_class is None:
+            return
+
+        now = time.time()
+        previous = self.entries.get(address)
+        failures = previous.failures + 1 if previous is not None else 1
+        backoff = min(self.ttl * 2 ** (failures - 1), self.max_ttl)
+        self.entries[address] = FailureEntry(
+            error=error_class,
+            message=str(error) or error.__class__.__name__,
+            failures=failures,
+            last_failure=now,
+            retry_after=now + backoff
+        )
+        self._dirty = True
+        logger.debug(f'Caching {error_class} failure #{failures} of {address} for {backoff:.0f}s')
+
+    def record_success(self, address: str) -> None:
+        if self._entries is not None and self._entries.pop(address, None) is not None:
+            self._dirty = True
+
+    def save(self) -> None:
+        """
+        Write the cache to disk if it changed. Entries older than max_ttl are dropped.
+        """
+        if not self._dirty:
+            return
+
+        now = time.time()
+        data = {
+            address: asdict(entry) for address, entry in self.entries.items()
+            if now - entry.last_failure < self.max_ttl
+        }
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            # Writing to a temporary file first, so concurrent runs never read a partial file
+            tmp_path = f'{self.path}.{os.getpid()}.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f'Failed to save negative cache {self.path}: {e}')
+            return
+
+        self._dirty = False
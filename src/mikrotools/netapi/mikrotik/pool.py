@@ -0,0 +1,276 @@
+import asyncio
+import logging
+import time
+
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from contextlib import suppress
+from dataclasses import dataclass, field
+from typing import Generic, TypeVar
+
+T = TypeVar('T')
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class PoolStats:
+    hits: int = 0 # Sessions served by an already open connection
+    misses: int = 0 # Sessions that required a new connection
+    evictions: int = 0 # Idle connections closed to stay within max_connections
+    expirations: int = 0 # Connections closed after being idle for idle_timeout
+    coalesced: int = 0 # Sessions that waited for a connection already being established
+    probe_failures: int = 0 # Idle connections found dead by the liveness probe
+
+@dataclass
+class _PoolEntry(Generic[T]):
+    client: T
+    sessions: int = 0
+    last_used: float = field(default_factory=time.monotonic)
+
+@dataclass
+class _HostSlots:
+    semaphore: asyncio.Semaphore
+    users: int = 0 # Sessions holding or waiting for the semaphore
+
+class ConnectionPool(Generic[T]):
+    """
+    A bounded pool of client connections keyed by host.
+
+    The pool limits the total number of open connections and the number of concurrent
+    sessions per host. Only one connection to a host is established at a time, concurrent
+    sessions wait for it instead of connecting on their own. Connections without active sessions are closed after idle_timeout,
+    and the least recently used idle connections are evicted when the pool is full.
+    Connections that have been idle for probe_after are probed with ping() before reuse.
+    """
+    def __init__(self, max_connections: int = 100, max_sessions_per_host: int = 4, idle_timeout: float = 300.0, probe_after: float = 60.0):
+        """
+        Initialize the pool.
+
+        Args:
+            max_connections: Maximum number of open connections.
+            max_sessions_per_host: Maximum number of concurrent sessions on a host.
+            idle_timeout: Seconds after which a connection without active sessions is closed.
+            probe_after: Seconds of inactivity after which a connection is probed before reuse.
+        """
+        self.max_connections = max_connections
+        self.max_sessions_per_host = max_sessions_per_host
+        self.idle_timeout = idle_timeout
+        self.probe_after = probe_after
+        self.stats = PoolStats()
+        self._entries: OrderedDict[str, _PoolEntry[T]] = OrderedDict()
+        self._host_slots: dict[str, _HostSlots] = {}
+        self._pending: dict[str, asyncio.Future[T]] = {}
+        self._connecting = 0
+        self._condition = asyncio.Condition()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def acquire(self, key: str, connect: Callable[[], Awaitable[T]]) -> T:
+        """
+        Acquire a session on the connection to a host, connecting if needed.
+
+        Waits while the host has max_sessions_per_host active sessions, or while the pool
+        is full and no idle connection can be evicted. Every acquired session must be
+        returned with release().
+
+        Args:
+            key: The host the connection belongs to.
+            connect: A coroutine function creating a new connected client.
+
+        Returns:
+            The connected client.
+        """
+        slots = self._host_slots.get(key)
+        if slots is None:
+            slots = self._host_slots[key] = _HostSlots(asyncio.Semaphore(self.max_sessions_per_host))
+        slots.users += 1
+
+        try:
+            await slots.semaphore.acquire()
+            try:
+                return await self._checkout(key, connect)
+            except BaseException:
+                slots.semaphore.release()
+                raise
+        except BaseException:
+            self._release_slot(key)
+            raise
+
+    async def release(self, key: str, client: T, discard: bool = False) -> None:
+        """
+        Return a session acquired with acquire().
+
+        Args:
+            key: The host the connection belongs to.
+            client: The client returned by acquire().
+            discard: Close the connection and remove it from the pool, e.g. after an error.
+        """
+        await self._return(key, client, discard)
+
+        if key in self._host_slots:
+            self._host_slots[key].semaphore.release()
+            self._release_slot(key)
+
+    async def _return(self, key: str, client: T, discard: bool) -> None:
+        to_close = []
+        async with self._condition:
+            entry = self._entries.get(key)
+            if entry is not None and entry.client is client:
+                entry.sessions -= 1
+                entry.last_used = time.monotonic()
+                if discard:
+                    del self._entries[key]
+                    to_close.append(client)
+            elif discard:
+                to_close.append(client)
+            to_close.extend(self._expire_idle())
+            # Every released, discarded or expired connection frees at most one place
+            # in the pool, so only that many waiters are woken up
+            self._condition.notify(len(to_close) + 1)
+
+        await self._close(to_close)
+
+    async def close_all(self) -> None:
+        """
+        Close all connections in the pool.
+        """
+        async with self._condition:
+            to_close = [entry.client for entry in self._entries.values()]
+            self._entries.clear()
+            self._condition.notify_all()
+
+        logger.debug(f'Connection pool stats: {self.stats}')
+        await self._close(to_close)
+
+    async def _checkout(self, key: str, connect: Callable[[], Awaitable[T]]) -> T:
+        while True:
+            to_close = []
+            client = None
+            pending = None
+            probe = False
+            async with self._condition:
+                to_close.extend(self._expire_idle())
+
+                entry = self._entries.get(key)
+                if entry is not None and entry.client.is_connected:
+                    probe = entry.sessions == 0 and time.monotonic() - entry.last_used >= self.probe_after
+                    entry.sessions += 1
+                    self._entries.move_to_end(key)
+                    client = entry.client
+                else:
+                    if entry is not None:
+                        # Removing dead connection from the pool
+                        del self._entries[key]
+                        to_close.append(entry.client)
+                    pending = self._pending.get(key)
+
+            await self._close(to_close)
+
+            if client is not None and probe and not await client.ping():
+                # The connection was silently dropped, e.g. by a firewall or a reboot
+                self.stats.probe_failures += 1
+                await self._return(key, client, discard=True)
+                continue
+            if client is not None:
+                self.stats.hits += 1
+                return client
+            if pending is None:
+                return await self._connect(key, connect)
+
+            # Another session is already connecting to the host, waiting for it
+            # instead of performing a duplicate handshake
+            self.stats.coalesced += 1
+            try:
+                client = await pending
+            except asyncio.CancelledError:
+                if not pending.cancelled() or asyncio.current_task().cancelling():
+                    raise
+                # The connecting session was cancelled, retrying on our own
+                continue
+
+            async with self._condition:
+                entry = self._entries.get(key)
+                if entry is not None and entry.client is client:
+                    entry.sessions += 1
+                    entry.last_used = time.monotonic()
+                    self._entries.move_to_end(key)
+                    return client
+
+    async def _connect(self, key: str, connect: Callable[[], Awaitable[T]]) -> T:
+        to_close = []
+        future = asyncio.get_running_loop().create_future()
+        # Marking the exception as retrieved when there are no waiting sessions
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+
+        async with self._condition:
+            self._pending[key] = future
+            self.stats.misses += 1
+            try:
+                while len(self._entries) + self._connecting >= self.max_connections:
+                    evicted = self._evict_lru()
+                    if evicted is not None:
+                        to_close.append(evicted)
+                    else:
+                        await self._condition.wait()
+            except BaseException:
+                del self._pending[key]
+                future.cancel()
+                raise
+            self._connecting += 1
+
+        await self._close(to_close)
+
+        try:
+            client = await connect()
+        except BaseException as e:
+            async with self._condition:
+                self._connecting -= 1
+                del self._pending[key]
+                self._condition.notify()
+            if isinstance(e, Exception):
+                future.set_exception(e)
+            else:
+                future.cancel()
+            raise
+
+        async with self._condition:
+            self._connecting -= 1
+            del self._pending[key]
+            self._entries[key] = _PoolEntry(client, sessions=1)
+            self._entries.move_to_end(key)
+        future.set_result(client)
+
+        return client
+
+    def _evict_lru(self) -> T | None:
+        for key, entry in self._entries.items():
+            if entry.sessions == 0:
+                del self._entries[key]
+                self.stats.evictions += 1
+                logger.debug(f'Evicting least recently used connection to {key}')
+                return entry.client
+        return None
+
+    def _expire_idle(self) -> list[T]:
+        now = time.monotonic()
+        expired = [
+            key for key, entry in self._entries.items()
+            if entry.sessions == 0 and now - entry.last_used >= self.idle_timeout
+        ]
+        for key in expired:
+            logger.debug(f'Closing idle connection to {key}')
+            self.stats.expirations += 1
+
+        return [self._entries.pop(key).client for key in expired]
+
+    def _release_slot(self, key: str) -> None:
+        slots = self._host_slots[key]
+        slots.users -= 1
+        if slots.users == 0:
+            del self._host_slots[key]
+
+    async def _close(self, clients: list[T]) -> None:
+        for client in clients:
+            with suppress(Exception):
+                await client.disconnect()
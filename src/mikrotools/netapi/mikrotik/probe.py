@@ -0,0 +1,63 @@
+import asyncio
+import logging
+
+from contextlib import suppress
+
+from mikrotools.inventory import InventoryItem
+
+logger = logging.getLogger(__name__)
+
+async def probe_port(address: str, port: int, timeout: float = 1.0) -> bool:
+    """
+    Check whether a TCP port accepts connections.
+
+    Args:
+        address: The host address.
+        port: The TCP port.
+        timeout: Seconds to wait for the connection.
+
+    Returns:
+        True if the connection was established, False otherwise.
+    """
+    try:
+        _, writer = await asyncio.wait_for(asyncio.open_connection(address, port), timeout=timeout)
+    except (OSError, TimeoutError):
+        return False
+
+    writer.close()
+    # Releasing the socket now rather than when the transport is garbage collected
+    with suppress(OSError):
+        await writer.wait_closed()
+    return True
+
+async def probe_hosts(
+    hosts: list[InventoryItem],
+    port: int,
+    timeout: float = 1.0,
+    concurrency: int = 1024
+) -> tuple[list[InventoryItem], list[InventoryItem]]:
+    """
+    Split hosts into reachable and unreachable ones with concurrent TCP connects.
+
+    Args:
+        hosts: The hosts to probe.
+        port: The TCP port to connect to.
+        timeout: Seconds to wait for each connection.
+        concurrency: Maximum number of simultaneous connection attempts.
+
+    Returns:
+        A tuple of reachable and unreachable hosts, in the original order.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def probe(host: InventoryItem) -> bool:
+        async with semaphore:
+            return await probe_port(host.address, port, timeout)
+
+    results = await asyncio.gather(*(probe(host) for host in hosts))
+
+    reachable = [host for host, result in zip(hosts, results) if result]
+    unreachable = [host for host, result in zip(hosts, results) if not result]
+    logger.debug(f'Probed {len(hosts)} hosts on port {port}: {len(unreachable)} unreachable')
+
+    return reachable, unreachable
@@ -0,0 +1,73 @@
+import logging
+
+from .api import AsyncMikrotikAPIClient
+from .client import AsyncMikrotikSSHClient
+from .filters import Filter
+
+logger = logging.getLogger(__name__)
+
+def can_push_down(client: AsyncMikrotikSSHClient | AsyncMikrotikAPIClient, filters: Filter) -> bool:
+    """
+    Check whether the router can evaluate the filter for the client.
+
+    The CLI supports all operators, API queries have no regular expressions.
+    """
+    if isinstance(client, AsyncMikrotikAPIClient):
+        try:
+            filters.to_api()
+        except ValueError:
+            return False
+
+    return True
+
+def filter_rows(
+    rows: list[dict[str, str]],
+    filters: Filter | None = None,
+    props: list[str] | None = None
+) -> list[dict[str, str]]:
+    """
+    Filter rows locally and keep only the requested properties.
+    """
+    if filters is not None:
+        predicate = filters.compile()
+        rows = [row for row in rows if predicate(row)]
+    if props:
+        rows = [{key: row[key] for key in props if key in row} for row in rows]
+
+    return rows
+
+async def query_table(
+    client: AsyncMikrotikSSHClient | AsyncMikrotikAPIClient,
+    path: str,
+    filters: Filter | None = None,
+    props: list[str] | None = None,
+    rows: list[dict[str, str]] | None = None
+) -> list[dict[str, str]]:
+    """
+    Retrieve the rows of a menu matching a filter, evaluating the filter where it's cheapest.
+
+    Rows already held, e.g. from a previous get_table() of the same menu, are filtered
+    locally without a round trip. Otherwise the filter is pushed to the router, unless
+    the client can't express it, in which case the table is fetched with the properties
+    the filter needs and filtered locally.
+
+    Args:
+        client: A connected client.
+        path: The menu path.
+        filters: Filter to apply. Optional.
+        props: Properties to retrieve. Optional, all properties are retrieved by default.
+        rows: All rows of the menu, if already fetched. Optional.
+
+    Returns:
+        A list of dictionaries with properties of each matching row.
+    """
+    if rows is not None:
+        return filter_rows(rows, filters, props)
+
+    if filters is None or can_push_down(client, filters):
+        return await client.get_table(path, filters, props)
+
+    logger.debug(f'Filtering {path} locally, the filter can\'t be pushed to {type(client).__name__}')
+    fetch_props = sorted(set(props) | filters.fields()) if props else None
+
+    return filter_rows(await client.get_table(path, props=fetch_props), filters, props)
@@ -0,0 +1,136 @@
+import asyncio
+import ipaddress
+import logging
+import time
+
+from dataclasses import dataclass
+
+from mikrotools.inventory import InventoryItem
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class RateLimitStats:
+    acquired: int = 0 # Tokens handed out
+    delayed: int = 0 # Acquisitions that had to wait for a token
+    total_wait: float = 0.0 # Seconds spent waiting for tokens
+    max_wait: float = 0.0
+
+    @property
+    def average_wait(self) -> float:
+        return self.total_wait / self.acquired if self.acquired else 0.0
+
+class TokenBucket:
+    """
+    A token bucket allowing `rate` acquisitions per second with bursts of up to `burst`.
+
+    Waiting acquisitions are served in FIFO order.
+    """
+    def __init__(self, rate: float, burst: int = 1):
+        """
+        Initialize the bucket. The bucket starts full.
+
+        Args:
+            rate: Tokens added per second.
+            burst: Bucket capacity.
+        """
+        if rate <= 0:
+            raise ValueError('Rate must be positive')
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> float:
+        """
+        Wait for a token.
+
+        Returns:
+            Seconds spent waiting.
+        """
+        start = time.monotonic()
+        # The lock is held while sleeping, so waiters are served one by one in arrival order
+        async with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
+
+        return time.monotonic() - start
+
+class ConnectionRateLimiter:
+    """
+    Limits the rate of new connections, globally or per subnet or site.
+
+    Every scope gets its own token bucket, so a burst towards one site doesn't
+    delay connections to the others.
+    """
+    SCOPES = ('global', 'subnet', 'site')
+
+    def __init__(self, rate: float = 0, burst: int = 1, scope: str = 'global', prefix_length: int = 24):
+        """
+        Initialize the limiter.
+
+        Args:
+            rate: New connections per second in each scope, 0 disables limiting.
+            burst: Connections that can be started at once before limiting kicks in.
+            scope: 'global', 'subnet' or 'site'.
+            prefix_length: IPv4 prefix length defining a subnet for the 'subnet' scope.
+        """
+        if scope not in self.SCOPES:
+            raise ValueError(f'Unknown rate limit scope: {scope}')
+        self.rate = rate
+        self.burst = burst
+        self.scope = scope
+        self.prefix_length = prefix_length
+        self.stats = RateLimitStats()
+        self._buckets: dict[str, TokenBucket] = {}
+
+    def _scope_key(self, host: InventoryItem) -> str:
+        if self.scope == 'site':
+            return host.site or ''
+        if self.scope == 'subnet':
+            try:
+                address = ipaddress.ip_address(host.address)
+            except ValueError:
+                # Hostnames share a single bucket
+                return ''
+            prefix_length = self.prefix_length if address.version == 4 else 64
+            return str(ipaddress.ip_network(f'{address}/{prefix_length}', strict=False))
+        return ''
+
+    async def acquire(self, host: InventoryItem) -> float:
+        """
+        Wait until a new connection to the host may be started.
+
+        Args:
+            host: The host being connected to.
+
+        Returns:
+            Seconds spent waiting in the queue.
+        """
+        if self.rate <= 0:
+            return 0.0
+
+        key = self._scope_key(host)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(self.rate, self.burst)
+
+        waited = await bucket.acquire()
+
+        self.stats.acquired += 1
+        self.stats.total_wait += waited
+        self.stats.max_wait = max(self.stats.max_wait, waited)
+        if waited > 0.001:
+            self.stats.delayed += 1
+            logger.debug(f'Connection to {host.address} waited {waited:.3f}s for the rate limiter')
+
+        return waited
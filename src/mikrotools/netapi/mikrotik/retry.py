@@ -0,0 +1,160 @@
+import asyncio
+import logging
+import random
+import time
+
+from collections import Counter
+from dataclasses import dataclass, field
+from enum import Enum
+
+import asyncssh
+
+from .negcache import CachedFailureError
+
+logger = logging.getLogger(__name__)
+
+# Substrings of RouterOS error messages meaning the router is temporarily overloaded
+BUSY_MARKERS = ('busy', 'try again', 'timeout while waiting', 'too many')
+
+class ErrorKind(Enum):
+    TRANSIENT = 'transient' # Network errors, worth retrying
+    BUSY = 'busy' # The router is overloaded, worth retrying after a longer pause
+    AUTH = 'auth' # Authentication failures, never retried
+    COMMAND = 'command' # Errors reported by the command, never retried
+    FATAL = 'fatal' # Anything else, never retried
+
+class CircuitOpenError(ConnectionError):
+    """Raised instead of connecting to a host that failed too many times in a row."""
+
+def classify_error(error: BaseException) -> ErrorKind:
+    """
+    Classify an error raised while connecting to or working with a router.
+    """
+    if isinstance(error, (CachedFailureError, CircuitOpenError)):
+        return ErrorKind.FATAL
+    if isinstance(error, asyncssh.PermissionDenied):
+        return ErrorKind.AUTH
+    if isinstance(error, asyncssh.ChannelOpenError) and error.code == asyncssh.OPEN_RESOURCE_SHORTAGE:
+        return ErrorKind.BUSY
+    if isinstance(error, RuntimeError):
+        message = str(error).lower()
+        if any(marker in message for marker in BUSY_MARKERS):
+            return ErrorKind.BUSY
+        return ErrorKind.COMMAND
+    if isinstance(error, (TimeoutError, OSError, asyncssh.DisconnectError, asyncssh.ChannelOpenError)):
+        return ErrorKind.TRANSIENT
+    return ErrorKind.FATAL
+
+@dataclass
+class RetryStats:
+    retries: Counter[ErrorKind] = field(default_factory=Counter)
+    hosts: Counter[str] = field(default_factory=Counter) # Retries per host
+    budget_exhausted: int = 0 # Retries denied because the budget ran out
+    circuits_opened: int = 0
+
+    @property
+    def total(self) -> int:
+        return sum(self.retries.values())
+
+class RetryPolicy:
+    """
+    Retries transient and busy errors with jittered exponential backoff.
+
+    The number of retries in a run is limited by the budget, so a widespread outage
+    doesn't multiply the run time by max_attempts.
+    """
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.5, max_delay: float = 10.0, budget: int = 100):
+        """
+        Initialize the policy.
+
+        Args:
+            max_attempts: Maximum attempts of a single operation, including the first one.
+            base_delay: Seconds to wait before the first retry.
+            max_delay: Maximum seconds to wait between attempts.
+            budget: Maximum number of retries in a run.
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = budget
+        self.stats = RetryStats()
+
+    def delay(self, attempt: int, kind: ErrorKind) -> float:
+        # Busy routers need more time to recover than a lost packet
+        base = self.base_delay * (4 if kind == ErrorKind.BUSY else 1)
+        # Full jitter spreads out retries of hosts that failed at the same moment
+        return random.uniform(0, min(self.max_delay, base * 2 ** attempt))
+
+    async def backoff(self, address: str, error: BaseException, attempt: int) -> bool:
+        """
+        Wait before the next attempt if the error should be retried.
+
+        Args:
+            address: The host the error relates to.
+            error: The error raised by the failed attempt.
+            attempt: The number of the failed attempt, starting from 0.
+
+        Returns:
+            True if the operation should be retried, False otherwise.
+        """
+        kind = classify_error(error)
+        if kind not in (ErrorKind.TRANSIENT, ErrorKind.BUSY) or attempt + 1 >= self.max_attempts:
+            return False
+        if self.stats.total >= self.budget:
+            self.stats.budget_exhausted += 1
+            return False
+
+        self.stats.retries[kind] += 1
+        self.stats.hosts[address] += 1
+        delay = self.delay(attempt, kind)
+        logger.debug(f'Retrying {address} in {delay:.2f}s after {kind.value} error: {error!r}')
+        await asyncio.sleep(delay)
+
+        return True
+
+@dataclass
+class _CircuitState:
+    failures: int = 0
+    opened_at: float | None = None
+
+class CircuitBreaker:
+    """
+    Stops connecting to hosts after repeated consecutive failures.
+
+    Once a host fails `threshold` times in a row its circuit opens and every attempt
+    fails immediately for `reset_timeout` seconds. After that a single attempt is let
+    through, closing the circuit on success or opening it again on failure.
+    """
+    def __init__(self, threshold: int = 5, reset_timeout: float = 60.0, stats: RetryStats | None = None):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.stats = stats if stats is not None else RetryStats()
+        self._states: dict[str, _CircuitState] = {}
+
+    def check(self, address: str) -> None:
+        """
+        Raises:
+            CircuitOpenError: If the circuit of the host is open.
+        """
+        state = self._states.get(address)
+        if state is None or state.opened_at is None:
+            return
+        if time.monotonic() - state.opened_at < self.reset_timeout:
+            raise CircuitOpenError(f'Skipping {address} after {state.failures} consecutive failures')
+        # Letting a trial attempt through, the next failure opens the circuit again
+        state.opened_at = None
+        state.failures = self.threshold - 1
+
+    def record_failure(self, address: str, error: BaseException) -> None:
+        if classify_error(error) not in (ErrorKind.TRANSIENT, ErrorKind.BUSY):
+            return
+
+        state = self._states.setdefault(address, _CircuitState())
+        state.failures += 1
+        if state.failures >= self.threshold and state.opened_at is None:
+            state.opened_at = time.monotonic()
+            self.stats.circuits_opened += 1
+            logger.debug(f'Circuit for {address} opened after {state.failures} consecutive failures')
+
+    def record_success(self, address: str) -> None:
+        self._states.pop(address, None)
@@ -0,0 +1,356 @@
+import json
+import re
+
+from dataclasses import dataclass
+from typing import Any, Generic, TypeVar
+
+BATCH_MARKER = '__MT__' # Prefix marking the start of a value in batched script output
+SERIALIZE_MIN_VERSION = (7, 13) # The first RouterOS version with the :serialize command
+BATCH_ERROR_MARKER = '__MTERR__' # Prefix of a line reporting a failed row in batched script output
+TERSE_KEY = re.compile(r'(?:^|\s)([a-z.][\w.-]*)=') # A property name in 'print terse' output
+TERSE_QUOTED = re.compile(r'"((?:[^"\\]|\\.)*)"(?=\s|$)') # A quoted value in 'print terse' output
+TERSE_ESCAPES = {'n': '\n', 'r': '\r', 't': '\t'}
+
+T = TypeVar('T')
+
+@dataclass
+class RowResult(Generic[T]):
+    """The result of a single row of a batched operation."""
+    value: T | None = None
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+def quote(value: str) -> str:
+    """
+    Quote a value as a RouterOS script string literal.
+
+    Args:
+        value: The value to quote.
+
+    Returns:
+        The value enclosed in double quotes with RouterOS special characters escaped.
+    """
+    escaped = (
+        value.replace('\\', '\\\\')
+             .replace('"', '\\"')
+             .replace('$', '\\$')
+             .replace('?', '\\?')
+             .replace('\n', '\\n')
+             .replace('\r', '\\r')
+             .replace('\t', '\\t')
+    )
+    return f'"{escaped}"'
+
+def build_batch_script(queries: dict[str, tuple[str, str | None]]) -> str:
+    """
+    Build a RouterOS script that prints several properties in a single execution.
+
+    Every property is printed on its own line prefixed with BATCH_MARKER and its key,
+    so the output can be split back into values with parse_batch_output().
+
+    Args:
+        queries: A mapping of result keys to (path, property) tuples. If property is None,
+            the whole object at path is retrieved.
+
+    Returns:
+        The generated script as a single command line.
+    """
+    commands = []
+    for key, (path, prop) in queries.items():
+        path = path.rstrip('/')
+        getter = f'{path} get {prop}' if prop else f'{path} get'
+        commands.append(f':put ("{BATCH_MARKER}{key}=" . [{getter}])')
+
+    return '; '.join(commands)
+
+def parse_batch_output(output: str, keys: list[str]) -> dict[str, str]:
+    """
+    Parse the output of a script generated by build_batch_script().
+
+    Lines that don't start with BATCH_MARKER are treated as a continuation of the
+    previous value.
+
+    Args:
+        output: The raw output of the script.
+        keys: The keys that are expected to be present in the output.
+
+    Returns:
+        A dictionary mapping keys to their values.
+
+    Raises:
+        RuntimeError: If any of the expected keys is missing from the output.
+    """
+    result: dict[str, str] = {}
+    current_key = None
+
+    for line in output.splitlines():
+        if line.startswith(BATCH_MARKER):
+            key, _, value = line[len(BATCH_MARKER):].partition('=')
+            current_key = key
+            result[current_key] = value
+        elif current_key is not None:
+            result[current_key] += '\n' + line
+
+    missing = [key for key in keys if key not in result]
+    if missing:
+        raise RuntimeError(
+            f'Batched script output is missing values for: {", ".join(missing)}. '
+            f'Output: {output.strip()}'
+        )
+
+    return {key: value.strip() for key, value in result.items()}
+
+def supports_serialize(routeros_version: str) -> bool:
+    """
+    Check whether a RouterOS version supports `:serialize to=json`.
+
+    Args:
+        routeros_version: The version as reported by RouterOS, e.g. '7.16.2 (stable)'.
+    """
+    match = re.match(r'(\d+)\.(\d+)', routeros_version.strip())
+    return match is not None and (int(match[1]), int(match[2])) >= SERIALIZE_MIN_VERSION
+
+def build_serialize_command(path: str, obj: str | None = None) -> str:
+    """
+    Build a command printing an object as JSON, see parse_serialized_object().
+
+    Args:
+        path: The path to the object.
+        obj: The object to retrieve. Optional, if not specified, retrieves default object.
+    """
+    path = path.rstrip('/')
+    getter = f'{path} get {obj}' if obj else f'{path} get'
+    return f':put [:serialize to=json [{getter}]]'
+
+def parse_serialized_object(output: str) -> dict[str, Any]:
+    """
+    Parse the output of a command generated by build_serialize_command().
+
+    Raises:
+        RuntimeError: If the output isn't a JSON object.
+    """
+    try:
+        result = json.loads(output)
+    except ValueError:
+        result = None
+    if not isinstance(result, dict):
+        raise RuntimeError(f'Unexpected serialized output: {output.strip()}')
+
+    return result
+
+def format_value(value: Any) -> str:
+    """
+    Format a deserialized value the same way as ':put' does on the CLI.
+    """
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, list):
+        return ';'.join(format_value(item) for item in value)
+    if value is None:
+        return ''
+    return str(value)
+
+def parse_attributes(output: str) -> dict[str, str]:
+    """
+    Parse the output of ':put [... get]' into a dictionary.
+
+    Properties are separated by ';', which is also the separator of list values, so
+    parts without '=' are treated as a continuation of the previous value. Used on
+    RouterOS versions without the :serialize command.
+    """
+    result: dict[str, str] = {}
+    current_key = None
+
+    for part in output.split(';'):
+        part = part.strip()
+        if not part:
+            continue
+
+        if '=' in part:
+            key, value = part.split('=', 1)
+            current_key = key.strip()
+            result[current_key] = value.strip()
+        elif current_key and current_key in result:
+            result[current_key] += ';' + part.strip()
+
+    return result
+
+def build_table_command(
+    path: str,
+    where: str | None = None,
+    props: list[str] | None = None,
+    serialize: bool = False
+) -> str:
+    """
+    Build a command printing the rows of a menu one per line.
+
+    With serialize, every row is printed as a JSON object, see parse_serialized_object().
+    Otherwise 'print terse' is used, see parse_terse_line().
+
+    Args:
+        path: The menu path.
+        where: A filter in CLI syntax, see Filter.to_cli(). Optional.
+        props: Properties to retrieve. Optional, all properties are retrieved by default.
+        serialize: Whether the router supports :serialize.
+    """
+    path = path.rstrip('/')
+    args = []
+    if props:
+        args.append(f'proplist={",".join(props)}')
+    if where:
+        args.append(f'where {where}')
+    args = ''.join(f' {arg}' for arg in args)
+
+    if serialize:
+        return f':foreach row in=[{path} print as-value{args}] do={{:put [:serialize to=json $row]}}'
+    return f'{path} print terse show-ids{args}'
+
+def parse_terse_line(line: str, props: list[str] | None = None) -> dict[str, str] | None:
+    """
+    Parse a line of 'print terse show-ids' output.
+
+    The line starts with the item ID and flags, followed by space separated
+    name=value pairs. Quoted values are unescaped. Unquoted values end where the
+    next property name starts, so with props only the requested names count as
+    property names and e.g. 'comment=set mtu=1500' is kept as a single value.
+
+    Args:
+        line: The line to parse.
+        props: The properties the line was printed with. Optional.
+
+    Returns:
+        A dictionary of properties including '.id', or None if the line has no properties.
+
+    Raises:
+        RuntimeError: If a property appears twice, i.e. a value contains text that
+            can't be told apart from a property.
+    """
+    keys = [
+        match for match in TERSE_KEY.finditer(line)
+        if props is None or match[1] in props
+    ]
+    if not keys:
+        return None
+
+    row: dict[str, str] = {}
+    prefix = line[:keys[0].start()].split()
+    if prefix and prefix[0].startswith('*'):
+        row['.id'] = prefix[0]
+
+    position = keys[0].start()
+    while keys:
+        key = keys.pop(0)
+        if key.start() < position:
+            # The name is part of a quoted value
+            continue
+        name = key[1]
+        if name in row:
+            raise RuntimeError(f'Ambiguous property {name} in terse output: {line.strip()}')
+
+        quoted = TERSE_QUOTED.match(line, key.end())
+        if quoted is not None:
+            row[name] = re.sub(r'\\(.)', lambda escape: TERSE_ESCAPES.get(escape[1], escape[1]), quoted[1])
+            position = quoted.end()
+        else:
+            following = next((match for match in keys if match.start() >= key.end()), None)
+            position = following.start() if following is not None else len(line)
+            row[name] = line[key.end():position].rstrip()
+
+    return row
+
+def build_rows_script(commands: list[str]) -> str:
+    """
+    Build a RouterOS script running commands that each print a value, in a single execution.
+
+    Every command runs in its own error handler, so a failed row doesn't stop the
+    others. Values and failures are printed with their row numbers, so the output
+    can be split back into rows with parse_rows_output().
+
+    Args:
+        commands: Expressions printing a value, e.g. '[/ip address get *1]'.
+    """
+    return '; '.join(
+        f':do {{:put ("{BATCH_MARKER}{index}=" . {command})}} on-error={{:put "{BATCH_ERROR_MARKER}{index}"}}'
+        for index, command in enumerate(commands)
+    )
+
+def build_get_many_script(
+    path: str,
+    ids: list[str],
+    props: list[str] | None = None,
+    serialize: bool = False
+) -> str:
+    """
+    Build a script printing the objects with the given IDs, see build_rows_script().
+
+    With props, only the given properties are read, printed as name=value pairs
+    separated by ';' like the whole object, see parse_attributes(). With serialize,
+    objects are printed as JSON.
+    """
+    path = path.rstrip('/')
+    commands = []
+    for id in ids:
+        if not props:
+            getter = f'[{path} get {quote(id)}]'
+        elif serialize:
+            getter = '{' + '; '.join(f'{quote(prop)}=[{path} get {quote(id)} {prop}]' for prop in props) + '}'
+        else:
+            getter = '(' + ' . ";" . '.join(f'{quote(prop + "=")} . [{path} get {quote(id)} {prop}]' for prop in props) + ')'
+        commands.append(f'[:serialize to=json {getter}]' if serialize else getter)
+
+    return build_rows_script(commands)
+
+def build_add_many_script(path: str, rows: list[dict[str, str]]) -> str:
+    """
+    Build a script adding the rows and printing the IDs of the new entries, see build_rows_script().
+    """
+    path = path.rstrip('/')
+    commands = []
+    for row in rows:
+        attributes = ' '.join(f'{key}={quote(str(value))}' for key, value in row.items())
+        commands.append(f'[{path} add {attributes}]')
+
+    return build_rows_script(commands)
+
+def parse_rows_output(output: str, count: int) -> list[RowResult[str]]:
+    """
+    Parse the output of a script generated by build_rows_script().
+
+    Lines that don't start with a marker are treated as a continuation of the
+    previous value.
+
+    Args:
+        output: The raw output of the script.
+        count: The number of rows in the script.
+
+    Returns:
+        A result for every row in order, holding the printed value or an error.
+    """
+    values: dict[int, str] = {}
+    errors: set[int] = set()
+    current = None
+
+    for line in output.splitlines():
+        if line.startswith(BATCH_MARKER):
+            index, _, value = line[len(BATCH_MARKER):].partition('=')
+            current = int(index)
+            values[current] = value
+        elif line.startswith(BATCH_ERROR_MARKER):
+            errors.add(int(line[len(BATCH_ERROR_MARKER):]))
+            current = None
+        elif current is not None:
+            values[current] += '\n' + line
+
+    results: list[RowResult[str]] = []
+    for index in range(count):
+        if index in errors:
+            results.append(RowResult(error='Command failed'))
+        elif index in values:
+            results.append(RowResult(value=values[index].strip()))
+        else:
+            results.append(RowResult(error='No output'))
+
+    return results
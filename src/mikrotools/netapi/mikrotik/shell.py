@@ -0,0 +1,166 @@
+import asyncio
+import logging
+import re
+import uuid
+
+from collections.abc import AsyncIterator
+
+import asyncssh
+
+logger = logging.getLogger(__name__)
+
+# RouterOS reports script errors with their position, e.g. 'bad command name foo (line 1 column 1)'
+ERROR_PATTERN = re.compile(r'\(line \d+ column \d+\)')
+
+class AsyncMikrotikShell():
+    """
+    A long-lived shell channel on an existing SSH connection.
+
+    Commands are written to the shell one after another and their output is
+    demultiplexed using sentinel lines printed before and after each command,
+    so a single SSH channel serves every command executed on the host.
+    """
+    def __init__(self, conn: asyncssh.SSHClientConnection):
+        self._conn = conn
+        self._process: asyncssh.SSHClientProcess | None = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return self._process is not None and not self._process.is_closing()
+
+    async def open(self) -> None:
+        # No PTY is requested, so RouterOS doesn't redraw lines or wrap output
+        self._process = await self._conn.create_process(term_type=None, encoding='utf-8', errors='replace')
+
+    async def close(self) -> None:
+        if self._process is not None:
+            try:
+                self._process.close()
+            except Exception:
+                pass
+            finally:
+                self._process = None
+
+    async def run(self, command: str, timeout: float | None = 20) -> str:
+        """
+        Execute a command in the shell and return its output.
+
+        Args:
+            command: The command to execute.
+            timeout: Seconds to wait for the command to complete.
+
+        Returns:
+            The output of the command.
+
+        Raises:
+            RuntimeError: If RouterOS reports an error executing the command.
+            TimeoutError: If the command doesn't complete in time. The shell is
+                closed in this case, as its state is unknown.
+        """
+        async with self._lock:
+            if not self.is_open:
+                await self.open()
+
+            token = uuid.uuid4().hex
+            begin = f'__MT_BEGIN_{token}__'
+            end = f'__MT_END_{token}__'
+
+            self._process.stdin.write(f':put "{begin}"\r\n{command}\r\n:put "{end}"\r\n')
+
+            try:
+                lines = await asyncio.wait_for(self._read_between(begin, end), timeout=timeout)
+            except (TimeoutError, asyncssh.Error, ConnectionError):
+                await self.close()
+                raise
+
+        # Dropping echoed command lines, if the shell echoes its input
+        if lines and lines[0].rstrip().endswith(command.strip()):
+            lines = lines[1:]
+        lines = [line for line in lines if f':put "{end}"' not in line]
+        output = '\n'.join(lines)
+
+        if ERROR_PATTERN.search(output):
+            raise RuntimeError(f'Error executing command: {output.strip()}')
+
+        return output
+
+    async def stream(self, command: str, timeout: float | None = 20) -> AsyncIterator[str]:
+        """
+        Execute a command in the shell and yield its output lines as they arrive.
+
+        The shell is reserved until the output is consumed. If the iteration stops
+        early, the shell is closed, as the rest of the output would be read by the
+        next command.
+
+        Args:
+            command: The command to execute.
+            timeout: Seconds to wait for each line of output.
+
+        Yields:
+            Output lines without line terminators.
+
+        Raises:
+            RuntimeError: If RouterOS reports an error executing the command, once
+                the output has been consumed.
+            TimeoutError: If no output is received in time.
+        """
+        error = None
+        async with self._lock:
+            if not self.is_open:
+                await self.open()
+
+            token = uuid.uuid4().hex
+            begin = f'__MT_BEGIN_{token}__'
+            end = f'__MT_END_{token}__'
+
+            self._process.stdin.write(f':put "{begin}"\r\n{command}\r\n:put "{end}"\r\n')
+
+            completed = False
+            try:
+                started = False
+                first = True
+                while True:
+                    line = await asyncio.wait_for(self._process.stdout.readline(), timeout=timeout)
+                    if not line:
+                        raise ConnectionError('Shell channel closed')
+
+                    line = line.rstrip('\r\n')
+                    if line.strip() == begin:
+                        started = True
+                        continue
+                    if line.strip() == end:
+                        completed = True
+                        break
+                    if not started or f':put "{end}"' in line:
+                        continue
+                    if first:
+                        first = False
+                        # Dropping the echoed command line, if the shell echoes its input
+                        if line.rstrip().endswith(command.strip()):
+                            continue
+                    if ERROR_PATTERN.search(line):
+                        error = line.strip()
+                    yield line
+            finally:
+                if not completed:
+                    await self.close()
+
+        if error is not None:
+            raise RuntimeError(f'Error executing command: {error}')
+
+    async def _read_between(self, begin: str, end: str) -> list[str]:
+        lines = []
+        started = False
+        while True:
+            line = await self._process.stdout.readline()
+            if not line:
+                raise ConnectionError('Shell channel closed')
+
+            line = line.rstrip('\r\n')
+            if line.strip() == begin:
+                started = True
+            elif line.strip() == end:
+                return lines
+            elif started:
+                lines.append(line)
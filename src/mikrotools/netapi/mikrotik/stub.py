@@ -0,0 +1,278 @@
+"""
+A local stub of the RouterOS API server.
+
+The stub speaks the same sentence protocol as a real router and serves menus from
+in-memory tables, so AsyncMikrotikAPIClient can be exercised without any hardware:
+
+    async with StubAPIServer() as server:
+        async with AsyncMikrotikAPIClient('127.0.0.1', 'admin', '', port=server.port) as device:
+            print(await device.get_identity())
+
+It can also be started standalone with 'python -m mikrotools.netapi.mikrotik.stub [port]'.
+"""
+import asyncio
+import copy
+import logging
+import sys
+
+from .api import encode_sentence, parse_attributes, read_sentence
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MENUS: dict[str, list[dict[str, str]]] = {
+    '/system/identity': [{'name': 'MikroTik'}],
+    '/system/package/update': [{
+        'channel': 'stable',
+        'installed-version': '7.16.2',
+        'latest-version': '7.18.2',
+        'status': 'New version is available',
+    }],
+    '/system/routerboard': [{
+        'routerboard': 'true',
+        'board-name': 'hAP ax^2',
+        'model': 'C52iG-5HaxD2HaxD',
+        'serial-number': 'HEX0123456789',
+        'firmware-type': 'ipq5000',
+        'factory-firmware': '7.12.1',
+        'current-firmware': '7.16.2',
+        'upgrade-firmware': '7.18.2',
+    }],
+    '/system/resource': [{
+        'uptime': '1w2d3h4m5s',
+        'version': '7.16.2 (stable)',
+        'cpu-load': '3',
+        'architecture-name': 'arm',
+        'board-name': 'hAP ax^2',
+    }],
+    '/ip/cloud': [{'public-address': '203.0.113.10'}],
+    '/ip/address': [
+        {'.id': '*1', 'address': '192.168.88.1/24', 'network': '192.168.88.0', 'interface': 'bridge', 'disabled': 'false'},
+    ],
+}
+
+# Commands that are accepted and do nothing
+NOOP_COMMANDS = {'reboot', 'check-for-updates', 'install', 'upgrade', 'shutdown'}
+
+def _compare(left: str | None, right: str) -> int | None:
+    if left is None:
+        return None
+    numbers = []
+    for value in (left, right):
+        try:
+            numbers.append(int(value))
+        except ValueError:
+            pass
+    if len(numbers) == 1:
+        # A number and a string are never ordered
+        return None
+    a, b = numbers or (left, right)
+
+    return (a > b) - (a < b)
+
+def evaluate_query(row: dict[str, str], words: list[str]) -> bool:
+    """
+    Evaluate RouterOS API query words against a single row.
+
+    Args:
+        row: The item properties.
+        words: The query words ('?name=value', '?#|' etc.).
+
+    Returns:
+        True if the row matches the query.
+    """
+    stack: list[bool] = []
+    for word in words:
+        query = word[1:]
+        if query.startswith('#'):
+            for op in query[1:]:
+                if op == '!':
+                    stack.append(not stack.pop())
+                elif op in '&|':
+                    right, left = stack.pop(), stack.pop()
+                    stack.append(left and right if op == '&' else left or right)
+        elif query.startswith('-'):
+            stack.append(query[1:] not in row)
+        elif query[:1] in '<>':
+            name, _, value = query[1:].partition('=')
+            result = _compare(row.get(name), value)
+            stack.append(result is not None and result == (1 if query[0] == '>' else -1))
+        elif '=' in query:
+            name, _, value = query.partition('=')
+            stack.append(row.get(name) == value)
+        else:
+            stack.append(query in row)
+
+    return all(stack)
+
+class StubAPIServer:
+    def __init__(
+        self,
+        menus: dict[str, list[dict[str, str]]] | None = None,
+        username: str = 'admin',
+        password: str = '',
+        latency: float = 0.0
+    ):
+        """
+        Initialize the stub server.
+
+        Args:
+            menus: Tables served by the stub keyed by API menu path. Defaults to DEFAULT_MENUS.
+            username: The username accepted by /login.
+            password: The password accepted by /login.
+            latency: Seconds to wait before answering each request.
+        """
+        self.menus = copy.deepcopy(menus if menus is not None else DEFAULT_MENUS)
+        self.username = username
+        self.password = password
+        self.latency = latency
+        self.requests: list[list[str]] = []
+        self._server: asyncio.Server | None = None
+        self._next_id = 0x100
+
+    @property
+    def port(self) -> int:
+        return self._server.sockets[0].getsockname()[1]
+
+    async def start(self, host: str = '127.0.0.1', port: int = 0) -> int:
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        return self.port
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        authenticated = False
+        tasks = set()
+        try:
+            while True:
+                sentence = await read_sentence(reader)
+                if not sentence:
+                    continue
+                self.requests.append(sentence)
+
+                if sentence[0] == '/login':
+                    authenticated = self._login(sentence, writer)
+                elif not authenticated:
+                    writer.write(encode_sentence(['!fatal', 'not logged in']))
+                    break
+                else:
+                    task = asyncio.create_task(self._dispatch(sentence, writer))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            writer.close()
+
+    def _login(self, sentence: list[str], writer: asyncio.StreamWriter) -> bool:
+        attributes = parse_attributes(sentence[1:])
+        tag = self._tag(sentence)
+        if attributes.get('name') == self.username and attributes.get('password', '') == self.password:
+            writer.write(encode_sentence(['!done'] + tag))
+            return True
+
+        writer.write(encode_sentence(['!trap', '=message=invalid user name or password (6)'] + tag))
+        writer.write(encode_sentence(['!done'] + tag))
+        return False
+
+    def _tag(self, sentence: list[str]) -> list[str]:
+        return [word for word in sentence if word.startswith('.tag=')]
+
+    async def _dispatch(self, sentence: list[str], writer: asyncio.StreamWriter) -> None:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        tag = self._tag(sentence)
+        try:
+            replies = self.execute(sentence)
+        except LookupError as e:
+            replies = [['!trap', f'=message={e.args[0]}'], ['!done']]
+
+        for reply in replies:
+            writer.write(encode_sentence(reply + tag))
+        await writer.drain()
+
+    def execute(self, sentence: list[str]) -> list[list[str]]:
+        """
+        Execute a request sentence against the in-memory tables.
+
+        Returns:
+            A list of reply sentences without tags.
+        """
+        command = sentence[0]
+        menu, _, action = command.rpartition('/')
+        attributes = parse_attributes(sentence[1:])
+        queries = [word for word in sentence[1:] if word.startswith('?')]
+
+        if menu == '' and action == 'cancel':
+            return [['!done']]
+        if action in NOOP_COMMANDS:
+            return [['!done']]
+        if menu not in self.menus:
+            raise LookupError('no such command prefix')
+
+        rows = self.menus[menu]
+        if action == 'print':
+            proplist = attributes.get('.proplist')
+            replies = []
+            for row in rows:
+                if not evaluate_query(row, queries):
+                    continue
+                if proplist:
+                    row = {key: row[key] for key in proplist.split(',') if key in row}
+                replies.append(['!re'] + [f'={key}={value}' for key, value in row.items()])
+            return replies + [['!done']]
+        elif action == 'get':
+            value_name = attributes.get('value-name')
+            row = self._find_row(rows, attributes.get('number'))
+            if value_name not in row:
+                raise LookupError('no such item')
+            return [['!done', f'=ret={row[value_name]}']]
+        elif action == 'add':
+            new_id = f'*{self._next_id:X}'
+            self._next_id += 1
+            rows.append({'.id': new_id} | attributes)
+            return [['!done', f'=ret={new_id}']]
+        elif action == 'set':
+            item_id = attributes.pop('.id', None) or attributes.pop('numbers', None)
+            row = self._find_row(rows, item_id)
+            row.update(attributes)
+            return [['!done']]
+        elif action == 'remove':
+            row = self._find_row(rows, attributes.get('.id', attributes.get('numbers')))
+            rows.remove(row)
+            return [['!done']]
+
+        raise LookupError('no such command')
+
+    def _find_row(self, rows: list[dict[str, str]], item_id: str | None) -> dict[str, str]:
+        if item_id is None:
+            if len(rows) == 1:
+                return rows[0]
+            raise LookupError('missing item number')
+        for row in rows:
+            if row.get('.id') == item_id:
+                return row
+        raise LookupError('no such item')
+
+    async def __aenter__(self) -> 'StubAPIServer':
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.close()
+
+async def serve(port: int) -> None:
+    server = StubAPIServer()
+    await server.start(port=port)
+    print(f'RouterOS API stub listening on 127.0.0.1:{server.port} (user: admin, empty password)')
+    await server._server.serve_forever()
+
+if __name__ == '__main__':
+    asyncio.run(serve(int(sys.argv[1]) if len(sys.argv) > 1 else 8728))
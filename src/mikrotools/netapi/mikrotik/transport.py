@@ -0,0 +1,42 @@
+from mikrotools.config import TransportProfile
+
+# Profiles offered by the benchmark in addition to the configured ones
+BUILTIN_PROFILES: dict[str, TransportProfile] = {
+    'default': TransportProfile(),
+    # AES-GCM combines encryption and MAC, cheapest on CPUs with AES instructions (ARM64, x86)
+    'aes-gcm': TransportProfile(
+        kex_algs=['curve25519-sha256', 'curve25519-sha256@libssh.org', 'diffie-hellman-group14-sha256'],
+        encryption_algs=['aes128-gcm@openssh.com', 'aes128-ctr'],
+        mac_algs=['hmac-sha2-256']
+    ),
+    # Cheapest widely supported combination for MIPS and old ARM boards without AES acceleration
+    'low-cpu': TransportProfile(
+        kex_algs=['curve25519-sha256', 'curve25519-sha256@libssh.org', 'diffie-hellman-group14-sha256'],
+        encryption_algs=['aes128-ctr'],
+        mac_algs=['hmac-sha1', 'hmac-sha2-256']
+    ),
+    'compressed': TransportProfile(compression=True),
+    'bulk': TransportProfile(window=8 * 1024 * 1024, max_pktsize=32768),
+}
+
+def asyncssh_options(profile: TransportProfile) -> dict:
+    """
+    Convert a transport profile into asyncssh.connect() keyword arguments.
+
+    Empty algorithm lists are omitted, so the library defaults apply.
+    """
+    options: dict = {}
+    if profile.kex_algs:
+        options['kex_algs'] = profile.kex_algs
+    if profile.encryption_algs:
+        options['encryption_algs'] = profile.encryption_algs
+    if profile.mac_algs:
+        options['mac_algs'] = profile.mac_algs
+    # Falling back to no compression if the router doesn't support zlib
+    options['compression_algs'] = ['zlib@openssh.com', 'zlib', 'none'] if profile.compression else ['none']
+    if profile.window is not None:
+        options['window'] = profile.window
+    if profile.max_pktsize is not None:
+        options['max_pktsize'] = profile.max_pktsize
+
+    return options
@@ -1,78 +1,105 @@
 import asyncio
+import os
+import tempfile
 
-from packaging import version
+from contextlib import suppress
 from rich.console import Console
 
 from mikrotools.cli.progress import Progress
 from mikrotools.hoststools.models import MikrotikHost, OperationType
 from mikrotools.inventory import InventoryItem
-from mikrotools.netapi import AsyncMikrotikManager
+from mikrotools.netapi import AsyncMikrotikManager, AsyncMikrotikClient
 
-async def get_device_config(item: InventoryItem, sensitive: bool = False) -> tuple[MikrotikHost, str]:
-    # Exporting current config
-    async with AsyncMikrotikManager.async_session(item) as device:
-        identity = await device.get_identity()
-        installed_version = await device.get_routeros_installed_version()
-        if sensitive:
-            # Exporting sensitive config
-            if version.parse(installed_version) >= version.parse('7.0'):
-                # RouterOS 7.0+
-                current_config = await device.execute_command_raw('/export show-sensitive')
-            else:
-                # RouterOS < 7.0
-                current_config = await device.execute_command_raw('/export')
+async def backup_device_config(item: InventoryItem, sensitive: bool = False) -> MikrotikHost:
+    """
+    Exports the current config of a device and writes it to '<identity>.rsc'.
+
+    The export is streamed to disk as it arrives, so memory usage doesn't depend on
+    the config size. The file is written under a temporary name first and replaced
+    only once the export completes, so a failed export never overwrites a previous backup.
+    Exports interrupted by transient errors are retried.
+    """
+    # /export has no API equivalent, the session is opened over SSH even if the API is enabled
+    return await AsyncMikrotikManager.run(item, lambda device: export_device_config(device, item, sensitive), cli=True)
+
+async def export_device_config(device: AsyncMikrotikClient, item: InventoryItem, sensitive: bool = False) -> MikrotikHost:
+    capabilities = await device.get_capabilities()
+    identity = capabilities.identity
+    installed_version = capabilities.version
+    if sensitive:
+        # Exporting sensitive config
+        if capabilities.v7:
+            # RouterOS 7.0+
+            command = '/export show-sensitive'
         else:
-            # Exporting non-sensitive config
-            if version.parse(installed_version) >= version.parse('7.0'):
-                # RouterOS 7.0+
-                current_config = await device.execute_command_raw('/export')
-            else:
-                # RouterOS < 7.0
-                current_config = await device.execute_command_raw('/export hide-sensitive')
-        
-    host = MikrotikHost(address=item.address, identity=identity, installed_routeros_version=installed_version)
-        
-    return (host, current_config)
+            # RouterOS < 7.0
+            command = '/export'
+    else:
+        # Exporting non-sensitive config
+        if capabilities.v7:
+            # RouterOS 7.0+
+            command = '/export'
+        else:
+            # RouterOS < 7.0
+            command = '/export hide-sensitive'
+    
+    filename = f'{identity}.rsc'
+    # Hosts sharing an identity are exported concurrently, so each one gets its own temporary file
+    f = tempfile.NamedTemporaryFile(dir=os.path.dirname(os.path.abspath(filename)),
+                                    prefix=f'{filename}.', suffix='.part', delete=False)
+    try:
+        with f:
+            async for chunk in device.stream_command(command, raw=True):
+                # Writing off the event loop, so a slow disk doesn't stall other sessions
+                await asyncio.to_thread(f.write, chunk)
+        await asyncio.to_thread(os.replace, f.name, filename)
+    except BaseException:
+        with suppress(FileNotFoundError):
+            os.remove(f.name)
+        raise
+    
+    return MikrotikHost(address=item.address, identity=identity, installed_routeros_version=installed_version)
 
 async def backup_configs(items: list[InventoryItem], sensitive=False):
     counter: int = 0
     failed_hosts: list[tuple[str, str]] = []
     tasks: list[asyncio.Task] = []
     
+    total = len(items)
+    items, unreachable = await AsyncMikrotikManager.probe(items)
+    failed_hosts.extend((item.address, 'Host unreachable') for item in unreachable)
+    counter += len(unreachable)
+    
     for item in items:
-        task = asyncio.create_task(get_device_config(item, sensitive), name=item.address)
+        task = asyncio.create_task(backup_device_config(item, sensitive), name=item.address)
         tasks.append(task)
     
     with Progress(OperationType.BACKUP) as progress:
-        progress.update(counter, len(items))
+        progress.update(counter, total)
         async for task in asyncio.as_completed(tasks):
             counter += 1
             try:
-                host, current_config = await task
+                host = await task
             except TimeoutError:
                 failed_hosts.append((task.get_name(), 'Connection timeout'),)
-                progress.update(counter, len(items), address=task.get_name())
+                progress.update(counter, total, address=task.get_name())
                 continue
             except Exception as e:
                 failed_hosts.append((task.get_name(), str(e)),)
-                progress.update(counter, len(items), address=task.get_name())
+                progress.update(counter, total, address=task.get_name())
                 continue
             
-            # Writing current config to file
-            with open(f'{host.identity}.rsc', 'w') as f:
-                f.write(current_config)
-            
             if host is not None:
-                progress.update(counter, len(items), host=host)
+                progress.update(counter, total, host=host)
             else:
-                progress.update(counter, len(items), address=task.get_name())
+                progress.update(counter, total, address=task.get_name())
     
     console = Console(highlight=False)
     
     if failed_hosts:
         console.print(f'[bold orange1]Backup completed with errors!\n'
-                       f'[bold gold1]Backed up {len(items) - len(failed_hosts)} '
-                       f'hosts out of {len(items)}\n')
+                       f'[bold gold1]Backed up {total - len(failed_hosts)} '
+                       f'hosts out of {total}\n')
         console.print('[bold red3]The following hosts failed to backup:')
         for address, error in failed_hosts:
             console.print(f'[thistle1]{address}: [yellow]{error}')
@@ -0,0 +1,26 @@
+import click
+
+from mikrotools.cli.options import common_options
+from mikrotools.cli.utils import cli
+from mikrotools.mikromanager import mikromanager_init
+from mikrotools.tools import coro, get_hosts
+
+from .utils import benchmark_host
+
+@cli.command(name='benchmark', help='Benchmark SSH transport profiles against a host')
+@click.option('-t', '--profile', 'profiles', multiple=True, help='Profile to benchmark, can be repeated (default: all)')
+@click.option('-n', '--rounds', type=int, default=3, show_default=True, help='Connections per profile')
+@click.option('--command', default='/export verbose', show_default=True, help='Command used to measure throughput')
+@mikromanager_init
+@common_options
+@coro
+async def benchmark(profiles, rounds, command, *args, **kwargs):
+    hosts = get_hosts()
+    if not hosts:
+        raise click.UsageError('No hosts to benchmark')
+    
+    # Benchmarking the first host only, results for different routers aren't comparable
+    await benchmark_host(hosts[0], list(profiles), rounds, command)
+
+def register(cli_group):
+    cli_group.add_command(benchmark)
@@ -0,0 +1,108 @@
+import statistics
+import time
+
+from dataclasses import dataclass, field
+
+import click
+
+from rich.console import Console
+from rich.table import Table
+
+from mikrotools.config import get_config, TransportProfile
+from mikrotools.inventory import InventoryItem
+from mikrotools.netapi.mikrotik.client import AsyncMikrotikSSHClient
+from mikrotools.netapi.mikrotik.transport import BUILTIN_PROFILES, asyncssh_options
+
+@dataclass
+class BenchmarkResult:
+    handshakes: list[float] = field(default_factory=list) # Seconds
+    transfers: list[float] = field(default_factory=list) # Seconds
+    size: int = 0 # Bytes transferred in a single round
+    error: str | None = None
+
+    @property
+    def throughput(self) -> float:
+        """
+        Median throughput in bytes per second.
+        """
+        if not self.transfers:
+            return 0.0
+        return self.size / max(statistics.median(self.transfers), 1e-6)
+
+def get_profiles(names: list[str]) -> dict[str, TransportProfile]:
+    config = get_config()
+    profiles = {'configured': config.ssh.transport} | BUILTIN_PROFILES | config.ssh.transport_profiles
+    if not names:
+        return profiles
+    
+    unknown = [name for name in names if name not in profiles]
+    if unknown:
+        raise click.UsageError(f'Unknown transport profiles: {", ".join(unknown)}. Available: {", ".join(profiles)}')
+    
+    return {name: profiles[name] for name in names}
+
+async def benchmark_profile(host: InventoryItem, profile: TransportProfile, rounds: int, command: str) -> BenchmarkResult:
+    config = get_config()
+    result = BenchmarkResult()
+    
+    for _ in range(rounds):
+        client = AsyncMikrotikSSHClient(
+            host=host.address,
+            port=config.ssh.port,
+            username=config.ssh.username,
+            password=config.ssh.password,
+            keyfile=config.ssh.keyfile or None,
+            transport_options=asyncssh_options(profile)
+        )
+        try:
+            start = time.monotonic()
+            await client.connect(timeout=profile.connect_timeout)
+            result.handshakes.append(time.monotonic() - start)
+            
+            size = 0
+            start = time.monotonic()
+            async for chunk in client.stream_command(command, raw=True):
+                size += len(chunk)
+            result.transfers.append(time.monotonic() - start)
+            result.size = size
+        except Exception as e:
+            result.error = str(e) or e.__class__.__name__
+            break
+        finally:
+            await client.disconnect()
+    
+    return result
+
+def print_results(host: InventoryItem, results: dict[str, BenchmarkResult]) -> None:
+    table = Table(title=f'Transport profiles benchmark for {host.address}')
+    table.add_column('Profile')
+    table.add_column('Handshake, ms', justify='right')
+    table.add_column('Transfer, ms', justify='right')
+    table.add_column('Size, KiB', justify='right')
+    table.add_column('Throughput, KiB/s', justify='right')
+    
+    for name, result in results.items():
+        if result.error is not None:
+            table.add_row(name, f'[red]{result.error}', '', '', '')
+            continue
+        table.add_row(
+            name,
+            f'{statistics.median(result.handshakes) * 1000:.0f}',
+            f'{statistics.median(result.transfers) * 1000:.0f}',
+            f'{result.size / 1024:.1f}',
+            f'{result.throughput / 1024:.1f}'
+        )
+    
+    Console(highlight=False).print(table)
+
+async def benchmark_host(host: InventoryItem, profile_names: list[str], rounds: int, command: str) -> None:
+    profiles = get_profiles(profile_names)
+    console = Console(highlight=False)
+    results: dict[str, BenchmarkResult] = {}
+    
+    # Profiles are measured one after another, so they don't compete for router CPU
+    for name, profile in profiles.items():
+        with console.status(f'Benchmarking profile {name}...'):
+            results[name] = await benchmark_profile(host, profile, rounds, command)
+    
+    print_results(host, results)
@@ -2,19 +2,35 @@ import asyncio
 
 from datetime import datetime
 from rich.console import Console
+from tempfile import SpooledTemporaryFile
 
 from mikrotools.inventory import InventoryItem
 from mikrotools.netapi import AsyncMikrotikManager
 
-async def execute_host_commands(host: InventoryItem, commands: list[str]) -> tuple[str, str, datetime, list[tuple[str, str]]]:
-    async with AsyncMikrotikManager.async_session(host) as device:
-        identity = await device.get_identity()
-        routeros_installed_version = await device.get_routeros_installed_version()
-        results: list[tuple[str, str]] = []
+# Command output larger than this is spooled to a temporary file instead of memory
+SPOOL_MAX_SIZE = 1024 * 1024
+
+async def execute_host_commands(host: InventoryItem, commands: list[str]) -> tuple[str, str, datetime, list[tuple[str, SpooledTemporaryFile]]]:
+    # Arbitrary CLI commands and scripts can't be sent over the API
+    async with AsyncMikrotikManager.async_session(host, cli=True) as device:
+        capabilities = await device.get_capabilities()
+        identity = capabilities.identity
+        routeros_installed_version = capabilities.version
+        results: list[tuple[str, SpooledTemporaryFile]] = []
         
-        for command in commands:
-            result = await device.execute_command_raw(command)
-            results.append((command, result),)
+        try:
+            for command in commands:
+                # Streaming output to a spool to keep memory bounded while
+                # other hosts are still running
+                result = SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE, mode='w+')
+                results.append((command, result),)
+                async for chunk in device.stream_command(command):
+                    result.write(chunk)
+                result.seek(0)
+        except BaseException:
+            for _, result in results:
+                result.close()
+            raise
         
     return(
         (
@@ -31,13 +47,27 @@ async def execute_hosts_commands(hosts: list[InventoryItem], commands: list[str]
     console = Console()
     console.print('[gray27]Executing commands on hosts...')
     
+    hosts, unreachable = await AsyncMikrotikManager.probe(hosts)
+    for host in unreachable:
+        console.print(
+            f'[bold red3]Error connecting to [/]'
+            f'[light_pink3]{host.address}:[/] '
+            f'[gold3]Host unreachable[/]'
+        )
+    
     tasks.extend(
         asyncio.create_task(
             execute_host_commands(host, commands), name=host.address
         )
         for host in hosts
     )
-    async for task in asyncio.as_completed(tasks):
+    completed = asyncio.as_completed(tasks)
+    # Dropping finished tasks once their output is printed, so spooled outputs
+    # don't pile up for the whole fleet
+    tasks.clear()
+    
+    # Every host's output is printed as soon as the host finishes
+    async for task in completed:
         try:
             identity, routeros_installed_version, dt, results = await task
         except TimeoutError:
@@ -71,4 +101,6 @@ async def execute_hosts_commands(hosts: list[InventoryItem], commands: list[str]
             # Printing command
             console.print(f'[bold grey27]Executed command: {command}[/]')
             # Printing execution result
-            console.print(result)
+            with result:
+                for line in result:
+                    console.print(line, end='', markup=False)
@@ -1,7 +1,7 @@
 import asyncio
+import time
 
 from asyncssh.misc import PermissionDenied
-from ipaddress import IPv4Address
 from packaging import version
 from rich.box import SIMPLE
 from rich.console import Console
@@ -10,10 +10,15 @@ from rich.live import Live
 from rich.table import Table
 
 from mikrotools.hoststools.common import get_mikrotik_host
+from mikrotools.hoststools.facts import get_fact_store, stale_while_revalidate
+from mikrotools.hoststools.fleet import FleetTable
 from mikrotools.hoststools.models import MikrotikHost
 from mikrotools.inventory import InventoryItem
 from mikrotools.netapi import AsyncMikrotikManager
 
+# Live display refreshes per second, the table isn't rebuilt more often than this
+REFRESH_PER_SECOND = 10
+
 def create_table():
     table = Table(title="[green]List of hosts", show_header=True, header_style="bold grey78", box=SIMPLE)
     
@@ -28,16 +33,22 @@ def create_table():
     
     return table
 
-def generate_table(table, rows):
+def generate_table(table, rows, rendered=None):
     table = create_table()
-    add_rows(table, rows)
+    add_rows(table, rows, rendered)
     
     return table
 
-def add_rows(table, rows):
-    for row in sorted(rows, key=IPv4Address):
-        host, failed, error_message = rows[row]
-        add_row(table, host, failed, error_message)
+def add_rows(table, rows: FleetTable, rendered: dict[int, tuple[str, ...]] | None = None):
+    # Rows are rendered straight from the columns. Rendered cells are cached between
+    # refreshes when a cache is given, the caller drops entries of rows it changes
+    for index in rows.sorted_by_address():
+        cells = rendered.get(index) if rendered is not None else None
+        if cells is None:
+            cells = render_row(rows, index)
+            if rendered is not None:
+                rendered[index] = cells
+        table.add_row(*cells)
 
 def get_footer(rows, offline_hosts):
     footer = ''
@@ -66,29 +77,60 @@ def print_table(rows):
 
 async def list_hosts(items: list[InventoryItem], follow: bool = False):
     tasks = []
-    rows = {}
+    # Facts are kept in columns, so the host objects don't pile up for large fleets
+    rows = FleetTable()
     offline_hosts = 0
     
     console = Console()
+    
+    # Unreachable hosts are reported as offline without waiting for SSH timeouts
+    items, unreachable = await AsyncMikrotikManager.probe(items)
+    for item in unreachable:
+        rows.set(MikrotikHost(address=item.address), True, 'Host unreachable')
+    offline_hosts += len(unreachable)
+    
+    # Stored facts younger than the TTL are shown without contacting the hosts,
+    # older ones are shown right away if allowed and replaced once refreshed
+    stored = {}
+    store = get_fact_store()
+    if store is not None:
+        stored = await asyncio.to_thread(store.get_many, [item.address for item in items])
+    refresh = []
+    for item in items:
+        if item.address in stored:
+            host, age = stored[item.address]
+            if age < store.ttl:
+                rows.set(host)
+                continue
+            if stale_while_revalidate():
+                rows.set(host)
+        refresh.append(item)
+    items = refresh
+    
+    # Cells of rendered rows by row index, so refreshes only render changed rows
+    rendered: dict[int, tuple[str, ...]] = {}
+    
     layout = Layout()
-    table = create_table()
+    table = generate_table(create_table(), rows, rendered)
     footer = get_footer(rows=rows, offline_hosts=offline_hosts)
     layout.split_column(
         Layout(table, name='table'),
         Layout(footer, name='footer', size=3)
     )
     for item in items:
-        task = asyncio.create_task(get_mikrotik_host(item), name=item.address)
+        task = asyncio.create_task(get_mikrotik_host(item, use_stored=False), name=item.address)
         tasks.append(task)
+    completed = asyncio.as_completed(tasks)
+    # The iterator references pending tasks only, so results are freed once added to rows
+    tasks.clear()
     
-    with Live(layout, console=console, screen=True, refresh_per_second=10) as live:
-        hosts = []
-        async for task in asyncio.as_completed(tasks):
+    rendered_at = 0.0
+    with Live(layout, console=console, screen=True, refresh_per_second=REFRESH_PER_SECOND) as live:
+        async for task in completed:
             error_message = None
             failed = False
             try:
                 host = await task
-                hosts.append(host)
             except TimeoutError:
                 failed = True
                 host = MikrotikHost(address=task.get_name())
@@ -105,45 +147,59 @@ async def list_hosts(items: list[InventoryItem], follow: bool = False):
                 host = MikrotikHost(address=task.get_name())
                 error_message = str(e)
             
-            rows[task.get_name()] = (host, failed, error_message)
+            rendered.pop(rows.set(host, failed, error_message), None)
             
-            table = generate_table(table, rows)
-            footer = get_footer(rows=rows, offline_hosts=offline_hosts)
-            layout['table'].update(table)
-            layout['footer'].update(footer)
+            # Rebuilding the table once per refresh instead of once per host
+            now = time.monotonic()
+            if now - rendered_at >= 1 / REFRESH_PER_SECOND:
+                rendered_at = now
+                table = generate_table(table, rows, rendered)
+                footer = get_footer(rows=rows, offline_hosts=offline_hosts)
+                layout['table'].update(table)
+                layout['footer'].update(footer)
+    
+    table = generate_table(table, rows, rendered)
+    footer = get_footer(rows=rows, offline_hosts=offline_hosts)
     
     # Print the final table
     console.clear()
     console.print(table)
     console.print(footer)
 
-def add_row(table: Table, host: MikrotikHost, failed: bool = False, error_message: str = None):
-    if host is not None:
-        if failed:
-            table.add_row(
-                f'[red]{host.identity if host.identity is not None else "-"}', # Host
-                f'[light_steel_blue1]{host.address if host.address is not None else "-"}', # Address
-                f'[red]{error_message if error_message is not None else "-"}'
-            )
-        else:
-            if host.cpu_load is None:
-                cpu_color = 'red'
-            elif host.cpu_load < 40:
-                cpu_color = 'green'
-            elif host.cpu_load < 60:
-                cpu_color = 'yellow'
-            elif host.cpu_load < 80:
-                cpu_color = 'dark_orange'
-            else:
-                cpu_color = 'red'
-            
-            table.add_row(
-                f'[dark_orange]{host.identity if host.identity is not None else "-"}', # Host
-                f'[light_steel_blue1]{host.address if host.address is not None else "-"}', # Address
-                f'[slate_blue1]{host.public_address if host.public_address is not None else "-"}', # Public address
-                f'[dark_olive_green3]{host.installed_routeros_version if host.installed_routeros_version is not None else "-"}', # RouterOS
-                f'[medium_purple1]{host.current_firmware_version if host.current_firmware_version is not None else "-"}', # Firmware
-                f'[dodger_blue2]{host.model if host.model is not None else "-"}', # Model
-                f'[{cpu_color}]{host.cpu_load if host.cpu_load is not None else "-"}%', # CPU %
-                f'[cornflower_blue]{host.uptime if host.uptime is not None else "-"}', # Uptime
-            )
+def render_row(rows: FleetTable, index: int) -> tuple[str, ...]:
+    columns = rows.columns
+    
+    def value(name: str):
+        value = columns[name][index]
+        return value if value is not None else '-'
+    
+    if rows.failed[index]:
+        error_message = rows.errors[index]
+        return (
+            f'[red]{value("identity")}', # Host
+            f'[light_steel_blue1]{value("address")}', # Address
+            f'[red]{error_message if error_message is not None else "-"}'
+        )
+    
+    cpu_load = columns['cpu_load'][index]
+    if cpu_load is None:
+        cpu_color = 'red'
+    elif cpu_load < 40:
+        cpu_color = 'green'
+    elif cpu_load < 60:
+        cpu_color = 'yellow'
+    elif cpu_load < 80:
+        cpu_color = 'dark_orange'
+    else:
+        cpu_color = 'red'
+    
+    return (
+        f'[dark_orange]{value("identity")}', # Host
+        f'[light_steel_blue1]{value("address")}', # Address
+        f'[slate_blue1]{value("public_address")}', # Public address
+        f'[dark_olive_green3]{value("installed_routeros_version")}', # RouterOS
+        f'[medium_purple1]{value("current_firmware_version")}', # Firmware
+        f'[dodger_blue2]{value("model")}', # Model
+        f'[{cpu_color}]{value("cpu_load")}%', # CPU %
+        f'[cornflower_blue]{value("uptime")}', # Uptime
+    )
@@ -0,0 +1,3 @@
+from .cli import register
+
+__all__ = ['register']
@@ -0,0 +1,23 @@
+import click
+
+from mikrotools.cli.options import common_options
+from mikrotools.cli.utils import cli
+from mikrotools.hoststools.facts import INDEXED_COLUMNS
+from mikrotools.mikromanager import mikromanager_init
+
+from .utils import query_facts
+
+@cli.command(name='query', help='Query stored facts of routers without connecting to them')
+@click.option('--at-least', metavar='VERSION', help='Minimum installed RouterOS version')
+@click.option('--below', metavar='VERSION', help='Installed RouterOS version below')
+@click.option('-m', '--model', 'models', multiple=True, help='Router model, can be repeated')
+@click.option('--firmware', multiple=True, help='Current firmware version, can be repeated')
+@click.option('--count-by', type=click.Choice(list(INDEXED_COLUMNS)), help='Count matching hosts by a field')
+@click.option('-o', '--output-file', required=False, help='Write addresses of matching hosts to a file')
+@mikromanager_init
+@common_options
+def query(at_least, below, models, firmware, count_by, output_file, *args, **kwargs):
+    query_facts(at_least, below, list(models), list(firmware), count_by, output_file)
+
+def register(cli_group):
+    cli_group.add_command(query)
@@ -0,0 +1,103 @@
+import logging
+import time
+
+from rich.box import SIMPLE
+from rich.console import Console
+from rich.table import Table
+
+from mikrotools.hoststools.facts import get_fact_store
+from mikrotools.hoststools.fleet import FleetTable
+
+logger = logging.getLogger(__name__)
+
+def create_hosts_table() -> Table:
+    table = Table(title='[green]Stored facts', show_header=True, header_style='bold grey78', box=SIMPLE)
+    
+    table.add_column('Host', justify='left')
+    table.add_column('Address', justify='left')
+    table.add_column('RouterOS', justify='left')
+    table.add_column('Firmware', justify='left')
+    table.add_column('Model', justify='left')
+    
+    return table
+
+def create_counts_table(field: str) -> Table:
+    table = Table(title=f'[green]Hosts by {field}', show_header=True, header_style='bold grey78', box=SIMPLE)
+    
+    table.add_column(field.capitalize(), justify='left')
+    table.add_column('Hosts', justify='right')
+    
+    return table
+
+def print_hosts(rows: FleetTable, stored: int) -> None:
+    console = Console(highlight=False)
+    table = create_hosts_table()
+    
+    for host, _, _ in rows.rows(rows.sorted_by_address()):
+        table.add_row(
+            f'[dark_orange]{host.identity if host.identity is not None else "-"}',
+            f'[light_steel_blue1]{host.address}',
+            f'[dark_olive_green3]{host.installed_routeros_version if host.installed_routeros_version is not None else "-"}',
+            f'[medium_purple1]{host.current_firmware_version if host.current_firmware_version is not None else "-"}',
+            f'[dodger_blue2]{host.model if host.model is not None else "-"}',
+        )
+    
+    console.print(table)
+    console.print(f'[cornflower_blue]Matching hosts: [light_steel_blue1]{len(rows)} '
+                  f'[medium_purple1]| [cornflower_blue]Stored hosts: [light_steel_blue1]{stored}')
+
+def print_counts(counts: list[tuple[str | None, int]], field: str) -> None:
+    console = Console(highlight=False)
+    table = create_counts_table(field)
+    
+    for value, count in counts:
+        table.add_row(f'[dodger_blue2]{value if value is not None else "-"}', f'[light_steel_blue1]{count}')
+    
+    console.print(table)
+
+def query_facts(
+    at_least: str | None = None,
+    below: str | None = None,
+    models: list[str] | None = None,
+    firmware: list[str] | None = None,
+    count_by: str | None = None,
+    output_file: str | None = None
+) -> None:
+    """
+    Answers questions about the fleet from the fact store, without connecting to any host.
+
+    Args:
+        at_least: Minimum installed RouterOS version. Optional.
+        below: Installed RouterOS version upper bound, exclusive. Optional.
+        models: Models to match any of. Optional.
+        firmware: Current firmware versions to match any of. Optional.
+        count_by: Field to count matching hosts by ('version', 'model' or 'firmware'). Optional.
+        output_file: File to write addresses of matching hosts to. Optional.
+    """
+    console = Console(highlight=False)
+    store = get_fact_store()
+    if store is None:
+        console.print('[red]The fact store is disabled. Enable facts in the config '
+                      'and collect them with the list command first.')
+        exit(1)
+    
+    started = time.perf_counter()
+    try:
+        if count_by and not output_file:
+            counts = store.count_by(count_by, at_least, below, models, firmware)
+        else:
+            rows = store.select(at_least, below, models, firmware)
+    except ValueError as e:
+        console.print(f'[red]{e}')
+        exit(1)
+    logger.debug(f'Query answered in {time.perf_counter() - started:.3f}s')
+    
+    if output_file:
+        addresses = rows.columns['address']
+        with open(output_file, 'w') as f:
+            for i in rows.sorted_by_address():
+                f.write(f'{addresses[i]}\n')
+    elif count_by:
+        print_counts(counts, count_by)
+    else:
+        print_hosts(rows, store.count())
@@ -4,13 +4,14 @@ import logging
 from packaging import version
 from rich.console import Console
 
-from mikrotools.hoststools.common import get_mikrotik_host, reboot_hosts
+from mikrotools.hoststools.common import get_device_host, reboot_hosts
+from mikrotools.hoststools.facts import get_fact_store
 from mikrotools.hoststools.models import MikrotikHost
 
 from mikrotools.cli.progress import Progress
 from mikrotools.hoststools.models import OperationType
 from mikrotools.inventory import InventoryItem
-from mikrotools.netapi import MikrotikManager, AsyncMikrotikManager
+from mikrotools.netapi import MikrotikManager, AsyncMikrotikManager, AsyncMikrotikClient
 from mikrotools.tools.colors import fcolors_256 as fcolors
 
 from .progress import CheckUpgradableProgress
@@ -84,13 +85,15 @@ def print_upgradable_hosts(upgradable_hosts: list[MikrotikHost], upgrade_type: U
 # Upgrade firmware
 
 async def get_host_if_firmware_upgradable(item: InventoryItem) -> MikrotikHost | None:
-    async with AsyncMikrotikManager.async_session(item) as device:
+    async def check(device: AsyncMikrotikClient) -> MikrotikHost | None:
         routerboard = await device.get_system_routerboard()
         
         if is_upgradable(routerboard.current_firmware, routerboard.upgrade_firmware):
-            return await get_mikrotik_host(item)
+            return await get_device_host(device, item.address)
         else:
             return None
+    
+    return await AsyncMikrotikManager.run(item, check)
 
 async def get_firmware_upgradable_hosts(items: list[InventoryItem]):
     upgradable_hosts = []
@@ -105,8 +108,14 @@ async def get_firmware_upgradable_hosts(items: list[InventoryItem]):
     console.show_cursor(False)
     console.print('[grey27]Checking for hosts applicable for firmware upgrade...')
     
+    total = len(items)
+    items, unreachable = await AsyncMikrotikManager.probe(items)
+    addresses_with_error.extend((item.address, 'Host unreachable') for item in unreachable)
+    offline += len(unreachable)
+    counter += len(unreachable)
+    
     with CheckUpgradableProgress(UpgradeType.FIRMWARE) as progress:
-        progress.update(counter, len(items), len(upgradable_hosts), offline, failed)
+        progress.update(counter, total, len(upgradable_hosts), offline, failed)
         for item in items:
             task = asyncio.create_task(get_host_if_firmware_upgradable(item), name=item.address)
             tasks.append(task)
@@ -126,9 +135,9 @@ async def get_firmware_upgradable_hosts(items: list[InventoryItem]):
             
             if host is not None:
                 upgradable_hosts.append(host)
-                progress.update(counter, len(items), len(upgradable_hosts), offline, failed, address=completed_task.get_name(), identity=host.identity)
+                progress.update(counter, total, len(upgradable_hosts), offline, failed, address=completed_task.get_name(), identity=host.identity)
             else:
-                progress.update(counter, len(items), len(upgradable_hosts), offline, failed, address=completed_task.get_name())
+                progress.update(counter, total, len(upgradable_hosts), offline, failed, address=completed_task.get_name())
     
     console.show_cursor()
     
@@ -247,20 +256,24 @@ async def upgrade_host_firmware(host: MikrotikHost) -> MikrotikHost | None:
     """
     async with AsyncMikrotikManager.async_session(InventoryItem(address=host.address)) as device:
         await device.execute_command_raw('/system routerboard upgrade')
-
+    
+    await invalidate_facts(host)
+    
     return host
 
 # Upgrade RouterOS
 
-async def get_host_if_routeros_upgradable(address) -> MikrotikHost | None:
-    async with AsyncMikrotikManager.async_session(address) as device:
+async def get_host_if_routeros_upgradable(item: InventoryItem) -> MikrotikHost | None:
+    async def check(device: AsyncMikrotikClient) -> MikrotikHost | None:
         await device.execute_command_raw('/system package update check-for-updates')
         pkgupdate = await device.get_system_package_update()
         
         if is_upgradable(pkgupdate.installed_version, pkgupdate.latest_version):
-            return await get_mikrotik_host(address)
+            return await get_device_host(device, item.address)
         else:
             return None
+    
+    return await AsyncMikrotikManager.run(item, check)
 
 async def get_routeros_upgradable_hosts(items: list[InventoryItem]) -> tuple[list[MikrotikHost], list[tuple[str, str]]]:
     tasks: list[asyncio.Task] = []
@@ -275,12 +288,18 @@ async def get_routeros_upgradable_hosts(items: list[InventoryItem]) -> tuple[lis
     console.show_cursor(False)
     console.print('[grey27]Checking for hosts applicable for RouterOS upgrade...')
     
+    total = len(items)
+    items, unreachable = await AsyncMikrotikManager.probe(items)
+    addresses_with_error.extend((item.address, 'Host unreachable') for item in unreachable)
+    offline += len(unreachable)
+    counter += len(unreachable)
+    
     for item in items:
         task = asyncio.create_task(get_host_if_routeros_upgradable(item), name=item.address)
         tasks.append(task)
     
     with CheckUpgradableProgress(UpgradeType.ROUTEROS) as progress:
-        progress.update(counter, len(items), len(upgradable_hosts), offline, failed)
+        progress.update(counter, total, len(upgradable_hosts), offline, failed)
         async for completed_task in asyncio.as_completed(tasks):
             counter += 1
             try:
@@ -296,9 +315,9 @@ async def get_routeros_upgradable_hosts(items: list[InventoryItem]) -> tuple[lis
             
             if host is not None:
                 upgradable_hosts.append(host)
-                progress.update(counter, len(items), len(upgradable_hosts), offline, failed, address=completed_task.get_name(), identity=host.identity)
+                progress.update(counter, total, len(upgradable_hosts), offline, failed, address=completed_task.get_name(), identity=host.identity)
             else:
-                progress.update(counter, len(items), len(upgradable_hosts), offline, failed, address=completed_task.get_name())
+                progress.update(counter, total, len(upgradable_hosts), offline, failed, address=completed_task.get_name())
     
     console.show_cursor()
     
@@ -413,8 +432,16 @@ async def upgrade_host_routeros(host: MikrotikHost) -> MikrotikHost:
         await device.execute_command_raw('/system package update check-for-updates')
         await device.execute_command_raw('/system package update install')
     
+    await invalidate_facts(host)
+    
     return host
 
+async def invalidate_facts(host: MikrotikHost) -> None:
+    # Stored versions of an upgraded host are outdated
+    store = get_fact_store()
+    if store is not None:
+        await asyncio.to_thread(store.invalidate, host.address)
+
 def get_outdated_hosts(hosts: list[InventoryItem], min_version: str, filtered_version: str | None = None) -> list[InventoryItem]:
 
     """
@@ -432,28 +459,32 @@ def get_outdated_hosts(hosts: list[InventoryItem], min_version: str, filtered_ve
     Returns:
         list[str]: A list of hostnames or IP addresses with outdated versions.
     """
-    counter = 1
+    counter = 0
     offline = 0
-    outdated_hosts = []
-    for host in hosts:
-        print_outdated_progress(host.address, counter, len(hosts), len(outdated_hosts), offline)
-
-        try:
-            with MikrotikManager.session(host) as device:
-                installed_version = device.get_routeros_installed_version()
-        except TimeoutError:
+    outdated = set()
+    
+    reachable, unreachable = MikrotikManager.probe(hosts)
+    offline += len(unreachable)
+    counter += len(unreachable)
+    
+    # Hosts are checked concurrently and reported in the order they complete
+    results = MikrotikManager.run_many(reachable, lambda device: device.get_routeros_installed_version())
+    for host, installed_version in results:
+        counter += 1
+        print_outdated_progress(host.address, counter, len(hosts), len(outdated), offline)
+        
+        if isinstance(installed_version, (TimeoutError, ConnectionError)):
             offline += 1
-            counter += 1
             continue
+        if isinstance(installed_version, Exception):
+            raise installed_version
         
         if check_if_update_applicable(installed_version, min_version, filtered_version):
-            outdated_hosts.append(host)
-        
-        counter += 1
+            outdated.add(host.address)
     
     print('\r\033[K', end='\r')
     
-    return outdated_hosts
+    return [host for host in hosts if host.address in outdated]
 
 def check_if_update_applicable(installed_version, min_version, filtered_version=None):
     """
@@ -1,10 +1,11 @@
-import asyncio
-
 from functools import wraps
 
+from mikrotools.netapi.mikrotik.loop import run_sync
+
 def coro(f):
     @wraps(f)
     def wrapper(*args, **kwargs):
-        return asyncio.run(f(*args, **kwargs))
+        # Commands run on the shared background loop, where the connection pool lives
+        return run_sync(f(*args, **kwargs))
     
     return wrapper
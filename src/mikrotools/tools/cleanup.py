@@ -1,6 +1,9 @@
 import logging
 
 from mikrotools.hoststools import cleanup_connections
+from mikrotools.hoststools.facts import close_fact_store
+
+from .summary import print_summary
 
 __all__ = ['cleanup_all']
 
@@ -9,3 +12,5 @@ logger = logging.getLogger(__name__)
 def cleanup_all() -> None:
     logger.debug('Cleaning up')
     cleanup_connections()
+    close_fact_store()
+    print_summary()
@@ -0,0 +1,18 @@
+from rich.console import Console
+
+from mikrotools.netapi import AsyncMikrotikManager
+
+__all__ = ['print_summary']
+
+def print_summary() -> None:
+    """
+    Prints statistics of the run collected by the connection managers, if there are any.
+    """
+    lines = AsyncMikrotikManager.summary()
+    if not lines:
+        return
+    
+    console = Console(stderr=True, highlight=False)
+    console.print('[bold]Run summary:[/]')
+    for line in lines:
+        console.print(f'  {line}', style='dim', markup=False)
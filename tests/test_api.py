@@ -0,0 +1,101 @@
+import asyncio
+
+import pytest
+
+from mikrotools.netapi.mikrotik.api import AsyncMikrotikAPIClient, APIError, command_to_words, path_to_api
+from mikrotools.netapi.mikrotik.filters import Filter
+from mikrotools.netapi.mikrotik.stub import StubAPIServer
+
+def run_with_stub(test, **kwargs):
+    async def main():
+        async with StubAPIServer(**kwargs) as server:
+            async with AsyncMikrotikAPIClient('127.0.0.1', 'admin', '', port=server.port) as device:
+                return await test(device, server)
+
+    return asyncio.run(main())
+
+@pytest.mark.parametrize('command, words', [
+    ('/system package update check-for-updates', ['/system/package/update/check-for-updates']),
+    ('/system/reboot', ['/system/reboot']),
+    (
+        '/ip address add address=10.0.0.1/24 interface=ether1',
+        ['/ip/address/add', '=address=10.0.0.1/24', '=interface=ether1']
+    ),
+    ('/system identity set name="core router"', ['/system/identity/set', '=name=core router']),
+])
+def test_command_to_words(command, words):
+    assert command_to_words(command) == words
+
+@pytest.mark.parametrize('command', [
+    ':put [/system identity get name]',
+    '/ip address add address=10.0.0.1/24 ether1',
+    '',
+])
+def test_command_to_words_rejects_cli_only_commands(command):
+    with pytest.raises(ValueError):
+        command_to_words(command)
+
+def test_path_to_api():
+    assert path_to_api('/system package update') == '/system/package/update'
+    assert path_to_api('/ip/address') == '/ip/address'
+
+def test_filter_to_api():
+    filters = Filter('disabled', '=', 'false').and_('interface', '!=', 'bridge')
+    assert filters.to_api() == ['?disabled=false', '?interface=bridge', '?#!', '?#&']
+
+def test_filter_to_api_rejects_regex():
+    with pytest.raises(ValueError):
+        Filter('name', '~', 'ether').to_api()
+
+def test_client_get():
+    async def test(device, server):
+        assert await device.get_identity() == 'MikroTik'
+        assert await device.get_routeros_installed_version() == '7.16.2'
+        assert await device.get('/system resource', 'cpu-load') == '3'
+
+    run_with_stub(test)
+
+def test_client_get_capabilities():
+    async def test(device, server):
+        capabilities = await device.get_capabilities()
+        assert capabilities.identity == 'MikroTik'
+        assert capabilities.version == '7.16.2'
+        assert capabilities.channel == 'stable'
+        assert capabilities.v7
+
+    run_with_stub(test)
+
+def test_client_add_and_get_table():
+    async def test(device, server):
+        results = await device.add_many('/ip address', [
+            {'address': '10.0.0.1/24', 'interface': 'ether1', 'disabled': 'false'},
+            {'address': '10.0.1.1/24', 'interface': 'ether2', 'disabled': 'true'},
+        ])
+        assert all(result.ok for result in results)
+
+        rows = await device.get_table('/ip address', Filter('disabled', '=', 'false'), props=['address'])
+        assert rows == [{'address': '192.168.88.1/24'}, {'address': '10.0.0.1/24'}]
+
+    run_with_stub(test)
+
+def test_client_execute_command_errors():
+    async def test(device, server):
+        with pytest.raises(APIError):
+            await device.execute_command_raw('/no such menu print')
+        with pytest.raises(ValueError):
+            await device.execute_command_raw(':put 1')
+
+    run_with_stub(test)
+
+def test_manager_opens_cli_sessions_over_ssh():
+    from mikrotools.config import Config
+    from mikrotools.inventory import InventoryItem
+    from mikrotools.netapi.mikrotik.client import AsyncMikrotikSSHClient
+    from mikrotools.netapi.mikrotik.manager import AsyncMikrotikManager
+
+    AsyncMikrotikManager.configure(Config(api={'enabled': True}, timeouts={'adaptive': False}))
+    host = InventoryItem(address='192.0.2.1')
+
+    assert isinstance(AsyncMikrotikManager._create_client(host), AsyncMikrotikAPIClient)
+    assert isinstance(AsyncMikrotikManager._create_client(host, cli=True), AsyncMikrotikSSHClient)
+    assert AsyncMikrotikManager._pool_key(host, cli=True) != AsyncMikrotikManager._pool_key(host, cli=False)
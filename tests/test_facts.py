@@ -0,0 +1,96 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+from mikrotools.hoststools.facts import FactStore
+from mikrotools.hoststools.models import MikrotikHost
+
+def make_host(index: int) -> MikrotikHost:
+    return MikrotikHost(address=f'10.0.0.{index}', identity=f'router{index}', installed_routeros_version='7.16.2')
+
+def test_put_and_read_back(tmp_path):
+    store = FactStore(str(tmp_path / 'facts.sqlite3'), ttl=60, batch_size=2)
+    assert not store.put(make_host(1))
+    assert store.put(make_host(2))
+    # Pending writes are visible before they're committed
+    assert store.get('10.0.0.1')[0].identity == 'router1'
+    store.close()
+
+    store = FactStore(str(tmp_path / 'facts.sqlite3'), ttl=60)
+    assert sorted(store.get_many(['10.0.0.1', '10.0.0.2', '10.0.0.3'])) == ['10.0.0.1', '10.0.0.2']
+    assert store.get_fresh('10.0.0.2').identity == 'router2'
+
+    store.invalidate('10.0.0.2')
+    assert store.get('10.0.0.2') is None
+    store.close()
+
+def test_failed_flush_keeps_pending_facts(tmp_path):
+    store = FactStore(str(tmp_path / 'facts.sqlite3'))
+    # Replacing the table with a view makes writes fail
+    store.db.executescript('DROP TABLE facts; CREATE VIEW facts AS SELECT 1 AS address, 2 AS data, 3 AS updated;')
+    store.put(make_host(1))
+    store.flush()
+    assert '10.0.0.1' in store._pending
+
+    store.db.executescript(
+        'DROP VIEW facts; '
+        'CREATE TABLE facts (address TEXT PRIMARY KEY, data TEXT NOT NULL, updated REAL NOT NULL, '
+        'identity TEXT, version TEXT, version_order INTEGER, model TEXT, firmware TEXT);'
+    )
+    store.flush()
+    assert not store._pending
+    assert store.get('10.0.0.1')[0].identity == 'router1'
+    store.close()
+
+def test_store_can_be_used_from_worker_threads(tmp_path):
+    store = FactStore(str(tmp_path / 'facts.sqlite3'))
+
+    async def main():
+        for index in range(10):
+            store.put(make_host(index))
+        await asyncio.gather(*(asyncio.to_thread(store.flush) for _ in range(3)))
+        return await asyncio.to_thread(store.get_many, [f'10.0.0.{index}' for index in range(10)])
+
+    assert len(asyncio.run(main())) == 10
+    store.close()
+
+def test_select_and_count_by_indexed_columns(tmp_path):
+    store = FactStore(str(tmp_path / 'facts.sqlite3'))
+    for address, version, model in (
+        ('10.0.0.1', '7.16.2', 'hAP ax3'),
+        ('2001:db8::1', '7.16rc1', 'hAP ax3'),
+        ('router.example.com', '6.49.17', 'RB4011'),
+        ('10.0.0.2', None, 'RB4011'),
+    ):
+        store.put(MikrotikHost(address=address, installed_routeros_version=version, model=model))
+
+    rows = store.select(at_least='7.16beta2', below='7.17')
+    assert [rows.columns['address'][index] for index in rows.sorted_by_address()] == ['10.0.0.1', '2001:db8::1']
+    assert len(store.select(models=['RB4011'])) == 2
+    assert store.count() == 4
+    assert store.count_by('version') == [('6.49.17', 1), ('7.16rc1', 1), ('7.16.2', 1), (None, 1)]
+    assert store.count_by('model', at_least='7.0') == [('hAP ax3', 2)]
+    store.close()
+
+def test_select_rejects_invalid_versions(tmp_path):
+    store = FactStore(str(tmp_path / 'facts.sqlite3'))
+    with pytest.raises(ValueError):
+        store.select(at_least='latest')
+    store.close()
+
+def test_stores_without_indexed_columns_are_migrated(tmp_path):
+    path = str(tmp_path / 'facts.sqlite3')
+    db = sqlite3.connect(path)
+    db.execute('CREATE TABLE facts (address TEXT PRIMARY KEY, data TEXT NOT NULL, updated REAL NOT NULL)')
+    db.execute(
+        'INSERT INTO facts VALUES (?, ?, ?)',
+        ('10.0.0.1', make_host(1).model_dump_json(), 0.0)
+    )
+    db.commit()
+    db.close()
+
+    store = FactStore(path)
+    assert store.count_by('version') == [('7.16.2', 1)]
+    assert store.select(at_least='7.16').columns['identity'] == ['router1']
+    store.close()
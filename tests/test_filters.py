@@ -0,0 +1,47 @@
+import itertools
+
+import pytest
+
+from mikrotools.netapi.mikrotik.filters import Filter
+from mikrotools.netapi.mikrotik.stub import evaluate_query
+
+ROWS = [dict(zip('abc', values)) for values in itertools.product('01', repeat=3)]
+
+FILTERS = [
+    Filter('a', '=', '1').or_('b', '=', '1').and_('c', '=', '1'),
+    Filter('a', '=', '1').and_('b', '=', '1').or_('c', '=', '1'),
+    Filter('a', '=', '1').or_('b', '!=', '1').or_('c', '=', '1').and_('a', '=', '0'),
+    Filter('a', '=', '1').and_(Filter('b', '=', '1').or_('c', '=', '1')),
+    Filter(Filter('a', '=', '1').or_('b', '=', '1'), 'and', Filter('c', '=', '1')),
+    Filter('a', '>', '0').and_('b', '<=', '0'),
+]
+
+@pytest.mark.parametrize('filters', FILTERS, ids=lambda filters: filters.to_cli())
+def test_local_and_api_evaluation_agree(filters):
+    predicate = filters.compile()
+    words = filters.to_api()
+    columns = {field: [row[field] for row in ROWS] for field in 'abc'}
+
+    expected = [evaluate_query(row, words) for row in ROWS]
+    assert [predicate(row) for row in ROWS] == expected
+    assert filters.mask(columns, len(ROWS)) == expected
+
+def test_and_takes_precedence_over_or():
+    filters = Filter('a', '=', '1').or_('b', '=', '1').and_('c', '=', '1')
+    row = {'a': '1', 'b': '0', 'c': '0'}
+
+    assert filters.compile()(row)
+    assert evaluate_query(row, filters.to_api())
+
+@pytest.mark.parametrize('op, value', [('>', '100'), ('<', '100'), ('>=', '100'), ('<=', '100')])
+def test_mixed_kinds_are_not_ordered(op, value):
+    filters = Filter('mtu', op, value)
+    row = {'mtu': 'auto'}
+
+    assert not filters.compile()(row)
+    assert not evaluate_query(row, filters.to_api())
+
+def test_ordering_by_value():
+    assert Filter('mtu', '>', '100').compile()({'mtu': '1500'})
+    assert not Filter('mtu', '>', '100').compile()({'mtu': '20'})
+    assert Filter('address', '<', '10.0.0.10').compile()({'address': '10.0.0.9'})
@@ -0,0 +1,11 @@
+from mikrotools.hoststools.fleet import FleetTable
+from mikrotools.hoststools.models import MikrotikHost
+
+def test_sorted_by_address_accepts_hostnames_and_ipv6():
+    table = FleetTable()
+    for address in ('router.example.com', '2001:db8::1', '10.0.0.10', '10.0.0.9', 'Core.example.com'):
+        table.set(MikrotikHost(address=address))
+
+    assert [table.columns['address'][index] for index in table.sorted_by_address()] == [
+        '10.0.0.9', '10.0.0.10', '2001:db8::1', 'Core.example.com', 'router.example.com'
+    ]
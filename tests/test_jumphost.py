@@ -0,0 +1,106 @@
+import asyncio
+import time
+
+from mikrotools.netapi.mikrotik.jumphost import JumpHostBalancer, JumpHostPool
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+
+    def is_closed(self) -> bool:
+        return self.closed
+
+    def close(self) -> None:
+        self.closed = True
+
+    async def wait_closed(self) -> None:
+        pass
+
+class FakeJumpHostPool(JumpHostPool):
+    def __init__(self, *args, connect_delay: float = 0.0, rtt: float | None = 0.01, **kwargs):
+        super().__init__('192.0.2.1', 'admin', password='', *args, **kwargs)
+        self.connect_delay = connect_delay
+        self.connects = 0
+        self.measured_rtt = rtt
+        self.measurements = 0
+
+    async def _connect(self, timeout: float) -> FakeConnection:
+        self.connects += 1
+        await asyncio.sleep(self.connect_delay)
+        return FakeConnection()
+
+    async def measure_rtt(self, timeout: float = 5) -> float | None:
+        self.measurements += 1
+        self.rtt = self.measured_rtt
+        return self.rtt
+
+def test_concurrent_acquires_share_one_handshake():
+    async def main():
+        pool = FakeJumpHostPool(max_channels=10, connect_delay=0.05)
+        connections = await asyncio.gather(*(pool.acquire() for _ in range(10)))
+        return pool, connections
+
+    pool, connections = asyncio.run(main())
+    assert pool.connects == 1
+    assert len(set(map(id, connections))) == 1
+    assert pool.channels == 10
+
+def test_release_does_not_wait_for_handshake():
+    async def main():
+        pool = FakeJumpHostPool(max_channels=1, connect_delay=0.5)
+        pool.connect_delay = 0.0
+        conn = await pool.acquire()
+        pool.connect_delay = 0.5
+        # The second acquire opens a new connection, as the first one is full
+        connecting = asyncio.create_task(pool.acquire())
+        await asyncio.sleep(0.01)
+        start = time.monotonic()
+        await pool.release(conn)
+        released_in = time.monotonic() - start
+        await connecting
+        return released_in
+
+    assert asyncio.run(main()) < 0.1
+
+def test_failed_jump_host_is_measured_again():
+    async def main():
+        balancer = JumpHostBalancer()
+        fast, slow = FakeJumpHostPool(rtt=0.01), FakeJumpHostPool(rtt=0.05)
+        balancer.add(fast)
+        balancer.add(slow)
+        await balancer._measure()
+
+        # The fast jump host failed, its hold-down has expired since
+        fast.rtt = None
+        fast.down_until = 0.0
+        await balancer._measure()
+        await balancer._measuring
+
+        return balancer, fast, slow
+
+    balancer, fast, slow = asyncio.run(main())
+    assert fast.measurements == 2
+    assert slow.measurements == 1
+    assert balancer._rank([fast, slow]) == [fast, slow]
+
+def test_measure_rtt_closes_the_probe_connection():
+    async def main():
+        peers = []
+
+        async def accept(reader, writer):
+            peers.append(await reader.read())
+            writer.close()
+
+        server = await asyncio.start_server(accept, '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        pool = JumpHostPool('127.0.0.1', 'admin', password='', port=port)
+        rtt = await pool.measure_rtt(timeout=1)
+        # The connection is closed by the time measure_rtt() returns
+        await asyncio.sleep(0.01)
+        server.close()
+        await server.wait_closed()
+        return rtt, peers
+
+    rtt, peers = asyncio.run(main())
+    assert rtt is not None
+    assert peers == [b'']
@@ -0,0 +1,96 @@
+import asyncio
+
+import pytest
+
+from mikrotools.netapi.mikrotik.limiter import AdaptiveLimiter
+
+async def connect(limiter: AdaptiveLimiter, latency: float) -> None:
+    async with limiter.acquire() as slot:
+        await asyncio.sleep(0)
+        slot.latency = latency
+
+def test_mixed_latency_fleet_does_not_back_off():
+    async def main():
+        limiter = AdaptiveLimiter(initial=32, min_limit=4, max_limit=256, window_size=50)
+        # LAN routers answer in milliseconds, satellite sites take over a second
+        for round in range(10):
+            await asyncio.gather(*(
+                connect(limiter, 0.01 if index % 2 else 1.5) for index in range(100)
+            ))
+        return limiter
+
+    limiter = asyncio.run(main())
+    assert limiter.limit > 32
+    assert limiter.in_flight == 0
+
+def test_fleet_wide_latency_rise_backs_off():
+    async def main():
+        limiter = AdaptiveLimiter(initial=32, min_limit=4, max_limit=256, window_size=50)
+        # Every host is connected once, so only the fleet-wide median can detect overload
+        await asyncio.gather(*(connect(limiter, 0.1) for _ in range(50)))
+        await asyncio.gather(*(connect(limiter, 0.5) for _ in range(50)))
+        return limiter
+
+    limiter = asyncio.run(main())
+    assert limiter.limit < 32
+    assert limiter.in_flight == 0
+
+def test_slot_latency_overrides_elapsed_time():
+    async def main():
+        limiter = AdaptiveLimiter(initial=8, window_size=2)
+        for latency in (0.1, 0.1, 0.1, 0.1):
+            async with limiter.acquire() as slot:
+                # E.g. waiting for a jump host channel before the handshake
+                await asyncio.sleep(0.05)
+                slot.latency = latency
+        return limiter
+
+    limiter = asyncio.run(main())
+    assert limiter.baseline == 0.1
+    assert limiter.limit == 8
+
+def test_acquire_waits_for_release():
+    async def main():
+        limiter = AdaptiveLimiter(initial=4, min_limit=4, max_limit=4)
+        release = asyncio.Event()
+        peak = 0
+
+        async def hold():
+            nonlocal peak
+            async with limiter.acquire():
+                peak = max(peak, limiter.in_flight)
+                await release.wait()
+
+        tasks = [asyncio.create_task(hold()) for _ in range(10)]
+        await asyncio.sleep(0.01)
+        assert limiter.in_flight == 4
+        release.set()
+        await asyncio.gather(*tasks)
+        return limiter, peak
+
+    limiter, peak = asyncio.run(main())
+    assert peak == 4
+    assert limiter.in_flight == 0
+
+def test_limit_never_exceeds_max():
+    async def main():
+        limiter = AdaptiveLimiter(initial=4, min_limit=1, max_limit=6, window_size=10)
+        for _ in range(200):
+            await connect(limiter, 0.01)
+        return limiter
+
+    limiter = asyncio.run(main())
+    assert limiter.limit == 6
+
+def test_timeout_backs_off():
+    async def main():
+        limiter = AdaptiveLimiter(initial=32, min_limit=4)
+        with pytest.raises(TimeoutError):
+            async with limiter.acquire():
+                raise TimeoutError
+        return limiter
+
+    limiter = asyncio.run(main())
+    assert limiter.limit == 16
+    assert limiter.timeouts == 1
+    assert limiter.in_flight == 0
@@ -0,0 +1,31 @@
+import asyncio
+
+import pytest
+
+from mikrotools.netapi.mikrotik.loop import run_sync, submit, wait
+from mikrotools.tools.asynctools import coro
+
+@coro
+async def command(code: int) -> None:
+    await asyncio.sleep(0)
+    exit(code)
+
+def test_exit_in_command_exits():
+    with pytest.raises(SystemExit) as e:
+        command(3)
+
+    assert e.value.code == 3
+
+def test_loop_survives_exit():
+    with pytest.raises(SystemExit):
+        command(1)
+
+    # The background loop keeps running commands after one of them exited
+    assert run_sync(asyncio.sleep(0, result='ok')) == 'ok'
+
+def test_keyboard_interrupt_reaches_waiting_thread():
+    async def interrupted():
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        wait(submit(interrupted()))
@@ -0,0 +1,66 @@
+import pytest
+
+from mikrotools.netapi.mikrotik.script import (
+    build_get_many_script,
+    parse_attributes,
+    parse_rows_output,
+    parse_terse_line,
+    quote
+)
+
+@pytest.mark.parametrize('value, quoted', [
+    ('ether1', '"ether1"'),
+    ('say "hi"', '"say \\"hi\\""'),
+    ('$var?', '"\\$var\\?"'),
+    ('C:\\dir', '"C:\\\\dir"'),
+    ('line\nnext\r\tend', '"line\\nnext\\r\\tend"'),
+])
+def test_quote(value, quoted):
+    assert quote(value) == quoted
+
+def test_quote_keeps_script_on_one_line():
+    assert '\n' not in quote('a\nb') and '\r' not in quote('a\rb')
+
+def test_get_many_script_reads_only_props():
+    script = build_get_many_script('/interface/', ['*1'], ['name', 'mtu'])
+    assert '[/interface get "*1" name]' in script
+    assert '[/interface get "*1" mtu]' in script
+    assert '[/interface get "*1"]' not in script
+
+    # The output the router prints for the script
+    output = '__MT__0=name=ether1;mtu=1500\n'
+    [result] = parse_rows_output(output, 1)
+    assert parse_attributes(result.value) == {'name': 'ether1', 'mtu': '1500'}
+
+def test_get_many_script_serializes_only_props():
+    script = build_get_many_script('/interface', ['*1'], ['name'], serialize=True)
+    assert '[:serialize to=json {"name"=[/interface get "*1" name]}]' in script
+
+def test_parse_terse_line():
+    line = ' *1  X  name=ether1 mtu=1500 comment=uplink to core'
+    assert parse_terse_line(line) == {
+        '.id': '*1', 'name': 'ether1', 'mtu': '1500', 'comment': 'uplink to core'
+    }
+
+def test_parse_terse_line_without_properties():
+    assert parse_terse_line('Flags: X - disabled') is None
+
+def test_parse_terse_line_quoted_value():
+    line = '*2 name=ether2 comment="set name=wan \\"backup\\"\\tlink" mtu=1500'
+    assert parse_terse_line(line) == {
+        '.id': '*2', 'name': 'ether2', 'comment': 'set name=wan "backup"\tlink', 'mtu': '1500'
+    }
+
+def test_parse_terse_line_embedded_key_with_props():
+    # Only requested properties start a new value
+    line = '*3 name=ether3 comment=set mtu=9000 on next visit'
+    assert parse_terse_line(line, ['name', 'comment']) == {
+        '.id': '*3', 'name': 'ether3', 'comment': 'set mtu=9000 on next visit'
+    }
+
+def test_parse_terse_line_rejects_ambiguous_rows():
+    line = '*4 name=ether4 comment=old name=wan'
+    with pytest.raises(RuntimeError):
+        parse_terse_line(line)
+    with pytest.raises(RuntimeError):
+        parse_terse_line(line, ['name', 'comment'])
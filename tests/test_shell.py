@@ -0,0 +1,84 @@
+import asyncio
+import re
+
+import pytest
+
+from mikrotools.netapi.mikrotik.shell import AsyncMikrotikShell
+
+class FakeStdin:
+    def __init__(self, process: 'FakeProcess'):
+        self.process = process
+
+    def write(self, data: str) -> None:
+        begin, command, end = re.findall(r':put "(\S+)"\r\n(.*)\r\n:put "(\S+)"', data)[0]
+        for line in [begin, *self.process.outputs[command], end]:
+            self.process.lines.put_nowait(line + '\r\n')
+
+class FakeStdout:
+    def __init__(self, process: 'FakeProcess'):
+        self.process = process
+
+    async def readline(self) -> str:
+        return await self.process.lines.get()
+
+class FakeProcess:
+    def __init__(self, outputs: dict[str, list[str]]):
+        self.outputs = outputs
+        self.lines: asyncio.Queue[str] = asyncio.Queue()
+        self.stdin = FakeStdin(self)
+        self.stdout = FakeStdout(self)
+        self.closed = False
+
+    def is_closing(self) -> bool:
+        return self.closed
+
+    def close(self) -> None:
+        self.closed = True
+
+class FakeConnection:
+    def __init__(self, outputs: dict[str, list[str]]):
+        self.outputs = outputs
+        self.processes: list[FakeProcess] = []
+
+    async def create_process(self, **kwargs) -> FakeProcess:
+        self.processes.append(FakeProcess(self.outputs))
+        return self.processes[-1]
+
+OUTPUTS = {
+    '/export': ['# config', '/ip address', 'add address=10.0.0.1/24 interface=ether1'],
+    '/bad': ['bad command name bad (line 1 column 2)'],
+}
+
+def test_stream_yields_lines_and_reuses_the_channel():
+    async def main():
+        conn = FakeConnection(OUTPUTS)
+        shell = AsyncMikrotikShell(conn)
+        first = [line async for line in shell.stream('/export')]
+        second = [line async for line in shell.stream('/export')]
+        return conn, first, second
+
+    conn, first, second = asyncio.run(main())
+    assert first == second == OUTPUTS['/export']
+    assert len(conn.processes) == 1
+
+def test_stream_raises_errors_after_the_output():
+    async def main():
+        shell = AsyncMikrotikShell(FakeConnection(OUTPUTS))
+        lines = []
+        with pytest.raises(RuntimeError):
+            async for line in shell.stream('/bad'):
+                lines.append(line)
+        return lines
+
+    assert asyncio.run(main()) == OUTPUTS['/bad']
+
+def test_abandoned_stream_closes_the_shell():
+    async def main():
+        conn = FakeConnection(OUTPUTS)
+        shell = AsyncMikrotikShell(conn)
+        stream = shell.stream('/export')
+        await anext(stream)
+        await stream.aclose()
+        return shell
+
+    assert not asyncio.run(main()).is_open